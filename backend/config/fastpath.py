@@ -0,0 +1,138 @@
+from django.core.exceptions import FieldDoesNotExist
+from django.db import models
+from rest_framework import serializers
+from rest_framework.relations import PrimaryKeyRelatedField
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+
+from .renderers import FastJSONRenderer, exact_float
+
+# DRF fields whose to_representation() returns database values unchanged
+PASSTHROUGH_FIELDS = (
+    serializers.CharField, serializers.EmailField, serializers.URLField, serializers.SlugField,
+    serializers.ChoiceField, serializers.IntegerField, PrimaryKeyRelatedField,
+)
+
+
+class NotCompilable(Exception):
+    pass
+
+
+class RowSerializer:
+    """
+    Read-only serializer compiled from a ModelSerializer instance.
+
+    Produces the same output as `serializer.to_representation(instance)` from
+    `.values(*row_serializer.lookups)` rows, without building model instances or
+    walking DRF fields per row. Only model columns and nested ModelSerializers
+    compile; anything else raises NotCompilable so callers can fall back.
+    """
+
+    def __init__(self, serializer):
+        self.lookups = []
+        self.build = self.compile(serializer, '')
+
+    def __call__(self, rows):
+        build = self.build
+        return [build(row) for row in rows]
+
+    def add_lookup(self, lookup):
+        if lookup not in self.lookups:
+            self.lookups.append(lookup)
+        return lookup
+
+    def compile(self, serializer, prefix):
+        if not isinstance(serializer, serializers.ModelSerializer):
+            raise NotCompilable(type(serializer).__name__)
+        model = serializer.Meta.model
+        steps = []
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+            if isinstance(field, serializers.BaseSerializer):
+                if isinstance(field, serializers.ListSerializer):
+                    raise NotCompilable(name)
+                steps.append((name, None, self.compile(field, prefix + field.source + '__')))
+                continue
+            model_field = column_for(model, field.source)
+            steps.append((name, self.add_lookup(prefix + field.source), converter_for(field, model_field)))
+
+        # A nested relation renders as None when its row is missing
+        pk_lookup = self.add_lookup(prefix + model._meta.pk.name) if prefix else None
+
+        def build(row):
+            if pk_lookup is not None and row[pk_lookup] is None:
+                return None
+            data = {}
+            for name, lookup, convert in steps:
+                if lookup is None:
+                    data[name] = convert(row)
+                    continue
+                value = row[lookup]
+                data[name] = value if value is None or convert is None else convert(value)
+            return data
+
+        return build
+
+
+def column_for(model, source):
+    if '.' in source or source == '*':
+        raise NotCompilable(source)
+    try:
+        field = model._meta.get_field(source)
+    except FieldDoesNotExist:
+        raise NotCompilable(source)
+    if not field.concrete or field.many_to_many:
+        raise NotCompilable(source)
+    return field
+
+
+def converter_for(field, model_field):
+    # None for passthrough values, otherwise a callable applied to non-null values
+    if type(field) in PASSTHROUGH_FIELDS:
+        return None
+    if type(field) is serializers.BooleanField:
+        return bool
+    if type(field) is serializers.FloatField:
+        return lambda value: exact_float(field.to_representation(value))
+    if isinstance(field, serializers.DateTimeField) and not hasattr(field, 'timezone'):
+        # Resolve the active timezone once instead of once per value
+        field.timezone = field.default_timezone()
+    if isinstance(model_field, models.FileField):
+        # .values() returns the stored name; DRF expects the FieldFile
+        return lambda name: field.to_representation(model_field.attr_class(None, model_field, name))
+    return field.to_representation
+
+
+class FastListMixin:
+    """
+    Serve list() from .values() rows through a RowSerializer and FastJSONRenderer.
+
+    Falls back to the regular list() when the serializer (including any
+    ?fields= / ?expand= selection) does not compile.
+    """
+
+    def get_renderers(self):
+        renderers = super().get_renderers()
+        if getattr(self, 'action', None) == 'list':
+            renderers = [FastJSONRenderer() if type(renderer) is JSONRenderer else renderer
+                         for renderer in renderers]
+        return renderers
+
+    def list(self, request, *args, **kwargs):
+        try:
+            row_serializer = RowSerializer(self.get_serializer())
+        except NotCompilable:
+            return super().list(request, *args, **kwargs)
+
+        lookups = list(row_serializer.lookups)
+        paginator = self.paginator
+        for field in getattr(self, 'keyset_ordering', getattr(paginator, 'ordering', ())):
+            if field.lstrip('-') not in lookups:
+                lookups.append(field.lstrip('-'))
+        rows = self.filter_queryset(self.get_queryset()).values(*lookups)
+
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(row_serializer(page))
+        return Response(row_serializer(rows))
@@ -0,0 +1,151 @@
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
+
+
+def parse_paths(value):
+    # "id,title,recruiter.company_name" -> {'id': {}, 'title': {}, 'recruiter': {'company_name': {}}}
+    tree = {}
+    for path in (value or '').split(','):
+        node = tree
+        for name in filter(None, (part.strip() for part in path.split('.'))):
+            node = node.setdefault(name, {})
+    return tree
+
+
+def nested_serializer(field):
+    # The serializer behind a nested field, or None for plain fields
+    if isinstance(field, serializers.ListSerializer):
+        return field.child
+    if isinstance(field, serializers.BaseSerializer):
+        return field
+    return None
+
+
+class SparseFieldsetMixin:
+    """
+    ModelSerializer mixin that renders a subset of its fields.
+
+    fieldset: tree from parse_paths() naming the fields to render; nested names
+        may select their own sub-fields ("recruiter.company_name").
+    expand: tree naming nested serializers to render with all their fields.
+    compact: render `Meta.list_fields` wherever no fieldset is given.
+
+    Without any of these the serializer renders all fields as before.
+    """
+
+    def __init__(self, *args, fieldset=None, expand=None, compact=False, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.sparse = (fieldset or {}, expand or {}, compact) if (fieldset or expand or compact) else None
+
+    def get_fields(self):
+        fields = super().get_fields()
+        if self.sparse is None:
+            return fields
+        fieldset, expand, compact = self.sparse
+
+        if fieldset:
+            wanted = set(fieldset)
+        elif compact and hasattr(self.Meta, 'list_fields'):
+            wanted = set(self.Meta.list_fields)
+        else:
+            wanted = set(fields)
+        wanted |= set(expand)
+        unknown = wanted - set(fields)
+        if unknown:
+            raise serializers.ValidationError({'fields': [f'Unknown field: {name}' for name in sorted(unknown)]})
+
+        selected = {}
+        for name, field in fields.items():
+            if name not in wanted:
+                continue
+            nested = nested_serializer(field)
+            if isinstance(nested, SparseFieldsetMixin):
+                # An expanded relation is rendered in full at that level
+                nested.sparse = (fieldset.get(name, {}), expand.get(name, {}), compact and name not in expand)
+            selected[name] = field
+        return selected
+
+    def load_plan(self, prefix=''):
+        """
+        Columns and relations needed to render the selected fields.
+
+        Returns (columns, select_related, prefetch_related). columns is None when a
+        field reads something other than a model column, in which case nothing
+        may be deferred.
+        """
+        model = self.Meta.model
+        columns, select_related, prefetch_related = [], [], []
+        for field in self.fields.values():
+            if field.write_only:
+                continue
+            nested = nested_serializer(field)
+            if nested is not None:
+                path = prefix + field.source
+                if field is not nested or not isinstance(nested, SparseFieldsetMixin):
+                    # To-many or foreign nested serializers: load their rows in full
+                    (prefetch_related if field is not nested else select_related).append(path)
+                    columns = None
+                    continue
+                select_related.append(path)
+                nested_columns, nested_related, nested_prefetch = nested.load_plan(path + '__')
+                select_related += nested_related
+                prefetch_related += nested_prefetch
+                if columns is not None:
+                    columns = None if nested_columns is None else columns + [path] + nested_columns
+                continue
+            if columns is not None and not self.is_column(model, field.source):
+                columns = None
+            elif columns is not None:
+                columns.append(prefix + field.source)
+        return columns, select_related, prefetch_related
+
+    @staticmethod
+    def is_column(model, source):
+        try:
+            field = model._meta.get_field(source)
+        except FieldDoesNotExist:
+            return False
+        return field.concrete and not field.many_to_many
+
+
+def fieldset_queryset(queryset, serializer, keep=()):
+    # select_related what `serializer` nests and, if it is sparse, defer the columns it won't render
+    columns, select_related, prefetch_related = serializer.load_plan()
+    queryset = queryset.select_related(*select_related).prefetch_related(*prefetch_related)
+    if serializer.sparse is not None and columns is not None:
+        queryset = queryset.only(*columns, *keep)
+    return queryset
+
+
+def fieldset_kwargs(query_params):
+    # Serializer kwargs for ?fields= / ?expand=, empty when neither is given
+    fieldset = parse_paths(query_params.get('fields'))
+    expand = parse_paths(query_params.get('expand'))
+    return {'fieldset': fieldset, 'expand': expand} if fieldset or expand else {}
+
+
+class SparseFieldsetViewMixin:
+    """
+    ?fields= / ?expand= for read-only actions of a viewset whose serializer uses
+    SparseFieldsetMixin. List responses are compact by default, and querysets
+    defer every column the response does not render.
+    """
+    sparse_actions = ('list', 'retrieve')
+    compact_actions = ('list',)
+
+    def get_fieldset_kwargs(self):
+        request = getattr(self, 'request', None)
+        if request is None or request.method not in SAFE_METHODS or self.action not in self.sparse_actions:
+            return {}
+        return dict(fieldset_kwargs(request.query_params), compact=self.action in self.compact_actions)
+
+    def get_serializer(self, *args, **kwargs):
+        kwargs.update(self.get_fieldset_kwargs())
+        return super().get_serializer(*args, **kwargs)
+
+    def apply_fieldset(self, queryset):
+        serializer = self.get_serializer_class()(context=self.get_serializer_context(), **self.get_fieldset_kwargs())
+        # Keep the keyset pagination columns so paging never loads a deferred field
+        ordering = getattr(self, 'keyset_ordering', getattr(self.paginator, 'ordering', ()))
+        return fieldset_queryset(queryset, serializer, keep=[field.lstrip('-') for field in ordering])
@@ -0,0 +1,200 @@
+import csv
+import math
+from functools import lru_cache
+from pathlib import Path
+
+from django.db.models import F, FloatField, Q, Value
+from django.db.models.functions import Power, Sqrt
+from django.db.models.lookups import LessThanOrEqual
+
+# Offline gazetteer: one row per place, with `|`-separated aliases
+GAZETTEER_PATH = Path(__file__).with_name('gazetteer.csv')
+
+GEOHASH_ALPHABET = '0123456789bcdefghjkmnpqrstuvwxyz'
+# Stored cell precision; 6 characters is a cell of about 1.2 x 0.6 km
+GEO_CELL_LENGTH = 6
+KM_PER_DEGREE = 111.32
+MAX_RADIUS_KM = 500
+
+
+class InvalidLocation(ValueError):
+    pass
+
+
+def normalize_place(text):
+    return ' '.join((text or '').replace('.', ' ').split()).lower()
+
+
+@lru_cache(maxsize=1)
+def gazetteer():
+    # normalized name or alias -> (latitude, longitude)
+    places = {}
+    with open(GAZETTEER_PATH, newline='', encoding='utf-8') as handle:
+        for row in csv.DictReader(handle):
+            point = (float(row['latitude']), float(row['longitude']))
+            for name in [row['name'], *row['aliases'].split('|')]:
+                if normalize_place(name):
+                    places.setdefault(normalize_place(name), point)
+    return places
+
+
+def geocode(location):
+    """
+    (latitude, longitude) for a free-text location, or None when the gazetteer
+    does not know it. Tries the whole text, then each comma-separated part, so
+    "Berlin, Germany" and "Austin, TX" resolve to their city.
+    """
+    places = gazetteer()
+    text = normalize_place(location)
+    if text in places:
+        return places[text]
+    for part in (location or '').split(','):
+        part = normalize_place(part)
+        if part in places:
+            return places[part]
+    return None
+
+
+def geohash(latitude, longitude, length=GEO_CELL_LENGTH):
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars, bits, value, even = [], 0, 0, True
+    while len(chars) < length:
+        # Bits alternate between longitude and latitude, longitude first
+        interval, coordinate = (lon_range, longitude) if even else (lat_range, latitude)
+        middle = (interval[0] + interval[1]) / 2
+        value <<= 1
+        if coordinate >= middle:
+            value |= 1
+            interval[0] = middle
+        else:
+            interval[1] = middle
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(GEOHASH_ALPHABET[value])
+            bits, value = 0, 0
+    return ''.join(chars)
+
+
+def cell_size(length):
+    # (height, width) of a geohash cell in degrees
+    lon_bits = (5 * length + 1) // 2
+    lat_bits = 5 * length // 2
+    return 180.0 / 2 ** lat_bits, 360.0 / 2 ** lon_bits
+
+
+def geo_fields(location):
+    # Values for the latitude / longitude / geo_cell columns of a location
+    point = geocode(location)
+    if point is None:
+        return {'latitude': None, 'longitude': None, 'geo_cell': None}
+    return {'latitude': point[0], 'longitude': point[1], 'geo_cell': geohash(*point)}
+
+
+def geo_point(instance):
+    # (latitude, longitude) of a geocoded Job or Profile, or None
+    if instance.latitude is None or instance.longitude is None:
+        return None
+    return instance.latitude, instance.longitude
+
+
+def covering_cells(latitude, longitude, radius_km):
+    """
+    Geohash prefixes whose cells together cover the circle: the cell holding the
+    centre and its eight neighbours, at the finest precision whose cells are
+    still at least `radius_km` across. Empty when the circle needs no cell filter.
+    """
+    km_per_lon_degree = KM_PER_DEGREE * max(math.cos(math.radians(latitude)), 0.01)
+    length = 0
+    for candidate in range(1, GEO_CELL_LENGTH + 1):
+        height, width = cell_size(candidate)
+        if height * KM_PER_DEGREE < radius_km or width * km_per_lon_degree < radius_km:
+            break
+        length = candidate
+    if length == 0:
+        return []
+    height, width = cell_size(length)
+    cells = set()
+    for lat_step in (-1, 0, 1):
+        for lon_step in (-1, 0, 1):
+            lat = min(max(latitude + lat_step * height, -90.0), 90.0)
+            lon = (longitude + lon_step * width + 180.0) % 360.0 - 180.0
+            cells.add(geohash(lat, lon, length))
+    return sorted(cells)
+
+
+def cell_filter(cells, field='geo_cell'):
+    # Prefix match as a range, so both MySQL and SQLite use the column's index
+    q = Q()
+    for cell in cells:
+        q |= Q(**{f'{field}__gte': cell, f'{field}__lt': cell + '~'})
+    return q
+
+
+def distance_km(latitude, longitude, prefix=''):
+    """
+    Expression for the distance from (latitude, longitude) to the row's point in
+    km. Equirectangular: accurate to well under 1% within MAX_RADIUS_KM.
+    """
+    scale = math.cos(math.radians(latitude))
+    d_lat = F(f'{prefix}latitude') - Value(latitude)
+    d_lon = (F(f'{prefix}longitude') - Value(longitude)) * Value(scale)
+    return Value(KM_PER_DEGREE) * Sqrt(Power(d_lat, 2) + Power(d_lon, 2), output_field=FloatField())
+
+
+def within_radius(latitude, longitude, radius_km, prefix=''):
+    # Q for rows within `radius_km`: the cell prefixes narrow the index scan, the distance is exact
+    cells = covering_cells(latitude, longitude, radius_km)
+    return cell_filter(cells, f'{prefix}geo_cell') & Q(
+        LessThanOrEqual(distance_km(latitude, longitude, prefix), radius_km)
+    )
+
+
+class Near:
+    # A search circle from request parameters
+
+    def __init__(self, latitude, longitude, radius_km):
+        self.latitude = latitude
+        self.longitude = longitude
+        self.radius_km = radius_km
+
+    def q(self, prefix=''):
+        return within_radius(self.latitude, self.longitude, self.radius_km, prefix)
+
+    def distance(self, prefix=''):
+        return distance_km(self.latitude, self.longitude, prefix)
+
+
+def parse_float(params, name):
+    try:
+        return float(params[name])
+    except (TypeError, ValueError):
+        raise InvalidLocation(f'Invalid {name}')
+
+
+def parse_near(params, origin=None):
+    """
+    Near from ?radius_km= and a centre: ?lat= & ?lon=, else a place name in ?near=,
+    else `origin` (e.g. the user's own geocoded location). None without ?radius_km=.
+    Raises InvalidLocation for bad values or a centre that can't be resolved.
+    """
+    if params.get('radius_km') in (None, ''):
+        return None
+    radius_km = parse_float(params, 'radius_km')
+    if not 0 < radius_km <= MAX_RADIUS_KM:
+        raise InvalidLocation(f'radius_km must be between 0 and {MAX_RADIUS_KM}')
+
+    if params.get('lat') not in (None, '') or params.get('lon') not in (None, ''):
+        latitude, longitude = parse_float(params, 'lat'), parse_float(params, 'lon')
+        if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+            raise InvalidLocation('Invalid lat/lon')
+    elif params.get('near'):
+        point = geocode(params['near'])
+        if point is None:
+            raise InvalidLocation('Unknown place')
+        latitude, longitude = point
+    elif origin is not None:
+        latitude, longitude = origin
+    else:
+        raise InvalidLocation('lat/lon or near is required with radius_km')
+    return Near(latitude, longitude, radius_km)
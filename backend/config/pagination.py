@@ -0,0 +1,158 @@
+import base64
+import datetime
+import json
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import DateTimeField, Q
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+EPOCH = datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+def encode_cursor(*values):
+    # Opaque, URL-safe cursor over a tuple of integers
+    raw = json.dumps(values, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor, length):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (ValueError, TypeError):
+        raise InvalidCursor(cursor)
+    if not isinstance(values, list) or len(values) != length or not all(isinstance(v, int) for v in values):
+        raise InvalidCursor(cursor)
+    return values
+
+
+def keyset_filter(fields, values, descending):
+    # Rows strictly after `values` in (fields...) order:
+    # (a < x) OR (a = x AND b < y) OR ... for descending order
+    lookup = 'lt' if descending else 'gt'
+    conditions = []
+    for position, field in enumerate(fields):
+        equal = dict(zip(fields[:position], values[:position]))
+        conditions.append(Q(**equal, **{f'{field}__{lookup}': values[position]}))
+    return reduce(or_, conditions)
+
+
+def row_value(row, field):
+    # Pages hold model instances, or .values() dicts on fast read paths
+    return row[field] if isinstance(row, dict) else getattr(row, field)
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination over an indexed (created_at, id) ordering.
+
+    Each page is a LIMIT query that starts after the last row of the previous page,
+    so deep pages cost the same as the first one and rows inserted meanwhile never
+    shift or repeat entries. Views may override the order with `keyset_ordering`.
+    """
+    page_size = api_settings.PAGE_SIZE or 20
+    max_page_size = 100
+    page_size_query_param = 'limit'
+    cursor_query_param = 'cursor'
+    ordering = ('-created_at', '-id')
+    # Return each page in the opposite order it was walked in (e.g. oldest-first chat pages)
+    reverse_page = False
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        ordering = getattr(view, 'keyset_ordering', self.ordering)
+        self.fields = [field.lstrip('-') for field in ordering]
+        self.model = queryset.model
+        descending = ordering[0].startswith('-')
+
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor:
+            try:
+                values = decode_cursor(cursor, len(self.fields))
+            except InvalidCursor:
+                # A client error, as on the deck endpoints
+                raise ValidationError({'cursor': 'Invalid cursor'})
+            values = [self.from_cursor_value(field, value) for field, value in zip(self.fields, values)]
+            queryset = queryset.filter(keyset_filter(self.fields, values, descending))
+
+        size = self.get_page_size(request)
+        page = list(queryset.order_by(*ordering)[:size + 1])
+
+        self.next_cursor = None
+        if len(page) > size:
+            page = page[:size]
+            last = page[-1]
+            self.next_cursor = encode_cursor(*[self.to_cursor_value(field, row_value(last, field)) for field in self.fields])
+        if self.reverse_page:
+            page.reverse()
+        return page
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, TypeError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def is_datetime(self, field):
+        # Annotations (e.g. a relevance score) are not model fields
+        try:
+            return isinstance(self.model._meta.get_field(field), DateTimeField)
+        except FieldDoesNotExist:
+            return False
+
+    def to_cursor_value(self, field, value):
+        # Datetimes travel as integer microseconds since the epoch
+        if self.is_datetime(field):
+            if timezone.is_naive(value):
+                value = timezone.make_aware(value, datetime.timezone.utc)
+            return (value - EPOCH) // datetime.timedelta(microseconds=1)
+        return value
+
+    def from_cursor_value(self, field, value):
+        if self.is_datetime(field):
+            value = EPOCH + datetime.timedelta(microseconds=value)
+            return value if settings.USE_TZ else timezone.make_naive(value, datetime.timezone.utc)
+        return value
+
+    def get_next_link(self):
+        if self.next_cursor is None:
+            return None
+        return replace_query_param(self.request.build_absolute_uri(), self.cursor_query_param, self.next_cursor)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'next_cursor': self.next_cursor,
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'next_cursor': {'type': 'string', 'nullable': True},
+                'results': schema,
+            },
+        }
+
+
+class MessagePagination(KeysetPagination):
+    # Newest page first; `next` loads older messages. Each page reads oldest -> newest.
+    page_size = 50
+    ordering = ('-created_at', '-id')
+    reverse_page = True
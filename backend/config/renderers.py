@@ -0,0 +1,41 @@
+import orjson
+from rest_framework.renderers import JSONRenderer
+
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+LINE_SEPARATOR = '\u2028'.encode()
+PARAGRAPH_SEPARATOR = '\u2029'.encode()
+
+
+class ReprFloat(float):
+    """A float orjson would format differently; FastJSONRenderer can't encode it."""
+
+
+def exact_float(value):
+    # repr() switches to exponent notation outside [1e-4, 1e16)
+    if value == 0 or 1e-4 <= abs(value) < 1e16:
+        return value
+    return ReprFloat(value)
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer that encodes with orjson and produces the same bytes.
+
+    Types orjson would format differently (datetimes, dataclasses, Decimal, lazy
+    strings...) go through DRF's encoder. orjson writes floats like repr() except
+    where repr() uses an exponent (1e-05, 1e+16) or the value is not finite:
+    pass floats through exact_float() and such values fall back to JSONRenderer.
+    Indented output and non-default JSON settings fall back as well.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None or self.ensure_ascii or not self.compact or not self.strict:
+            return super().render(data, accepted_media_type, renderer_context)
+        if self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(data, default=self.encoder_class().default, option=ORJSON_OPTIONS)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        # Same strict-javascript-subset escaping as JSONRenderer
+        return ret.replace(LINE_SEPARATOR, b'\\u2028').replace(PARAGRAPH_SEPARATOR, b'\\u2029')
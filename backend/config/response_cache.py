@@ -0,0 +1,134 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from rest_framework.response import Response
+
+DEFAULT_SETTINGS = {
+    'CACHE_ALIAS': 'default',
+    'TIMEOUT': 300,
+    'KEY_PREFIX': 'resp',
+}
+
+
+def cache_settings():
+    return {**DEFAULT_SETTINGS, **getattr(settings, 'RESPONSE_CACHE', {})}
+
+
+def get_cache():
+    return caches[cache_settings()['CACHE_ALIAS']]
+
+
+def version_key(scope):
+    return f"{cache_settings()['KEY_PREFIX']}:v:{scope}"
+
+
+def new_version():
+    # Versions start from the clock, so a version key lost to eviction is never
+    # recreated with a value whose entries are still cached
+    return time.time_ns()
+
+
+def scope_version(scope):
+    cache = get_cache()
+    key = version_key(scope)
+    version = cache.get(key)
+    if version is None:
+        version = new_version()
+        if not cache.add(key, version, None):
+            version = cache.get(key, version)
+    return version
+
+
+def bump_scopes(*scopes):
+    # Invalidate every response cached under `scopes`
+    cache = get_cache()
+    for scope in scopes:
+        try:
+            cache.incr(version_key(scope))
+        except ValueError:
+            cache.set(version_key(scope), new_version(), None)
+
+
+def invalidate_scopes(*scopes):
+    # Now, and again after commit so a reader can't keep pre-commit rows under the new version
+    bump_scopes(*scopes)
+    transaction.on_commit(lambda: bump_scopes(*scopes))
+
+
+def count(namespace, outcome):
+    cache = get_cache()
+    key = f"{cache_settings()['KEY_PREFIX']}:stats:{namespace}:{outcome}"
+    try:
+        cache.incr(key)
+    except ValueError:
+        if not cache.add(key, 1, None):
+            cache.incr(key)
+
+
+def cache_stats(namespace):
+    prefix = f"{cache_settings()['KEY_PREFIX']}:stats:{namespace}"
+    values = get_cache().get_many([f'{prefix}:hits', f'{prefix}:misses'])
+    hits, misses = values.get(f'{prefix}:hits', 0), values.get(f'{prefix}:misses', 0)
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_rate': hits / (hits + misses) if hits + misses else None,
+    }
+
+
+def reset_cache_stats(namespace):
+    prefix = f"{cache_settings()['KEY_PREFIX']}:stats:{namespace}"
+    get_cache().delete_many([f'{prefix}:hits', f'{prefix}:misses'])
+
+
+def request_digest(request, *parts):
+    # Host and path (they appear in pagination links) plus the sorted query parameters
+    params = sorted((key, value) for key in request.query_params for value in request.query_params.getlist(key))
+    raw = repr((request.get_host(), request.path, params, parts))
+    return hashlib.md5(raw.encode(), usedforsecurity=False).hexdigest()
+
+
+class VersionedResponseCacheMixin:
+    """
+    Caches list/retrieve response data per scope and request parameters.
+
+    Views return the scope their response depends on from get_cache_scope(), or
+    None to bypass the cache. Writes call bump_scopes() for the scopes they
+    affect, which moves every later lookup to fresh keys; stale entries are never
+    read again and age out with the cache timeout. Hits and misses are counted
+    per `cache_namespace`.
+    """
+    cache_namespace = None
+    cached_actions = ('list', 'retrieve')
+
+    def get_cache_scope(self):
+        raise NotImplementedError
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(super().retrieve, request, *args, **kwargs)
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        scope = self.get_cache_scope() if self.action in self.cached_actions else None
+        if scope is None:
+            return handler(request, *args, **kwargs)
+
+        cache = get_cache()
+        digest = request_digest(request, self.action, sorted(kwargs.items()))
+        key = f"{cache_settings()['KEY_PREFIX']}:{self.cache_namespace}:{scope}:{scope_version(scope)}:{digest}"
+        data = cache.get(key)
+        if data is not None:
+            count(self.cache_namespace, 'hits')
+            return Response(data, headers={'X-Cache': 'HIT'})
+
+        count(self.cache_namespace, 'misses')
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            cache.set(key, response.data, cache_settings()['TIMEOUT'])
+        response['X-Cache'] = 'MISS'
+        return response
@@ -29,6 +29,7 @@ INSTALLED_APPS = [
     'users',
     'jobs',
     'matching',
+    'tasks',
 ]
 
 MIDDLEWARE = [
@@ -38,6 +39,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'users.middleware.RequestIdentityMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -61,6 +63,15 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'config.wsgi.application'
+ASGI_APPLICATION = 'config.asgi.application'
+
+# Channel layer for WebSocket fan-out. The in-memory layer only reaches sockets
+# in the same process; use channels_redis.core.RedisChannelLayer across nodes.
+CHANNEL_LAYERS = {
+    'default': {
+        'BACKEND': 'channels.layers.InMemoryChannelLayer',
+    },
+}
 
 # Database
 DATABASES = {
@@ -105,6 +116,9 @@ STATIC_URL = 'static/'
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Partial indexes (e.g. message_unread_idx) are skipped on MySQL but used on SQLite/PostgreSQL
+SILENCED_SYSTEM_CHECKS = ['models.W037']
+
 # REST Framework settings
 REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
@@ -116,6 +130,74 @@ REST_FRAMEWORK = {
     ],
 }
 
+# Reciprocal right-swipe index used for match detection (matching/right_swipes.py).
+# CacheRightSwipeIndex stores entries in a Django cache so processes can share them.
+RIGHT_SWIPE_INDEX = {
+    'BACKEND': 'matching.right_swipes.LocalRightSwipeIndex',
+    'OPTIONS': {
+        'max_entries': 100000,
+        'warm_limit': 50000,
+    },
+}
+
+# Precomputed next cards of each user's deck (matching/deck_queue.py), refilled in the
+# background. CacheDeckQueue keeps the queues in a Django cache shared by processes.
+DECK_QUEUE = {
+    'BACKEND': 'matching.deck_queue.LocalDeckQueue',
+    'OPTIONS': {
+        'size': 50,
+        'low_water': 15,
+        'max_users': 10000,
+        'workers': 2,
+    },
+}
+
+# Per-job funnel counters (matching/funnel.py): deck views are buffered in memory and
+# written in batches on a worker thread once VIEW_FLUSH_THRESHOLD are pending or every
+# VIEW_FLUSH_INTERVAL seconds.
+JOB_FUNNEL = {
+    'VIEW_FLUSH_THRESHOLD': 1000,
+    'VIEW_FLUSH_INTERVAL': 10,
+    'VIEW_FLUSH_BACKGROUND': True,
+}
+
+# Background tasks (tasks/queue.py). DatabaseBroker stores them in the database for
+# `manage.py run_tasks`; ThreadPoolBroker runs them in-process (tests, development).
+TASK_QUEUE = {
+    'BACKEND': 'tasks.brokers.DatabaseBroker',
+    'OPTIONS': {
+        'lease': 300,
+    },
+}
+
+# Match and unread-message emails are sent by tasks; printed to the console until
+# an SMTP backend is configured
+EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
+DEFAULT_FROM_EMAIL = 'SwipeHire <no-reply@swipehire.app>'
+
+# Local memory for development and tests; point CACHES at a shared backend
+# (Redis, Memcached) in production so processes share cached data.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+}
+
+# Versioned response cache (config/response_cache.py), used by the job endpoints
+RESPONSE_CACHE = {
+    'CACHE_ALIAS': 'default',
+    'TIMEOUT': 300,
+}
+
+# Cached token -> user and user -> profile lookups (users/identity.py),
+# invalidated on logout and on user or profile changes. Invalidation reaches
+# other processes only through a shared cache; with the local-memory default a
+# revoked token keeps working elsewhere for up to TIMEOUT seconds.
+AUTH_CACHE = {
+    'CACHE_ALIAS': 'default',
+    'TIMEOUT': 60,
+}
+
 # CORS settings
 # In backend/config/settings.py
 CORS_ALLOW_ALL_ORIGINS = True
@@ -128,9 +210,12 @@ MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'users.authentication.CachedTokenAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
+    # Keyset pagination on (created_at, id); see config/pagination.py
+    'DEFAULT_PAGINATION_CLASS': 'config.pagination.KeysetPagination',
+    'PAGE_SIZE': 20,
 }
\ No newline at end of file
@@ -0,0 +1,40 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from users.identity import cached_profile, cached_token
+
+
+class QueryBudgetMixin:
+    """
+    Pins the number of SQL queries an endpoint may issue.
+
+    assertQueryBudget() requests the URL, adds more rows with `grow`, and
+    requests it again: both requests must stay within `budget` and issue the
+    same number of queries, so a per-row (N+1) lookup fails even if it happens
+    to fit the budget for a small fixture. api_client() warms the token and
+    profile caches (users/identity.py), as earlier requests would on a live server.
+    """
+
+    def api_client(self, user):
+        client = APIClient()
+        token, _ = Token.objects.get_or_create(user=user)
+        client.credentials(HTTP_AUTHORIZATION='Token ' + token.key)
+        cached_token(token.key)
+        cached_profile(user.id)
+        return client
+
+    def count_queries(self, client, url, data=None):
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(url, data)
+        self.assertEqual(response.status_code, 200, getattr(response, 'data', response))
+        return len(queries), queries
+
+    def assertQueryBudget(self, client, url, budget, grow, data=None):
+        small, _ = self.count_queries(client, url, data)
+        grow()
+        large, queries = self.count_queries(client, url, data)
+        sql = '\n'.join(query['sql'] for query in queries.captured_queries)
+        self.assertLessEqual(large, budget, f'{url} issued {large} queries (budget {budget}):\n{sql}')
+        self.assertEqual(small, large, f'{url} query count grows with the result size ({small} -> {large}):\n{sql}')
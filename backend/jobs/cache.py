@@ -0,0 +1,14 @@
+from config.response_cache import invalidate_scopes
+
+# Response cache scopes for job listings and details (see JobViewSet)
+JOB_CACHE_NAMESPACE = 'jobs'
+ACTIVE_JOBS_SCOPE = 'jobs:active'
+
+
+def recruiter_jobs_scope(recruiter_id):
+    return f'jobs:recruiter:{recruiter_id}'
+
+
+def invalidate_recruiter_jobs(recruiter_id):
+    # A recruiter's jobs appear in their own listing and, while active, in the shared one
+    invalidate_scopes(ACTIVE_JOBS_SCOPE, recruiter_jobs_scope(recruiter_id))
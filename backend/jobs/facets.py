@@ -0,0 +1,71 @@
+from django.db.models import Count, Q
+
+from .models import Job
+from .search import filter_conditions, match_text, salary_overlap
+
+# Salary buckets as (min, max); None leaves that side open. A job falls in every
+# bucket its advertised range overlaps, as with the ?salary_min= / ?salary_max= filter.
+SALARY_BUCKETS = (
+    (None, 30000),
+    (30000, 60000),
+    (60000, 90000),
+    (90000, 120000),
+    (120000, None),
+)
+
+
+def salary_label(salary_min, salary_max):
+    if salary_min is None:
+        return f'<{salary_max}'
+    if salary_max is None:
+        return f'{salary_min}+'
+    return f'{salary_min}-{salary_max}'
+
+
+def facet_values():
+    # facet -> [(value, label, condition)], in display order
+    return {
+        'job_type': [(value, label, Q(job_type=value)) for value, label in Job.JOB_TYPE_CHOICES],
+        'experience_level': [(value, label, Q(experience_level=value)) for value, label in Job.EXPERIENCE_LEVEL_CHOICES],
+        'is_remote': [(True, 'Remote', Q(is_remote=True)), (False, 'On site', Q(is_remote=False))],
+        'salary': [
+            ({'salary_min': low, 'salary_max': high}, salary_label(low, high), salary_overlap(low, high))
+            for low, high in SALARY_BUCKETS
+        ],
+    }
+
+
+def facet_counts(queryset, params):
+    """
+    Counts per facet value for the search described by `params` (see jobs/search.py).
+
+    Every count comes from one aggregate query: each value is a COUNT with a
+    FILTER (CASE on MySQL) over the text matches. A facet's own filter is left
+    out of its counts, so the UI can show how many jobs each alternative value
+    would return. Raises InvalidSearch for a malformed filter.
+    """
+    conditions = filter_conditions(params)
+    # Filters that are not facets (e.g. location) narrow every count
+    for name in list(conditions):
+        if name not in ('job_type', 'experience_level', 'is_remote', 'salary'):
+            queryset = queryset.filter(conditions.pop(name))
+    queryset, _, _ = match_text(queryset, params.get('q'))
+
+    values = facet_values()
+    aggregates = {'total': Count('id', filter=Q(*conditions.values()))}
+    for facet, choices in values.items():
+        others = Q(*[condition for name, condition in conditions.items() if name != facet])
+        for index, (_, _, condition) in enumerate(choices):
+            aggregates[f'{facet}_{index}'] = Count('id', filter=others & condition)
+    counts = queryset.aggregate(**aggregates)
+
+    return {
+        'total': counts['total'],
+        'facets': {
+            facet: [
+                {'value': value, 'label': label, 'count': counts[f'{facet}_{index}']}
+                for index, (value, label, _) in enumerate(choices)
+            ]
+            for facet, choices in values.items()
+        },
+    }
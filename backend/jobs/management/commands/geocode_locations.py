@@ -0,0 +1,52 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from config.geo import geo_fields
+from config.response_cache import invalidate_scopes
+from jobs.cache import ACTIVE_JOBS_SCOPE, recruiter_jobs_scope
+from jobs.models import Job
+from users.identity import invalidate
+from users.models import Profile
+
+
+def geocode_rows(model, refresh=False, fields=('id',)):
+    # One lookup and UPDATE per distinct location; locations repeat heavily. Returns the
+    # `fields` of each row updated, read just before its UPDATE
+    queryset = model.objects.all() if refresh else model.objects.filter(geo_cell__isnull=True)
+    updated = []
+    for location in queryset.order_by().values_list('location', flat=True).distinct().iterator():
+        geo = geo_fields(location)
+        if refresh or geo['geo_cell'] is not None:
+            rows = queryset.filter(location=location)
+            updated += rows.values_list(*fields)
+            rows.update(**geo)
+    return updated
+
+
+def invalidate_geocoded(profiles, jobs):
+    # .update() sends no post_save, so drop what the signal handlers would have: cached
+    # profiles, and job responses nesting the job or its recruiter's profile
+    invalidate(user_ids=[user_id for user_id, _ in profiles])
+    recruiter_ids = {recruiter_id for _, recruiter_id in profiles if recruiter_id is not None}
+    recruiter_ids.update(recruiter_id for recruiter_id, in jobs)
+    if recruiter_ids:
+        invalidate_scopes(ACTIVE_JOBS_SCOPE, *map(recruiter_jobs_scope, sorted(recruiter_ids)))
+
+
+class Command(BaseCommand):
+    help = ('Fill in the latitude, longitude and geo_cell of jobs and profiles from their location text, '
+            'e.g. after upgrading existing data or extending the gazetteer')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--refresh', action='store_true',
+                            help='Geocode every row again, not only those without coordinates')
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        profiles = geocode_rows(Profile, options['refresh'], ('user_id', 'recruiterprofile__id'))
+        jobs = geocode_rows(Job, options['refresh'], ('recruiter_id',))
+        invalidate_geocoded(profiles, jobs)
+        for model, rows in ((Profile, profiles), (Job, jobs)):
+            self.stdout.write(f'Geocoded {len(rows)} {model._meta.verbose_name_plural}')
+        self.stdout.write(f'Done in {time.perf_counter() - start:.2f} s')
@@ -0,0 +1,64 @@
+# Generated by Django 5.2.18 on 2026-10-17 07:04
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def parse_skills(text):
+    names = []
+    for part in (text or '').split(','):
+        name = ' '.join(part.split()).lower()[:100]
+        if name and name not in names:
+            names.append(name)
+    return names
+
+
+def backfill_job_skills(apps, schema_editor):
+    Skill = apps.get_model('users', 'Skill')
+    Job = apps.get_model('jobs', 'Job')
+    JobSkill = apps.get_model('jobs', 'JobSkill')
+
+    skill_ids = dict(Skill.objects.values_list('name', 'id'))
+    links = []
+    for owner_id, text in Job.objects.values_list('id', 'skills_required').iterator():
+        for name in parse_skills(text):
+            if name not in skill_ids:
+                skill_ids[name] = Skill.objects.create(name=name).id
+            links.append(JobSkill(job_id=owner_id, skill_id=skill_ids[name]))
+        if len(links) >= 1000:
+            JobSkill.objects.bulk_create(links, ignore_conflicts=True)
+            links = []
+    JobSkill.objects.bulk_create(links, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0002_application_cover_letter_job_experience_level_and_more'),
+        ('users', '0003_skill_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobSkill',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='skill_links', to='jobs.job')),
+                ('skill', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='job_links', to='users.skill')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='normalized_skills',
+            field=models.ManyToManyField(blank=True, related_name='jobs', through='jobs.JobSkill', to='users.skill'),
+        ),
+        migrations.AddIndex(
+            model_name='jobskill',
+            index=models.Index(fields=['skill', 'job'], name='jobskill_skill_job_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='jobskill',
+            unique_together={('job', 'skill')},
+        ),
+        migrations.RunPython(backfill_job_skills, migrations.RunPython.noop),
+    ]
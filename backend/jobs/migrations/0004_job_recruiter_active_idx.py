@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 07:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0003_job_skill_index'),
+        ('users', '0003_skill_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['recruiter', 'is_active'], name='job_recruiter_active_idx'),
+        ),
+    ]
@@ -0,0 +1,75 @@
+# Generated by Django 5.2.18 on 2026-10-17 08:02
+
+from django.db import migrations, models
+
+# Keep in step with jobs/search.py. SQLite drops triggers along with their table, so
+# a later migration that makes Django rebuild jobs_job on SQLite must recreate them.
+FTS_TABLE = 'jobs_job_fts'
+FULLTEXT_INDEX = 'job_search_fulltext_idx'
+
+SQLITE_FTS = [
+    # External-content table: the text lives in jobs_job, the FTS table only holds the index
+    f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5("
+    # Prefix indexes serve the type-ahead prefix query on the last search term
+    "title, description, requirements, content='jobs_job', content_rowid='id', prefix='3 4')",
+    f"""CREATE TRIGGER {FTS_TABLE}_insert AFTER INSERT ON jobs_job BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, title, description, requirements)
+        VALUES (new.id, new.title, new.description, new.requirements);
+    END""",
+    f"""CREATE TRIGGER {FTS_TABLE}_delete AFTER DELETE ON jobs_job BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description, requirements)
+        VALUES ('delete', old.id, old.title, old.description, old.requirements);
+    END""",
+    f"""CREATE TRIGGER {FTS_TABLE}_update AFTER UPDATE OF title, description, requirements ON jobs_job BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description, requirements)
+        VALUES ('delete', old.id, old.title, old.description, old.requirements);
+        INSERT INTO {FTS_TABLE}(rowid, title, description, requirements)
+        VALUES (new.id, new.title, new.description, new.requirements);
+    END""",
+    # Index the jobs that already exist
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')",
+]
+
+SQLITE_FTS_REVERSE = [
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_insert',
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_delete',
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_update',
+    f'DROP TABLE IF EXISTS {FTS_TABLE}',
+]
+
+# InnoDB maintains FULLTEXT indexes itself on every write
+MYSQL_FULLTEXT = [f'CREATE FULLTEXT INDEX {FULLTEXT_INDEX} ON jobs_job (title, description, requirements)']
+MYSQL_FULLTEXT_REVERSE = [f'DROP INDEX {FULLTEXT_INDEX} ON jobs_job']
+
+
+def run_for_vendor(statements):
+    def run(apps, schema_editor):
+        for statement in statements.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0005_keyset_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['is_active', 'job_type', 'experience_level'], name='job_active_type_level_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['is_active', 'location'], name='job_active_location_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['is_active', 'salary_max', 'salary_min'], name='job_active_salary_idx'),
+        ),
+        migrations.RunPython(
+            run_for_vendor({'sqlite': SQLITE_FTS, 'mysql': MYSQL_FULLTEXT}),
+            run_for_vendor({'sqlite': SQLITE_FTS_REVERSE, 'mysql': MYSQL_FULLTEXT_REVERSE}),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-17 07:51
+
+from django.db import migrations, models
+
+# Nullable columns, so SQLite adds them in place and keeps the FTS triggers on jobs_job.
+# Existing rows are filled in by `manage.py geocode_locations`, not here, so this
+# migration does not depend on the current geocoding code.
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0006_job_search_index'),
+        ('users', '0004_geocoded_location'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='geo_cell',
+            field=models.CharField(blank=True, max_length=12, null=True),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='latitude',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='longitude',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['is_active', 'geo_cell'], name='job_active_geo_cell_idx'),
+        ),
+    ]
@@ -1,5 +1,5 @@
 from django.db import models
-from users.models import RecruiterProfile, JobSeekerProfile
+from users.models import RecruiterProfile, JobSeekerProfile, Skill
 
 class Job(models.Model):
     JOB_TYPE_CHOICES = (
@@ -21,6 +21,10 @@ class Job(models.Model):
     description = models.TextField()
     requirements = models.TextField()
     location = models.CharField(max_length=100)
+    # Geocoded from `location` on save (config/geo.py); null when it isn't a known place
+    latitude = models.FloatField(null=True, blank=True)
+    longitude = models.FloatField(null=True, blank=True)
+    geo_cell = models.CharField(max_length=12, null=True, blank=True)
     job_type = models.CharField(max_length=20, choices=JOB_TYPE_CHOICES, default='full_time')
     experience_level = models.CharField(max_length=20, choices=EXPERIENCE_LEVEL_CHOICES, default='entry')
     salary_min = models.IntegerField(null=True, blank=True)
@@ -30,9 +34,39 @@ class Job(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     is_active = models.BooleanField(default=True)
+    # Indexed copy of `skills_required`, kept in sync on save
+    normalized_skills = models.ManyToManyField(Skill, through='JobSkill', related_name='jobs', blank=True)
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['recruiter', 'is_active'], name='job_recruiter_active_idx'),
+            # Keyset pagination of the job list: seekers by is_active, recruiters by recruiter
+            models.Index(fields=['is_active', 'created_at', 'id'], name='job_active_created_idx'),
+            models.Index(fields=['recruiter', 'created_at', 'id'], name='job_recruiter_created_idx'),
+            # Structured search filters (jobs/search.py)
+            models.Index(fields=['is_active', 'job_type', 'experience_level'], name='job_active_type_level_idx'),
+            models.Index(fields=['is_active', 'location'], name='job_active_location_idx'),
+            models.Index(fields=['is_active', 'salary_max', 'salary_min'], name='job_active_salary_idx'),
+            # Radius filters scan geohash prefixes (config/geo.py)
+            models.Index(fields=['is_active', 'geo_cell'], name='job_active_geo_cell_idx'),
+        ]
     
     def __str__(self):
         return f"{self.title} at {self.recruiter.company_name}"
+
+class JobSkill(models.Model):
+    job = models.ForeignKey(Job, on_delete=models.CASCADE, related_name='skill_links')
+    skill = models.ForeignKey(Skill, on_delete=models.CASCADE, related_name='job_links')
+    
+    class Meta:
+        unique_together = ('job', 'skill')
+        indexes = [
+            # Inverted index: skill -> jobs
+            models.Index(fields=['skill', 'job'], name='jobskill_skill_job_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.job.title} - {self.skill}"
     
 class Application(models.Model):
     STATUS_CHOICES = (
@@ -52,6 +86,9 @@ class Application(models.Model):
     
     class Meta:
         unique_together = ('job', 'job_seeker')
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='application_created_idx'),
+        ]
         
     def __str__(self):
         return f"{self.job_seeker.profile.user.username} applied to {self.job.title}"
\ No newline at end of file
@@ -0,0 +1,233 @@
+import re
+
+from django.db import connection
+from django.db.models import Q, Value, IntegerField
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Cast, Coalesce, Round
+
+from config.geo import InvalidLocation, parse_near
+from .models import Job
+
+# Full-text index over these Job columns: an FTS5 table kept in sync by triggers on
+# SQLite, a FULLTEXT index on MySQL (see migration 0006_job_search_index)
+SEARCH_COLUMNS = ('title', 'description', 'requirements')
+FTS_TABLE = 'jobs_job_fts'
+FULLTEXT_INDEX = 'job_search_fulltext_idx'
+# bm25() column weights: a title hit counts most, then requirements
+FTS_WEIGHTS = (10.0, 1.0, 2.0)
+MAX_SEARCH_TERMS = 10
+# Shorter last terms match whole words only; longer ones also as prefixes, served by
+# the FTS5 prefix index
+MIN_PREFIX_LENGTH = 3
+# Matches ranked per search, newest first. A deliberate limit: older matches are
+# left out of the results, and search responses say so with `truncated`
+SEARCH_POOL_SIZE = 1000
+# Relevance is kept in cursors as an integer, like deck scores
+RANK_SCALE = 10000
+# Most relevant first; ties (and searches without ?q=) newest first
+SEARCH_ORDERING = ('-search_rank', '-id')
+
+TERM_RE = re.compile(r'\w+')
+BOOLEAN_PARAMS = {'true': True, '1': True, 'false': False, '0': False}
+
+
+class InvalidSearch(ValueError):
+    pass
+
+
+def search_terms(query):
+    # Words only: FTS5 and MySQL boolean mode both give punctuation a meaning
+    return TERM_RE.findall((query or '').lower())[:MAX_SEARCH_TERMS]
+
+
+def fts_sqlite(queryset, terms):
+    # Every term must match; the last one also as a prefix for type-ahead
+    match = ' '.join(f'"{term}"' for term in terms)
+    if len(terms[-1]) >= MIN_PREFIX_LENGTH:
+        match += '*'
+    weights = ', '.join(str(weight) for weight in FTS_WEIGHTS)
+    queryset = queryset.extra(
+        tables=[FTS_TABLE],
+        where=[f'{FTS_TABLE}.rowid = jobs_job.id', f'{FTS_TABLE} MATCH %s'],
+        params=[match],
+    )
+    # bm25() is lower for better matches. Pool on the FTS rowid so SQLite streams the
+    # newest matches from the index instead of sorting all of them.
+    rank = f'CAST(ROUND(-bm25({FTS_TABLE}, {weights}) * {RANK_SCALE}) AS INTEGER)'
+    return queryset, RawSQL(rank, [], output_field=IntegerField()), f'{FTS_TABLE}.rowid'
+
+
+def fts_mysql(queryset, terms):
+    match = ' '.join(f'+{term}' for term in terms)
+    if len(terms[-1]) >= MIN_PREFIX_LENGTH:
+        match += '*'
+    columns = ', '.join(f'jobs_job.{column}' for column in SEARCH_COLUMNS)
+    against = f'MATCH ({columns}) AGAINST (%s IN BOOLEAN MODE)'
+    queryset = queryset.extra(where=[against], params=[match])
+    rank = f'CAST(ROUND({against} * {RANK_SCALE}) AS SIGNED)'
+    return queryset, RawSQL(rank, [match], output_field=IntegerField()), 'jobs_job.id'
+
+
+def fts_fallback(queryset, terms):
+    # Unindexed substring match for other databases; no relevance ranking
+    for term in terms:
+        queryset = queryset.filter(Q(title__icontains=term) | Q(description__icontains=term) |
+                                   Q(requirements__icontains=term))
+    return queryset, Value(0, output_field=IntegerField()), None
+
+
+FULL_TEXT_BACKENDS = {
+    'sqlite': fts_sqlite,
+    'mysql': fts_mysql,
+}
+
+
+def newest_matches(queryset, position):
+    # Scoring costs the same for every match, so a common term over millions of jobs
+    # would score them all; rank only the SEARCH_POOL_SIZE newest, like the deck's pool.
+    # Returns the queryset and whether older matches were left out.
+    newest = queryset.order_by(RawSQL(position, []).desc()).values_list('id', flat=True)
+    bound = list(newest[SEARCH_POOL_SIZE:SEARCH_POOL_SIZE + 1])
+    if not bound:
+        return queryset, False
+    return queryset.extra(where=[f'{position} > %s'], params=[bound[0]]), True
+
+
+def match_text(queryset, query):
+    """
+    Restrict `queryset` to jobs matching `query`, unranked and unpooled. Returns
+    the queryset and the backend's (rank, position) expressions, or None for both
+    without search terms.
+    """
+    terms = search_terms(query)
+    if not terms:
+        return queryset, None, None
+    return FULL_TEXT_BACKENDS.get(connection.vendor, fts_fallback)(queryset, terms)
+
+
+def full_text(queryset, query, default_rank=None):
+    """
+    Restrict `queryset` to jobs matching `query` and annotate their `search_rank`;
+    `default_rank` (or 0) when there are no search terms. Returns the queryset and
+    whether matches beyond the SEARCH_POOL_SIZE newest were left out.
+    """
+    queryset, rank, position = match_text(queryset, query)
+    if rank is None:
+        return queryset.annotate(search_rank=default_rank or Value(0, output_field=IntegerField())), False
+    truncated = False
+    if position is not None:
+        queryset, truncated = newest_matches(queryset, position)
+    return queryset.annotate(search_rank=rank), truncated
+
+
+def parse_int(params, name):
+    value = params.get(name)
+    if value in (None, ''):
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise InvalidSearch(f'Invalid {name}')
+
+
+def parse_choice(params, name, choices):
+    value = params.get(name)
+    if value in (None, ''):
+        return None
+    if value not in dict(choices):
+        raise InvalidSearch(f'Invalid {name}')
+    return value
+
+
+def parse_bool(params, name):
+    value = params.get(name)
+    if value in (None, ''):
+        return None
+    if value.lower() not in BOOLEAN_PARAMS:
+        raise InvalidSearch(f'Invalid {name}')
+    return BOOLEAN_PARAMS[value.lower()]
+
+
+def parse_location(params, origin=None):
+    # config.geo.Near for ?radius_km= (with ?lat=/?lon= or ?near=), or None
+    try:
+        return parse_near(params, origin)
+    except InvalidLocation as error:
+        raise InvalidSearch(str(error))
+
+
+def near_condition(near, include_remote=False):
+    # Remote jobs have no place to measure from; `include_remote` keeps them
+    q = near.q()
+    if include_remote:
+        q |= Q(is_remote=True)
+    return q
+
+
+def proximity_rank(near):
+    # Nearest first as an integer rank (negated metres); remote jobs rank as local
+    return Cast(Round(Coalesce(near.distance(), 0.0) * -1000), IntegerField())
+
+
+def salary_overlap(salary_min, salary_max):
+    # Jobs whose advertised range overlaps [salary_min, salary_max]; either bound may be None
+    q = Q()
+    if salary_min is not None:
+        q &= Q(salary_max__gte=salary_min) | Q(salary_max__isnull=True, salary_min__isnull=False)
+    if salary_max is not None:
+        q &= Q(salary_min__lte=salary_max) | Q(salary_min__isnull=True, salary_max__isnull=False)
+    return q
+
+
+def filter_conditions(params):
+    """
+    One Q per structured filter given in `params`, keyed by filter name:
+    ?location=, ?job_type=, ?experience_level=, ?is_remote=, 'salary' and
+    'near' (?radius_km= around ?lat=/?lon= or a ?near= place name).
+
+    ?salary_min= / ?salary_max= keep jobs whose advertised range overlaps the
+    requested one; a job with only one bound is open-ended on the other side and
+    a job without any salary information never matches a salary filter.
+    """
+    conditions = {}
+    location = params.get('location', '').strip()
+    if location:
+        conditions['location'] = Q(location__iexact=location)
+    job_type = parse_choice(params, 'job_type', Job.JOB_TYPE_CHOICES)
+    if job_type:
+        conditions['job_type'] = Q(job_type=job_type)
+    experience_level = parse_choice(params, 'experience_level', Job.EXPERIENCE_LEVEL_CHOICES)
+    if experience_level:
+        conditions['experience_level'] = Q(experience_level=experience_level)
+    is_remote = parse_bool(params, 'is_remote')
+    if is_remote is not None:
+        conditions['is_remote'] = Q(is_remote=is_remote)
+    near = parse_location(params)
+    if near is not None:
+        conditions['near'] = near_condition(near, parse_bool(params, 'include_remote'))
+
+    salary_min = parse_int(params, 'salary_min')
+    salary_max = parse_int(params, 'salary_max')
+    if salary_min is not None or salary_max is not None:
+        conditions['salary'] = salary_overlap(salary_min, salary_max)
+    return conditions
+
+
+def structured_filters(params):
+    # All of filter_conditions() combined
+    q = Q()
+    for condition in filter_conditions(params).values():
+        q &= condition
+    return q
+
+
+def search_jobs(queryset, params):
+    """
+    Jobs in `queryset` matching ?q= and the structured filters, annotated with
+    `search_rank` for SEARCH_ORDERING: text relevance, or nearest first for a
+    radius search without ?q=. Returns the queryset and whether matches were left
+    out of the ranking (see SEARCH_POOL_SIZE). Raises InvalidSearch for a malformed filter.
+    """
+    near = parse_location(params)
+    default_rank = proximity_rank(near) if near is not None else None
+    return full_text(queryset.filter(structured_filters(params)), params.get('q'), default_rank)
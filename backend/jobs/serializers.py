@@ -1,18 +1,27 @@
 from rest_framework import serializers
 from .models import Job, Application
+from config.fieldsets import SparseFieldsetMixin
 from users.serializers import RecruiterProfileSerializer, JobSeekerProfileSerializer
 
-class JobSerializer(serializers.ModelSerializer):
+class JobSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     recruiter = RecruiterProfileSerializer(read_only=True)
     
     class Meta:
         model = Job
-        fields = '__all__'
+        exclude = ['normalized_skills', 'geo_cell']
+        # Geocoded from `location`
+        read_only_fields = ['latitude', 'longitude']
+        # Compact card for list responses; ?fields= / ?expand= select more
+        list_fields = [
+            'id', 'recruiter', 'title', 'location', 'job_type', 'experience_level',
+            'salary_min', 'salary_max', 'is_remote', 'created_at', 'is_active',
+        ]
 
-class ApplicationSerializer(serializers.ModelSerializer):
+class ApplicationSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     job = JobSerializer(read_only=True)
     job_seeker = JobSeekerProfileSerializer(read_only=True)
     
     class Meta:
         model = Application
-        fields = '__all__'
\ No newline at end of file
+        fields = '__all__'
+        list_fields = ['id', 'job', 'job_seeker', 'status', 'created_at', 'updated_at']
\ No newline at end of file
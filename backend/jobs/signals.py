@@ -0,0 +1,49 @@
+from django.contrib.auth.models import User
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+
+from users.models import Profile, RecruiterProfile
+from config.geo import geo_fields
+from users.skills import sync_skill_links
+from .cache import invalidate_recruiter_jobs
+from .models import Job, JobSkill
+
+
+@receiver(pre_save, sender=Job)
+def geocode_job(sender, instance, update_fields=None, **kwargs):
+    # Saves limited to other fields keep the stored coordinates
+    if update_fields is not None and 'location' not in update_fields:
+        return
+    for name, value in geo_fields(instance.location).items():
+        setattr(instance, name, value)
+
+
+@receiver(post_save, sender=Job)
+def sync_job_skills(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and 'skills_required' not in update_fields:
+        return
+    sync_skill_links(instance, instance.skills_required, JobSkill, 'job')
+
+
+@receiver(post_save, sender=Job)
+@receiver(post_delete, sender=Job)
+def invalidate_job_cache(sender, instance, **kwargs):
+    # Covers is_active changes, which move a job in or out of the shared listing
+    invalidate_recruiter_jobs(instance.recruiter_id)
+
+
+@receiver(post_save, sender=RecruiterProfile)
+@receiver(post_delete, sender=RecruiterProfile)
+def invalidate_job_cache_for_recruiter(sender, instance, **kwargs):
+    invalidate_recruiter_jobs(instance.id)
+
+
+@receiver(post_save, sender=Profile)
+@receiver(post_save, sender=User)
+def invalidate_job_cache_for_recruiter_account(sender, instance, update_fields=None, **kwargs):
+    # Job responses nest the recruiter's profile and user; logins only touch last_login
+    if update_fields is not None and set(update_fields) <= {'last_login'}:
+        return
+    lookup = {'profile': instance} if sender is Profile else {'profile__user': instance}
+    for recruiter_id in RecruiterProfile.objects.filter(**lookup).values_list('id', flat=True):
+        invalidate_recruiter_jobs(recruiter_id)
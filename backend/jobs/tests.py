@@ -1,3 +1,392 @@
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
 from django.test import TestCase
 
-# Create your tests here.
+from config.response_cache import get_cache, reset_cache_stats
+from config.testing import QueryBudgetMixin
+from users.identity import cached_profile
+from users.models import Profile, RecruiterProfile, JobSeekerProfile
+from .cache import JOB_CACHE_NAMESPACE
+from .models import Job, Application
+
+
+def make_recruiter(username):
+    user = User.objects.create_user(username)
+    profile = Profile.objects.create(user=user, user_type='recruiter')
+    return RecruiterProfile.objects.create(profile=profile, company_name='Acme', position='HR')
+
+
+def make_job_seeker(username):
+    user = User.objects.create_user(username)
+    profile = Profile.objects.create(user=user, user_type='job_seeker')
+    return JobSeekerProfile.objects.create(profile=profile, skills='python')
+
+
+def make_jobs(count):
+    # Each job gets its own recruiter so nested recruiter/profile/user rows differ
+    start = Job.objects.count()
+    for i in range(start, start + count):
+        Job.objects.create(
+            recruiter=make_recruiter(f'budget-recruiter{i}'), title=f'Job {i}', description='d', requirements='r',
+            location='Remote',
+        )
+
+
+class JobQueryBudgetTests(QueryBudgetMixin, TestCase):
+    def test_job_list_for_job_seeker(self):
+        client = self.api_client(make_job_seeker('seeker').profile.user)
+        make_jobs(2)
+        self.assertQueryBudget(client, '/api/jobs/jobs/', 1, grow=lambda: make_jobs(10))
+
+    def test_job_list_for_recruiter(self):
+        recruiter = make_recruiter('recruiter')
+        client = self.api_client(recruiter.profile.user)
+
+        def grow(count):
+            for i in range(count):
+                Job.objects.create(recruiter=recruiter, title='Job', description='d', requirements='r', location='Remote')
+
+        grow(2)
+        self.assertQueryBudget(client, '/api/jobs/jobs/', 1, grow=lambda: grow(10))
+
+    def test_application_list(self):
+        client = self.api_client(make_job_seeker('viewer').profile.user)
+
+        def grow(count):
+            make_jobs(count)
+            for job in Job.objects.order_by('-id')[:count]:
+                seeker = make_job_seeker(f'applicant{job.id}')
+                Application.objects.create(job=job, job_seeker=seeker)
+
+        grow(2)
+        self.assertQueryBudget(client, '/api/jobs/applications/', 1, grow=lambda: grow(10))
+
+
+class KeysetPaginationTests(QueryBudgetMixin, TestCase):
+    def setUp(self):
+        make_jobs(5)
+        self.client = self.api_client(make_job_seeker('seeker').profile.user)
+
+    def walk(self, url):
+        ids = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200, response.data)
+            ids += [job['id'] for job in response.data['results']]
+            url = response.data['next']
+        return ids
+
+    def test_pages_cover_every_row_once_newest_first(self):
+        expected = list(Job.objects.order_by('-created_at', '-id').values_list('id', flat=True))
+        self.assertEqual(self.walk('/api/jobs/jobs/?limit=2'), expected)
+
+    def test_ties_on_created_at_are_broken_by_id(self):
+        Job.objects.update(created_at=Job.objects.first().created_at)
+        self.assertEqual(self.walk('/api/jobs/jobs/?limit=2'), sorted(Job.objects.values_list('id', flat=True), reverse=True))
+
+    def test_rows_inserted_mid_walk_do_not_shift_pages(self):
+        first = self.client.get('/api/jobs/jobs/?limit=2').data
+        make_jobs(3)
+        rest = self.walk(first['next'])
+        ids = [job['id'] for job in first['results']] + rest
+        self.assertEqual(len(ids), len(set(ids)))
+        self.assertEqual(len(ids), 5)
+
+    def test_invalid_cursor(self):
+        for cursor in ['not-a-cursor', 'WzFd', 'eyJhIjoxfQ']:
+            response = self.client.get('/api/jobs/jobs/', {'cursor': cursor})
+            self.assertEqual(response.status_code, 400, cursor)
+            self.assertIn('cursor', response.data)
+
+
+class SparseFieldsetTests(QueryBudgetMixin, TestCase):
+    def setUp(self):
+        make_jobs(1)
+        self.job = Job.objects.get()
+        self.client = self.api_client(make_job_seeker('seeker').profile.user)
+
+    def test_list_is_compact_by_default(self):
+        job = self.client.get('/api/jobs/jobs/').data['results'][0]
+        self.assertNotIn('description', job)
+        self.assertEqual(set(job['recruiter']), {'id', 'company_name', 'industry'})
+
+    def test_fields_and_expand(self):
+        response = self.client.get('/api/jobs/jobs/', {'fields': 'title,recruiter.company_name'})
+        self.assertEqual(response.data['results'][0], {'recruiter': {'company_name': 'Acme'}, 'title': self.job.title})
+
+        response = self.client.get('/api/jobs/jobs/', {'fields': 'id', 'expand': 'recruiter'})
+        self.assertIn('company_description', response.data['results'][0]['recruiter'])
+
+    def test_unknown_field(self):
+        response = self.client.get('/api/jobs/jobs/', {'fields': 'id,secret'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_retrieve_is_unchanged_without_parameters(self):
+        response = self.client.get(f'/api/jobs/jobs/{self.job.id}/')
+        self.assertIn('description', response.data)
+        self.assertIn('user', response.data['recruiter']['profile'])
+
+
+class JobResponseCacheTests(QueryBudgetMixin, TestCase):
+    def setUp(self):
+        get_cache().clear()
+        make_jobs(2)
+        self.client = self.api_client(make_job_seeker('seeker').profile.user)
+
+    def test_repeated_list_is_served_from_cache(self):
+        first = self.client.get('/api/jobs/jobs/')
+        queries, _ = self.count_queries(self.client, '/api/jobs/jobs/')
+        second = self.client.get('/api/jobs/jobs/')
+        self.assertEqual((first['X-Cache'], second['X-Cache']), ('MISS', 'HIT'))
+        self.assertEqual(first.content, second.content)
+        # Token and profile come from the identity cache
+        self.assertEqual(queries, 0)
+
+    def test_job_writes_invalidate(self):
+        job = Job.objects.order_by('id').first()
+        self.client.get('/api/jobs/jobs/')
+        self.client.get(f'/api/jobs/jobs/{job.id}/')
+
+        job.title = 'Renamed'
+        job.save()
+        response = self.client.get(f'/api/jobs/jobs/{job.id}/')
+        self.assertEqual((response['X-Cache'], response.data['title']), ('MISS', 'Renamed'))
+
+        job.is_active = False
+        job.save()
+        ids = [result['id'] for result in self.client.get('/api/jobs/jobs/').data['results']]
+        self.assertNotIn(job.id, ids)
+        self.assertEqual(self.client.get(f'/api/jobs/jobs/{job.id}/').status_code, 404)
+
+    def test_recruiter_changes_invalidate(self):
+        job = Job.objects.order_by('id').first()
+        self.client.get('/api/jobs/jobs/')
+        job.recruiter.company_name = 'Renamed Inc'
+        job.recruiter.save()
+        results = self.client.get('/api/jobs/jobs/').data['results']
+        self.assertIn('Renamed Inc', [result['recruiter']['company_name'] for result in results])
+
+    def test_recruiters_do_not_share_entries(self):
+        recruiter = Job.objects.order_by('id').first().recruiter
+        own = self.api_client(recruiter.profile.user).get('/api/jobs/jobs/')
+        self.assertEqual(own['X-Cache'], 'MISS')
+        self.assertEqual(len(own.data['results']), 1)
+
+    def test_stats(self):
+        reset_cache_stats(JOB_CACHE_NAMESPACE)
+        self.client.get('/api/jobs/jobs/')
+        self.client.get('/api/jobs/jobs/')
+        admin = User.objects.create_user('admin', is_staff=True)
+        stats = self.api_client(admin).get('/api/jobs/cache-stats/').data
+        self.assertEqual((stats['hits'], stats['misses']), (1, 1))
+
+
+class JobSearchTests(QueryBudgetMixin, TestCase):
+    def setUp(self):
+        get_cache().clear()
+        self.recruiter = make_recruiter('recruiter')
+        # Unrelated jobs, so matching terms are rare enough to rank
+        for i in range(10):
+            self.add_job(f'Accountant {i}', description='Ledgers', location='Paris')
+        self.client = self.api_client(make_job_seeker('seeker').profile.user)
+
+    def add_job(self, title, description='d', **fields):
+        return Job.objects.create(recruiter=self.recruiter, title=title, description=description, requirements='r',
+                                  **{'location': 'Berlin', **fields})
+
+    def search(self, **params):
+        response = self.client.get('/api/jobs/jobs/search/', params)
+        self.assertEqual(response.status_code, 200, response.data)
+        return [job['title'] for job in response.data['results']]
+
+    def test_title_matches_rank_first(self):
+        self.add_job('Backend engineer', description='We use Python')
+        self.add_job('Python developer')
+        self.assertEqual(self.search(q='python'), ['Python developer', 'Backend engineer'])
+        # The last term also matches as a prefix
+        self.assertEqual(self.search(q='pyth'), ['Python developer', 'Backend engineer'])
+        self.assertEqual(self.search(q='python backend'), ['Backend engineer'])
+
+    def test_structured_filters(self):
+        self.add_job('Python developer', location='Remote', is_remote=True, salary_min=50000, salary_max=70000)
+        self.add_job('Python intern', job_type='internship', salary_max=20000)
+        self.add_job('Python lead', experience_level='senior', salary_min=90000)
+        self.add_job('Python contractor', job_type='contract')
+        self.assertEqual(self.search(q='python', location='remote', is_remote='true'), ['Python developer'])
+        self.assertEqual(self.search(q='python', job_type='internship'), ['Python intern'])
+        self.assertEqual(self.search(experience_level='senior'), ['Python lead'])
+        # Salary ranges overlap; jobs without a salary never match
+        self.assertEqual(set(self.search(q='python', salary_min=60000)), {'Python developer', 'Python lead'})
+        self.assertEqual(set(self.search(q='python', salary_max=60000)), {'Python developer', 'Python intern'})
+
+    def test_invalid_filter(self):
+        response = self.client.get('/api/jobs/jobs/search/', {'job_type': 'gig'})
+        self.assertEqual((response.status_code, response.data), (400, {'error': 'Invalid job_type'}))
+
+    def test_index_follows_writes(self):
+        job = self.add_job('Python developer')
+        self.assertEqual(self.search(q='python'), ['Python developer'])
+        job.title = 'Rust developer'
+        job.save()
+        self.assertEqual(self.search(q='python'), [])
+        self.assertEqual(self.search(q='rust'), ['Rust developer'])
+        job.delete()
+        self.assertEqual(self.search(q='rust'), [])
+
+    def test_cursor_pages(self):
+        for i in range(5):
+            self.add_job(f'Python developer {i}', description='python ' * i)
+        titles, cursor = [], None
+        while True:
+            params = {'q': 'python', 'limit': 2, **({'cursor': cursor} if cursor else {})}
+            data = self.client.get('/api/jobs/jobs/search/', params).data
+            titles += [job['title'] for job in data['results']]
+            cursor = data['next_cursor']
+            if cursor is None:
+                break
+        self.assertEqual(titles, self.search(q='python', limit=10))
+        self.assertEqual(len(set(titles)), 5)
+
+    def test_only_newest_matches_are_ranked(self):
+        for i in range(5):
+            self.add_job(f'Python developer {i}')
+        with mock.patch('jobs.search.SEARCH_POOL_SIZE', 3):
+            self.assertEqual(set(self.search(q='python')), {f'Python developer {i}' for i in (2, 3, 4)})
+            # The response says older matches were left out
+            self.assertTrue(self.client.get('/api/jobs/jobs/search/', {'q': 'python'}).data['truncated'])
+            self.assertFalse(self.client.get('/api/jobs/jobs/search/', {'q': 'developer 1'}).data['truncated'])
+        # Exactly a pool's worth of matches is not truncated (another query: responses are cached)
+        with mock.patch('jobs.search.SEARCH_POOL_SIZE', 5):
+            data = self.client.get('/api/jobs/jobs/search/', {'q': 'python developer'}).data
+            self.assertEqual((len(data['results']), data['truncated']), (5, False))
+
+    def test_query_budget(self):
+        # The pool boundary and the page
+        self.add_job('Python developer')
+        self.assertQueryBudget(self.client, '/api/jobs/jobs/search/', 2, grow=lambda: self.add_job('Python lead'),
+                               data={'q': 'python'})
+
+
+class JobGeoSearchTests(QueryBudgetMixin, TestCase):
+    def setUp(self):
+        get_cache().clear()
+        recruiter = make_recruiter('recruiter')
+        for title, location, is_remote in [
+            ('Berlin job', 'Berlin, Germany', False),
+            ('Hamburg job', 'Hamburg', False),
+            ('Munich job', 'München', False),
+            ('Remote job', 'Remote', True),
+        ]:
+            Job.objects.create(recruiter=recruiter, title=title, description='d', requirements='r',
+                               location=location, is_remote=is_remote)
+        self.client = self.api_client(make_job_seeker('seeker').profile.user)
+
+    def search(self, **params):
+        response = self.client.get('/api/jobs/jobs/search/', params)
+        self.assertEqual(response.status_code, 200, response.data)
+        return [job['title'] for job in response.data['results']]
+
+    def test_locations_are_geocoded_on_save(self):
+        job = Job.objects.get(title='Berlin job')
+        self.assertEqual((job.latitude, job.longitude), (52.52, 13.405))
+        self.assertTrue(job.geo_cell.startswith('u33'))
+        job.location = 'Atlantis'
+        job.save()
+        job.refresh_from_db()
+        self.assertEqual((job.latitude, job.longitude, job.geo_cell), (None, None, None))
+
+    def test_geocode_locations_backfills_rows(self):
+        # Rows written before the columns existed, as an upgraded database has them
+        Job.objects.update(latitude=None, longitude=None, geo_cell=None)
+        Profile.objects.filter(user__username='seeker').update(location='Hamburg')
+        call_command('geocode_locations', stdout=StringIO())
+        job = Job.objects.get(title='Berlin job')
+        self.assertEqual((job.latitude, job.longitude), (52.52, 13.405))
+        self.assertTrue(job.geo_cell.startswith('u33'))
+        self.assertIsNone(Job.objects.get(title='Remote job').geo_cell)
+        self.assertIsNotNone(Profile.objects.get(user__username='seeker').geo_cell)
+        self.assertEqual(self.search(near='Berlin', radius_km=300), ['Berlin job', 'Hamburg job'])
+
+    def test_geocode_locations_refreshes_cached_responses(self):
+        Job.objects.update(latitude=None, longitude=None, geo_cell=None)
+        seeker = Profile.objects.get(user__username='seeker')
+        Profile.objects.filter(id=seeker.id).update(location='Hamburg')
+
+        def berlin_job():
+            response = self.client.get('/api/jobs/jobs/', {'fields': 'title,latitude,longitude'})
+            job = next(job for job in response.data['results'] if job['title'] == 'Berlin job')
+            return job['latitude'], job['longitude']
+
+        self.assertEqual(berlin_job(), (None, None))
+        self.assertIsNone(cached_profile(seeker.user_id).latitude)
+        call_command('geocode_locations', stdout=StringIO())
+        self.assertEqual(berlin_job(), (52.52, 13.405))
+        self.assertIsNotNone(cached_profile(seeker.user_id).latitude)
+
+    def test_radius_nearest_first(self):
+        self.assertEqual(self.search(near='Berlin', radius_km=300), ['Berlin job', 'Hamburg job'])
+        self.assertEqual(self.search(lat=52.5, lon=13.4, radius_km=50), ['Berlin job'])
+        self.assertEqual(self.search(near='hamburg', radius_km=400), ['Hamburg job', 'Berlin job'])
+        # Remote jobs rank as if at the centre; ties newest first
+        self.assertEqual(self.search(near='Berlin', radius_km=300, include_remote='true'),
+                         ['Remote job', 'Berlin job', 'Hamburg job'])
+
+    def test_invalid_location(self):
+        for params, error in [
+            ({'near': 'Atlantis', 'radius_km': 10}, 'Unknown place'),
+            ({'near': 'Berlin', 'radius_km': 0}, 'radius_km must be between 0 and 500'),
+            ({'radius_km': 10}, 'lat/lon or near is required with radius_km'),
+            ({'lat': 'x', 'lon': 1, 'radius_km': 10}, 'Invalid lat'),
+        ]:
+            response = self.client.get('/api/jobs/jobs/search/', params)
+            self.assertEqual((response.status_code, response.data), (400, {'error': error}))
+
+
+class JobFacetTests(QueryBudgetMixin, TestCase):
+    def setUp(self):
+        get_cache().clear()
+        recruiter = make_recruiter('recruiter')
+        for title, fields in [
+            ('Python developer', {'job_type': 'full_time', 'salary_min': 50000, 'salary_max': 70000}),
+            ('Python contractor', {'job_type': 'contract', 'is_remote': True, 'salary_min': 100000}),
+            ('Python intern', {'job_type': 'internship', 'location': 'Paris'}),
+            ('Accountant', {'job_type': 'full_time', 'salary_max': 40000}),
+        ]:
+            Job.objects.create(recruiter=recruiter, title=title, description='d', requirements='r',
+                               **{'location': 'Berlin', **fields})
+        Job.objects.create(recruiter=recruiter, title='Python lead', description='d', requirements='r',
+                           location='Berlin', is_active=False)
+        self.client = self.api_client(make_job_seeker('seeker').profile.user)
+
+    def facets(self, **params):
+        response = self.client.get('/api/jobs/jobs/facets/', params)
+        self.assertEqual(response.status_code, 200, response.data)
+        counts = {
+            facet: {choice['label']: choice['count'] for choice in choices if choice['count']}
+            for facet, choices in response.data['facets'].items()
+        }
+        return response.data['total'], counts
+
+    def test_counts_for_search(self):
+        total, counts = self.facets(q='python')
+        self.assertEqual(total, 3)
+        self.assertEqual(counts['job_type'], {'Full Time': 1, 'Contract': 1, 'Internship': 1})
+        self.assertEqual(counts['is_remote'], {'Remote': 1, 'On site': 2})
+        # Ranges count in every bucket they overlap; jobs without a salary in none
+        self.assertEqual(counts['salary'], {'30000-60000': 1, '60000-90000': 1, '90000-120000': 1, '120000+': 1})
+
+    def test_selected_facet_keeps_its_alternatives(self):
+        total, counts = self.facets(q='python', job_type='contract', location='Berlin')
+        self.assertEqual(total, 1)
+        # Other job types stay visible; the other facets follow the selection
+        self.assertEqual(counts['job_type'], {'Full Time': 1, 'Contract': 1})
+        self.assertEqual(counts['is_remote'], {'Remote': 1})
+
+    def test_single_query(self):
+        self.assertQueryBudget(
+            self.client, '/api/jobs/jobs/facets/', 1, data={'q': 'python', 'is_remote': 'false'},
+            grow=lambda: make_jobs(5),
+        )
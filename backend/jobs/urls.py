@@ -8,4 +8,5 @@ router.register(r'applications', views.ApplicationViewSet)
 
 urlpatterns = [
     path('', include(router.urls)),
+    path('cache-stats/', views.job_cache_stats, name='job-cache-stats'),
 ]
\ No newline at end of file
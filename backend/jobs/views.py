@@ -1,23 +1,54 @@
 from rest_framework import viewsets, status
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated
-from .models import Job, Application
+from rest_framework.permissions import IsAuthenticated, IsAdminUser
+from .models import Job, Application, JobSkill
 from users.models import Profile, RecruiterProfile, JobSeekerProfile
+from users.identity import request_identity
+from users.skills import filter_by_any_skill
+from config.fastpath import FastListMixin
+from config.fieldsets import SparseFieldsetViewMixin
+from config.response_cache import VersionedResponseCacheMixin, cache_stats
+from .search import search_jobs, InvalidSearch, SEARCH_ORDERING
+from .facets import facet_counts
+from .cache import JOB_CACHE_NAMESPACE, ACTIVE_JOBS_SCOPE, recruiter_jobs_scope
 from .serializers import JobSerializer, ApplicationSerializer
 
-class JobViewSet(viewsets.ModelViewSet):
+class JobViewSet(VersionedResponseCacheMixin, FastListMixin, SparseFieldsetViewMixin, viewsets.ModelViewSet):
     queryset = Job.objects.all()
     serializer_class = JobSerializer
     permission_classes = [IsAuthenticated]
+    cache_namespace = JOB_CACHE_NAMESPACE
+    cached_actions = ('list', 'retrieve', 'search', 'facets')
+    sparse_actions = ('list', 'retrieve', 'search')
+    compact_actions = ('list', 'search')
+    
+    def get_profile(self):
+        # Cached per user, with the recruiter profile preloaded (users/identity.py)
+        return request_identity(self.request).profile
+    
+    def get_cache_scope(self):
+        # Job seekers share the active listing; recruiters each have their own
+        if self.action in ('search', 'facets'):
+            return ACTIVE_JOBS_SCOPE
+        profile = self.get_profile()
+        if profile is None:
+            return None
+        if profile.user_type != 'recruiter':
+            return ACTIVE_JOBS_SCOPE
+        try:
+            return recruiter_jobs_scope(profile.recruiterprofile.id)
+        except RecruiterProfile.DoesNotExist:
+            return None
     
     def perform_create(self, serializer):
         # Only recruiters can create jobs
         try:
-            profile = Profile.objects.get(user=self.request.user)
+            profile = self.get_profile()
+            if profile is None:
+                raise Profile.DoesNotExist
             if profile.user_type == 'recruiter':
-                recruiter = RecruiterProfile.objects.get(profile=profile)
-                serializer.save(recruiter=recruiter)
+                serializer.save(recruiter=profile.recruiterprofile)
             else:
                 raise PermissionError("Only recruiters can create jobs")
         except (Profile.DoesNotExist, RecruiterProfile.DoesNotExist):
@@ -26,18 +57,84 @@ class JobViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         # Filter jobs based on user type
         try:
-            profile = Profile.objects.get(user=self.request.user)
+            profile = self.get_profile()
+            if profile is None:
+                raise Profile.DoesNotExist
             if profile.user_type == 'recruiter':
                 # Recruiters see their own jobs
-                recruiter = RecruiterProfile.objects.get(profile=profile)
-                return Job.objects.filter(recruiter=recruiter)
+                recruiter = profile.recruiterprofile
+                queryset = Job.objects.filter(recruiter=recruiter)
             else:
                 # Job seekers see all active jobs
-                return Job.objects.filter(is_active=True)
+                queryset = Job.objects.filter(is_active=True)
         except (Profile.DoesNotExist, RecruiterProfile.DoesNotExist):
             return Job.objects.none()
+        
+        # Load only what the requested representation renders
+        queryset = self.apply_fieldset(queryset)
+        
+        # ?skills=python,django -> jobs requiring any of these skills
+        skills = self.request.query_params.get('skills')
+        if skills:
+            queryset = filter_by_any_skill(queryset, skills.split(','), JobSkill, 'job')
+        return queryset
+    
+    @action(detail=False, methods=['get'])
+    def search(self, request):
+        """
+        Full-text search over active jobs: ?q= plus the structured filters in
+        jobs/search.py and ?skills=. Most relevant first, paged by `next_cursor`.
 
-class ApplicationViewSet(viewsets.ModelViewSet):
+        Only the SEARCH_POOL_SIZE (1000) newest text matches are ranked; when a
+        query matches more, older ones are left out and `truncated` is true, so
+        clients can ask for a narrower query or more filters.
+        """
+        return self.cached_response(self.search_results, request)
+    
+    def search_results(self, request):
+        try:
+            queryset, truncated = search_jobs(self.apply_fieldset(self.searchable_jobs()), request.query_params)
+        except InvalidSearch as error:
+            return Response({'error': str(error)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        self.keyset_ordering = SEARCH_ORDERING
+        page = self.paginate_queryset(queryset)
+        response = self.get_paginated_response(self.get_serializer(page, many=True).data)
+        response.data['truncated'] = truncated
+        return response
+    
+    @action(detail=False, methods=['get'])
+    def facets(self, request):
+        """
+        Counts per job type, experience level, remote flag and salary bucket for
+        the search described by the same parameters as search/.
+        """
+        return self.cached_response(self.facet_results, request)
+    
+    def facet_results(self, request):
+        try:
+            return Response(facet_counts(self.searchable_jobs(), request.query_params))
+        except InvalidSearch as error:
+            return Response({'error': str(error)}, status=status.HTTP_400_BAD_REQUEST)
+    
+    def searchable_jobs(self):
+        # Active jobs, narrowed by ?skills= like the list
+        queryset = Job.objects.filter(is_active=True)
+        skills = self.request.query_params.get('skills')
+        if skills:
+            queryset = filter_by_any_skill(queryset, skills.split(','), JobSkill, 'job')
+        return queryset
+
+class ApplicationViewSet(SparseFieldsetViewMixin, viewsets.ModelViewSet):
     queryset = Application.objects.all()
     serializer_class = ApplicationSerializer
-    permission_classes = [IsAuthenticated]
\ No newline at end of file
+    permission_classes = [IsAuthenticated]
+    
+    def get_queryset(self):
+        # ApplicationSerializer nests the job (with its recruiter) and the job seeker
+        return self.apply_fieldset(Application.objects.all())
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def job_cache_stats(request):
+    return Response(cache_stats(JOB_CACHE_NAMESPACE))
@@ -0,0 +1,140 @@
+from datetime import timedelta
+
+import numpy as np
+from django.db import transaction
+from django.db.models import F, OuterRef, Q, Subquery
+from django.utils import timezone
+
+from .models import SwipeAction, SwipeArchive, SwipeRollup
+
+# Left swipes older than this leave SwipeAction; left swipes on inactive jobs go at any age
+DEFAULT_ARCHIVE_AFTER_DAYS = 90
+ARCHIVE_BATCH_SIZE = 5000
+
+
+def unpack(packed):
+    return np.frombuffer(bytes(packed), dtype='<i8') if packed is not None else np.array([], dtype=np.int64)
+
+
+def archive_subquery(profile_id, kind):
+    # The packed archive of `profile_id` (an OuterRef) for use in another query
+    return Subquery(SwipeArchive.objects.filter(profile_id=profile_id, kind=kind).values('item_ids')[:1])
+
+
+def archived_ids(profile_id, kind):
+    # Ids the profile swiped whose rows were archived, sorted (empty before any archival)
+    return unpack(SwipeArchive.objects.filter(profile_id=profile_id, kind=kind).values_list('item_ids', flat=True).first())
+
+
+def preload_archived_jobs(job_seeker, packed):
+    # Keep an archive read along with another query (see deck.stored_job_ids)
+    job_seeker._archived_jobs = unpack(packed)
+
+
+def archived_jobs(job_seeker):
+    # archived_ids for the seeker's job swipes, read once per instance
+    if not hasattr(job_seeker, '_archived_jobs'):
+        job_seeker._archived_jobs = archived_ids(job_seeker.profile_id, SwipeArchive.JOB)
+    return job_seeker._archived_jobs
+
+
+def with_archived_candidates(jobs):
+    # Jobs annotated with their recruiter's archived candidate swipes, for archived_candidates()
+    return jobs.annotate(archived_candidates=archive_subquery(OuterRef('recruiter__profile_id'), SwipeArchive.CANDIDATE))
+
+
+def archived_candidates(job):
+    if hasattr(job, 'archived_candidates'):
+        return unpack(job.archived_candidates)
+    return archived_ids(job.recruiter.profile_id, SwipeArchive.CANDIDATE)
+
+
+def archived_among(profile_id, kind, ids):
+    # The subset of `ids` the profile swiped in archived rows
+    archived = archived_ids(profile_id, kind)
+    return set(archived[np.isin(archived, list(ids))].tolist()) if len(archived) and ids else set()
+
+
+def archivable_swipes(before):
+    """
+    Swipes that only matter for keeping cards out of the deck: left swipes made
+    before `before`, or on a job that is no longer active. Right swipes stay in
+    SwipeAction, since match detection and the candidate deck's interested phase
+    read them there.
+    """
+    return SwipeAction.objects.filter(direction='left', profile__isnull=False).filter(
+        Q(created_at__lt=before) | Q(job__is_active=False)
+    )
+
+
+def merge_archives(swipes):
+    # Add the swiped ids to each (profile, kind) archive row
+    new_ids = {}
+    for swipe in swipes:
+        if swipe['job_id'] is not None:
+            new_ids.setdefault((swipe['profile_id'], SwipeArchive.JOB), []).append(swipe['job_id'])
+        elif swipe['candidate_id'] is not None:
+            new_ids.setdefault((swipe['profile_id'], SwipeArchive.CANDIDATE), []).append(swipe['candidate_id'])
+
+    existing = {
+        (archive.profile_id, archive.kind): archive
+        for archive in SwipeArchive.objects.select_for_update().filter(
+            profile_id__in={profile_id for profile_id, _ in new_ids}
+        )
+        if (archive.profile_id, archive.kind) in new_ids
+    }
+    changed, created = [], []
+    for (profile_id, kind), ids in new_ids.items():
+        archive = existing.get((profile_id, kind))
+        if archive is None:
+            created.append(SwipeArchive(profile_id=profile_id, kind=kind, item_ids=SwipeArchive.pack(ids)))
+        else:
+            archive.item_ids = SwipeArchive.pack(np.concatenate([archive.ids(), ids]))
+            archive.updated_at = timezone.now()
+            changed.append(archive)
+    SwipeArchive.objects.bulk_update(changed, ['item_ids', 'updated_at'])
+    SwipeArchive.objects.bulk_create(created)
+
+
+def roll_up(swipes):
+    # Count the seekers' job swipes per (job, month) so the funnel keeps them (matching/funnel.py)
+    counts = {}
+    for swipe in swipes:
+        if swipe['job_id'] is not None:
+            key = (swipe['job_id'], swipe['created_at'].date().replace(day=1))
+            counts[key] = counts.get(key, 0) + 1
+    if not counts:
+        return
+    existing = set(SwipeRollup.objects.filter(
+        job_id__in={job_id for job_id, _ in counts}, month__in={month for _, month in counts}
+    ).values_list('job_id', 'month'))
+    for (job_id, month), count in counts.items():
+        if (job_id, month) in existing:
+            SwipeRollup.objects.filter(job_id=job_id, month=month).update(left_swipes=F('left_swipes') + count)
+    SwipeRollup.objects.bulk_create([
+        SwipeRollup(job_id=job_id, month=month, left_swipes=count)
+        for (job_id, month), count in counts.items() if (job_id, month) not in existing
+    ])
+
+
+def archive_swipes(older_than_days=DEFAULT_ARCHIVE_AFTER_DAYS, batch_size=ARCHIVE_BATCH_SIZE):
+    """
+    Move archivable swipes out of SwipeAction, `batch_size` rows per transaction:
+    their ids into the profiles' packed SwipeArchive rows, their job counts into
+    SwipeRollup. Returns the number of swipes archived.
+    """
+    before = timezone.now() - timedelta(days=older_than_days)
+    archived, last_id = 0, 0
+    while True:
+        with transaction.atomic():
+            swipes = list(
+                archivable_swipes(before).filter(id__gt=last_id).order_by('id')
+                .values('id', 'profile_id', 'job_id', 'candidate_id', 'created_at')[:batch_size]
+            )
+            if not swipes:
+                return archived
+            merge_archives(swipes)
+            roll_up(swipes)
+            SwipeAction.objects.filter(id__in=[swipe['id'] for swipe in swipes]).delete()
+        archived += len(swipes)
+        last_id = swipes[-1]['id']
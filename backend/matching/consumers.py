@@ -0,0 +1,78 @@
+from channels.db import database_sync_to_async
+from channels.generic.websocket import AsyncJsonWebsocketConsumer
+
+from users.identity import cached_profile
+from .realtime import match_group, match_for_profile, mark_read
+from . import sync
+
+MAX_MESSAGE_LENGTH = 5000
+
+
+class ChatConsumer(AsyncJsonWebsocketConsumer):
+    """
+    WebSocket channel for one Match at ws/matches/<match_id>/.
+
+    Client -> server:  {"type": "message", "content": "..."}
+                       {"type": "read"}
+    Server -> client:  {"type": "message", "message": {...MessageSerializer}}
+                       {"type": "read", "reader_id": ..., "message_ids": [...]}
+                       {"type": "error", "error": "..."}
+
+    New messages are written to the database and fanned out through the channel
+    layer by the Message post_save handler, so REST-created messages reach open
+    sockets too. Idle connections hold no database connection.
+    """
+
+    async def connect(self):
+        user = self.scope.get('user')
+        if user is None or not user.is_authenticated:
+            await self.close(code=4401)
+            return
+
+        self.match_id = self.scope['url_route']['kwargs']['match_id']
+        self.profile = await self.load_profile(user)
+        if self.profile is None or not await self.is_member():
+            await self.close(code=4403)
+            return
+
+        await self.channel_layer.group_add(match_group(self.match_id), self.channel_name)
+        await self.accept()
+
+    async def disconnect(self, code):
+        if hasattr(self, 'profile') and self.profile is not None:
+            await self.channel_layer.group_discard(match_group(self.match_id), self.channel_name)
+
+    async def receive_json(self, content, **kwargs):
+        kind = content.get('type') if isinstance(content, dict) else None
+        if kind == 'message':
+            text = content.get('content')
+            if not isinstance(text, str) or not text.strip() or len(text) > MAX_MESSAGE_LENGTH:
+                await self.send_json({'type': 'error', 'error': 'Invalid message content'})
+                return
+            await self.create_message(text)
+        elif kind == 'read':
+            await database_sync_to_async(mark_read)(self.match_id, self.profile)
+        else:
+            await self.send_json({'type': 'error', 'error': 'Unknown message type'})
+
+    # Channel layer events
+
+    async def chat_message(self, event):
+        await self.send_json({'type': 'message', 'message': event['message']})
+
+    async def chat_read(self, event):
+        await self.send_json({'type': 'read', 'reader_id': event['reader_id'], 'message_ids': event['message_ids']})
+
+    # Database access
+
+    @database_sync_to_async
+    def load_profile(self, user):
+        return cached_profile(user.id)
+
+    @database_sync_to_async
+    def is_member(self):
+        return match_for_profile(self.match_id, self.profile) is not None
+
+    @database_sync_to_async
+    def create_message(self, text):
+        return sync.create_message(self.match_id, self.profile, text)
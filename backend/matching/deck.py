@@ -0,0 +1,290 @@
+import numpy as np
+
+from django.db.models import Case, When, Value, Q, Exists, OuterRef, Subquery, Count
+from django.db.models.functions import Coalesce
+
+from config.pagination import InvalidCursor, encode_cursor, decode_cursor, keyset_filter
+from jobs.models import Job, JobSkill
+from jobs.search import near_condition
+from users.models import JobSeekerProfile
+from .models import SwipeAction, SwipeArchive, JobRecommendations
+from .archive import archive_subquery, archived_jobs, archived_candidates, preload_archived_jobs, unpack
+from .recommend import recommended_candidates
+from .scoring import JobFeatures, SeekerFeatures, score_jobs, rank
+
+DEFAULT_DECK_SIZE = 20
+MAX_DECK_SIZE = 50
+# How many unswiped jobs the SQL stage hands to the vectorized scorer
+DECK_POOL_SIZE = 1000
+# Scores are kept in cursors as integers
+SCORE_SCALE = 10000
+
+
+def parse_deck_size(value):
+    try:
+        size = int(value) if value is not None else DEFAULT_DECK_SIZE
+    except (TypeError, ValueError):
+        return DEFAULT_DECK_SIZE
+    return max(1, min(size, MAX_DECK_SIZE))
+
+
+def experience_level_for_years(years):
+    # Map a seeker's years of experience onto Job.EXPERIENCE_LEVEL_CHOICES
+    if years >= 10:
+        return 'executive'
+    if years >= 5:
+        return 'senior'
+    if years >= 2:
+        return 'mid'
+    return 'entry'
+
+
+def job_relevance(job_seeker):
+    profile = job_seeker.profile
+    rules = [
+        (Q(experience_level=experience_level_for_years(job_seeker.experience_years)), 2),
+        (Q(is_remote=True), 1),
+    ]
+    if job_seeker.desired_position:
+        rules.append((Q(title__icontains=job_seeker.desired_position), 3))
+    if job_seeker.desired_salary:
+        rules.append((Q(salary_max__gte=job_seeker.desired_salary), 2))
+    if profile.location:
+        rules.append((Q(location__iexact=profile.location), 1))
+
+    relevance = skill_overlap(job_seeker) * Value(2)
+    for condition, weight in rules:
+        relevance = relevance + Case(When(condition, then=Value(weight)), default=Value(0))
+    return relevance
+
+
+def skill_overlap(job_seeker):
+    # Number of the seeker's skills each job requires, via the (skill, job) index
+    overlap = (
+        JobSkill.objects.filter(job=OuterRef('pk'), skill__seeker_links__job_seeker=job_seeker)
+        .values('job')
+        .annotate(count=Count('skill'))
+        .values('count')
+    )
+    return Coalesce(Subquery(overlap), Value(0))
+
+
+def unswiped_jobs(job_seeker, near=None, include_remote=False):
+    # Anti-join against the seeker's own swipes; served by unique_swipe_profile_job.
+    # Swipes archived out of SwipeAction (matching/archive.py) are not excluded here:
+    # callers drop archived_jobs() from the bounded rows they fetch, with np.isin.
+    swiped = SwipeAction.objects.filter(profile_id=job_seeker.profile_id, job=OuterRef('pk'))
+    queryset = Job.objects.filter(is_active=True).filter(~Exists(swiped))
+    if near is not None:
+        # Radius over the (is_active, geo_cell) index
+        queryset = queryset.filter(near_condition(near, include_remote))
+    return queryset
+
+
+def job_deck_queryset(job_seeker, near=None, include_remote=False):
+    return (
+        unswiped_jobs(job_seeker, near, include_remote)
+        .annotate(relevance=job_relevance(job_seeker))
+        .select_related('recruiter__profile__user')
+    )
+
+
+def stored_job_ids(job_seeker):
+    # The seeker's stored recommendations (matching.recommend), best first, read in
+    # one query with the seeker's archived swipes (matching/archive.py)
+    row = JobSeekerProfile.objects.filter(id=job_seeker.id).values(
+        recommended=Subquery(JobRecommendations.objects.filter(job_seeker=OuterRef('pk')).values('item_ids')[:1]),
+        archived=archive_subquery(OuterRef('profile_id'), SwipeArchive.JOB),
+    ).first() or {}
+    preload_archived_jobs(job_seeker, row.get('archived'))
+    return unpack(row.get('recommended'))
+
+
+def recommended_cards(job_seeker, near=None, include_remote=False):
+    """
+    The seeker's precomputed recommendations (matching.recommend) still dealable,
+    best first, with integer scores above any live score so one (score, id)
+    keyset runs through them and on into the scored deck.
+    """
+    recommended = stored_job_ids(job_seeker)
+    if not len(recommended):
+        return recommended, recommended
+    scores = SCORE_SCALE + len(recommended) - np.arange(len(recommended), dtype=np.int64)
+    keep = np.isin(recommended, archived_jobs(job_seeker), invert=True)
+    dealable = unswiped_jobs(job_seeker, near, include_remote).filter(id__in=recommended[keep].tolist())
+    keep &= np.isin(recommended, list(dealable.values_list('id', flat=True)))
+    return recommended[keep], scores[keep]
+
+
+def scored_cards(job_seeker, near=None, include_remote=False, exclude=(), below=None):
+    # Two stages: SQL relevance picks a bounded pool of unswiped jobs, then the
+    # vectorized scorer orders that pool. Archived swipes and `exclude` leave the
+    # pool in memory, so the query carries no id list whatever the archive size;
+    # the pool is over-fetched by as many rows (at most DECK_POOL_SIZE) to make up.
+    # Returns (ids, scores, floor): when the pool was full, `floor` is its last
+    # [relevance, id] in SQL order, and passing it as `below` pools the jobs after it.
+    skip = np.union1d(archived_jobs(job_seeker), np.asarray(exclude, dtype=np.int64))
+    pool = job_deck_queryset(job_seeker, near, include_remote)
+    if below is not None:
+        pool = pool.filter(keyset_filter(('relevance', 'id'), below, descending=True))
+    limit = DECK_POOL_SIZE + min(len(skip), DECK_POOL_SIZE)
+    jobs = JobFeatures.from_queryset(pool.order_by('-relevance', '-id')[:limit], exclude=skip, extra=('relevance',))
+    scores = score_jobs(SeekerFeatures.from_instance(job_seeker), 0, jobs, near)
+    ids, scores = rank(jobs.ids, np.rint(scores * SCORE_SCALE).astype(np.int64))
+    floor = [jobs.last_row['relevance'], jobs.last_row['id']] if jobs.fetched == limit else None
+    return ids, scores, floor
+
+
+def decode_deck_cursor(cursor):
+    # (score, id), plus the live pool's floor once the deck is past the first pool
+    try:
+        last_score, last_id, *below = decode_cursor(cursor, 4)
+    except InvalidCursor:
+        last_score, last_id = decode_cursor(cursor, 2)
+        below = None
+    return last_score, last_id, below
+
+
+def job_deck_ids(job_seeker, size, cursor=None, near=None, include_remote=False):
+    # Precomputed recommendations first, then the live scored pool once they run out,
+    # then the next pool below it. The cursor is a keyset over (score, id) across the
+    # recommendations and the first pool, and within each later pool, whose floor it
+    # carries; every swipe drops a card from them, so the deck keeps refilling.
+    # Returns (ids, per-card cursor values, next cursor).
+    # With `near` (config.geo.Near) only jobs in the radius are dealt, closer ones scoring higher.
+    last_score, last_id, below = decode_deck_cursor(cursor) if cursor else (None, None, None)
+    recommended, scores = recommended_cards(job_seeker, near, include_remote)
+    ids = recommended
+    if below is not None:
+        ids, scores = ids[:0], scores[:0]
+    elif last_score is not None:
+        after = scores < last_score
+        ids, scores = ids[after], scores[after]
+    floors = [None] * len(ids)
+
+    # Recommendations can't fill the page: score on the request path, pool by pool
+    in_pool = last_score is not None and (below is not None or last_score <= SCORE_SCALE)
+    while len(ids) <= size:
+        live_ids, live_scores, floor = scored_cards(job_seeker, near, include_remote, exclude=recommended, below=below)
+        if in_pool:
+            after = (live_scores < last_score) | ((live_scores == last_score) & (live_ids < last_id))
+            live_ids, live_scores = live_ids[after], live_scores[after]
+            in_pool = False
+        ids, scores = np.concatenate([ids, live_ids]), np.concatenate([scores, live_scores])
+        floors += [below] * len(live_ids)
+        if floor is None:
+            break
+        below = floor
+    cursors = [(score, job_id, *(floor or ())) for score, job_id, floor in
+               zip(scores[:size + 1].tolist(), ids[:size + 1].tolist(), floors)]
+    ids = ids[:size + 1].tolist()
+
+    next_cursor = None
+    if len(ids) > size:
+        ids, cursors = ids[:size], cursors[:size]
+        next_cursor = encode_cursor(*cursors[-1])
+    return ids, cursors, next_cursor
+
+
+def job_cards(ids, cards=None):
+    # `cards` is the queryset the page's jobs are loaded from, e.g. with deferred columns
+    if cards is None:
+        cards = Job.objects.select_related('recruiter__profile__user')
+    by_id = cards.in_bulk(ids)
+    return [by_id[job_id] for job_id in ids if job_id in by_id]
+
+
+def job_deck_page(job_seeker, size, cursor=None, cards=None, near=None, include_remote=False):
+    ids, _, next_cursor = job_deck_ids(job_seeker, size, cursor, near, include_remote)
+    return job_cards(ids, cards), next_cursor
+
+
+def candidate_base(job, near=None):
+    # Swipes are recorded per recruiter profile, not per job, so a candidate
+    # the recruiter passed on for one job is not offered again for another.
+    swiped = SwipeAction.objects.filter(profile_id=job.recruiter.profile_id, candidate=OuterRef('pk'))
+    base = (
+        JobSeekerProfile.objects.filter(~Exists(swiped))
+        .select_related('profile__user')
+    )
+    if near is not None:
+        # Candidates whose own location is in the radius, over the profile geo_cell index
+        base = base.filter(near.q(prefix='profile__'))
+    return base
+
+
+def candidate_deck_querysets(job, near=None):
+    # Archived swipes are dropped from the fetched pages (see newest_candidates)
+    interested_profiles = SwipeAction.objects.filter(job=job, direction='right').values('profile_id')
+    base = candidate_base(job, near)
+    # Seekers who already swiped right on this job come first; served by swipe_job_direction_idx
+    interested = base.filter(profile_id__in=interested_profiles)
+    others = base.exclude(profile_id__in=interested_profiles)
+    return interested, others
+
+
+def recommended_phase(recommended, queryset, after, limit, skip=()):
+    # Stored recommendations still in `queryset` and not in `skip`, in list order from position `after` on
+    dealable = np.isin(recommended, skip, invert=True).tolist()
+    positions = {
+        seeker_id: position for position, seeker_id in enumerate(recommended.tolist())
+        if position > after and dealable[position]
+    }
+    if not positions:
+        return []
+    rows = sorted(queryset.filter(id__in=list(positions)), key=lambda candidate: positions[candidate.id])[:limit]
+    for candidate in rows:
+        candidate.deck_key = positions[candidate.id]
+    return rows
+
+
+def newest_candidates(queryset, after, limit, skip):
+    # Up to `limit` candidates by -id below id `after`, leaving out the ids in `skip`
+    # in memory; a batch that loses rows to `skip` is followed by the next keyset batch
+    rows = []
+    while True:
+        batch = queryset if after is None else queryset.filter(id__lt=after)
+        batch = list(batch.order_by('-id')[:limit])
+        ids = np.fromiter((candidate.id for candidate in batch), dtype=np.int64, count=len(batch))
+        rows.extend(candidate for candidate, kept in zip(batch, np.isin(ids, skip, invert=True)) if kept)
+        if len(batch) < limit or len(rows) >= limit:
+            return rows[:limit]
+        after = batch[-1].id
+
+
+def candidate_deck_page(job, size, cursor=None, near=None):
+    # Three keyset phases, each bounded by LIMIT: phase 1 walks the interested
+    # candidates by -id, phase 2 the job's precomputed recommendations
+    # (matching.recommend) in list order, phase 3 everyone else by -id.
+    interested, others = candidate_deck_querysets(job, near)
+    archived = archived_candidates(job)
+    recommended = recommended_candidates(job)
+    phase, last_key = decode_cursor(cursor, 2) if cursor else (1, None)
+    if phase not in (1, 2, 3):
+        raise InvalidCursor(cursor)
+
+    candidates = []
+    for current in (1, 2, 3):
+        if current < phase:
+            continue
+        after = last_key if current == phase else None
+        limit = size + 1 - len(candidates)
+        if current == 2:
+            rows = recommended_phase(recommended, others, -1 if after is None else after, limit, archived)
+        else:
+            skip = archived if current == 1 else np.union1d(archived, recommended)
+            rows = newest_candidates(interested if current == 1 else others, after, limit, skip)
+            for candidate in rows:
+                candidate.deck_key = candidate.id
+        for candidate in rows:
+            candidate.interested = current == 1
+            candidate.deck_phase = current
+        candidates.extend(rows)
+        if len(candidates) > size:
+            break
+
+    next_cursor = None
+    if len(candidates) > size:
+        candidates = candidates[:size]
+        next_cursor = encode_cursor(candidates[-1].deck_phase, candidates[-1].deck_key)
+    return candidates, next_cursor
@@ -0,0 +1,326 @@
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import close_old_connections, transaction
+from django.db.models import Exists, OuterRef
+from django.utils.module_loading import import_string
+
+from jobs.models import Job
+from users.models import JobSeekerProfile
+from config.pagination import encode_cursor
+from .archive import with_archived_candidates
+from .deck import job_deck_ids, candidate_deck_page, candidate_base
+from .models import SwipeAction
+
+# Queues are keyed (kind, owner_id) and hold (item_id, cursor) pairs in deck order,
+# where `cursor` is the deck's keyset position after that card:
+#   ('job', job_seeker_id)   jobs for a seeker, cursor (score, job_id[, pool floor]), see deck.job_deck_ids
+#   ('candidate', job_id)    candidates for a recruiter's job, cursor (phase, key)
+JOB_DECK = 'job'
+CANDIDATE_DECK = 'candidate'
+
+DEFAULT_SETTINGS = {
+    'BACKEND': 'matching.deck_queue.LocalDeckQueue',
+    'OPTIONS': {},
+}
+
+
+def load_items(key, size):
+    # The first `size` cards of the deck for `key`, computed as the deck endpoints do
+    kind, owner_id = key
+    if kind == JOB_DECK:
+        job_seeker = JobSeekerProfile.objects.select_related('profile').filter(id=owner_id).first()
+        if job_seeker is None:
+            return []
+        ids, cursors, _ = job_deck_ids(job_seeker, size)
+        return list(zip(ids, cursors))
+    job = with_archived_candidates(Job.objects).select_related('recruiter', 'candidate_recommendations').filter(
+        id=owner_id, is_active=True
+    ).first()
+    if job is None:
+        return []
+    candidates, _ = candidate_deck_page(job, size)
+    return [(candidate.id, (candidate.deck_phase, candidate.deck_key)) for candidate in candidates]
+
+
+class DeckQueue:
+    """
+    The next `size` cards of each user's deck, so opening the deck needs no ranking.
+
+    A queue is filled in the background when it is missing or drops below
+    `low_water`; swipes pop their card. Queued cards are re-checked when served,
+    so a card that went stale in between (swiped elsewhere, job deactivated) is
+    skipped rather than shown. Subclasses implement get/put/pop/delete over their
+    storage. Refills run after the current transaction commits, on a thread pool
+    unless `background=False`.
+    """
+
+    def __init__(self, size=50, low_water=15, background=True, workers=2, **options):
+        self.size = size
+        self.low_water = low_water
+        self.background = background
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='deck-queue') if background else None
+        self._pending = set()
+        self._pending_lock = threading.Lock()
+
+    def get(self, key):
+        # Queued (item_id, cursor) pairs, or None when there is no queue
+        raise NotImplementedError
+
+    def put(self, key, items):
+        raise NotImplementedError
+
+    def pop(self, key, item_ids):
+        # Remove `item_ids` from the queue; returns its new length, or None without a queue
+        raise NotImplementedError
+
+    def delete(self, key):
+        raise NotImplementedError
+
+    def discard_job(self, job_id):
+        # A job left the deck (deactivated or deleted)
+        self.delete((CANDIDATE_DECK, job_id))
+
+    def peek(self, key, count):
+        """
+        The first `count` queued items, or None when fewer are queued; schedules a
+        refill when the queue is missing or running low.
+        """
+        items = self.get(key)
+        if items is None or len(items) - count < self.low_water:
+            self.refill(key)
+        if items is None or len(items) < count:
+            return None
+        return list(items)[:count]
+
+    def swiped(self, key, item_ids):
+        remaining = self.pop(key, item_ids)
+        if remaining is not None and remaining < self.low_water:
+            self.refill(key)
+
+    def refill(self, key):
+        # After commit, so the refill sees the swipes that triggered it
+        transaction.on_commit(lambda: self._schedule(key))
+
+    def _schedule(self, key):
+        with self._pending_lock:
+            if key in self._pending:
+                return
+            self._pending.add(key)
+        if self._executor is None:
+            self._fill(key)
+        else:
+            self._executor.submit(self._fill_in_thread, key)
+
+    def _fill(self, key):
+        try:
+            self.put(key, load_items(key, self.size))
+        finally:
+            with self._pending_lock:
+                self._pending.discard(key)
+            self.filled(key)
+
+    def filled(self, key):
+        # Hook run after each refill attempt, successful or not
+        pass
+
+    def _fill_in_thread(self, key):
+        close_old_connections()
+        try:
+            self._fill(key)
+        finally:
+            close_old_connections()
+
+    def clear(self):
+        with self._pending_lock:
+            self._pending.clear()
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+
+
+class LocalDeckQueue(DeckQueue):
+    # In-process queues, at most `max_users` of them; the least recently used is evicted
+
+    def __init__(self, max_users=10000, **options):
+        super().__init__(**options)
+        self.max_users = max_users
+        self._queues = OrderedDict()
+        # (kind, item_id) -> keys of the queues holding it, to drop a deactivated job everywhere
+        self._holders = {}
+        # Cards swiped while a refill was running, kept out of its result
+        self._swiped = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            items = self._queues.get(key)
+            if items is None:
+                return None
+            self._queues.move_to_end(key)
+            return list(items)
+
+    def put(self, key, items):
+        with self._lock:
+            swiped = self._swiped.pop(key, set())
+            self._remove(key)
+            queue = deque((item_id, cursor) for item_id, cursor in items if item_id not in swiped)
+            self._queues[key] = queue
+            for item_id, _ in queue:
+                self._holders.setdefault((key[0], item_id), set()).add(key)
+            while len(self._queues) > self.max_users:
+                self._remove(next(iter(self._queues)))
+
+    def pop(self, key, item_ids):
+        with self._pending_lock:
+            if key in self._pending:
+                self._swiped.setdefault(key, set()).update(item_ids)
+        with self._lock:
+            queue = self._queues.get(key)
+            if queue is None:
+                return None
+            item_ids = set(item_ids)
+            # Swipes normally take the head of the queue: O(1) each
+            popped = set()
+            while queue and queue[0][0] in item_ids:
+                popped.add(queue.popleft()[0])
+            if item_ids - popped:
+                queue = self._queues[key] = deque(item for item in queue if item[0] not in item_ids)
+            for item_id in item_ids:
+                self._unhold(key, item_id)
+            return len(queue)
+
+    def discard_job(self, job_id):
+        with self._lock:
+            self._remove((CANDIDATE_DECK, job_id))
+            for key in self._holders.pop((JOB_DECK, job_id), set()):
+                queue = self._queues.get(key)
+                if queue is not None:
+                    self._queues[key] = deque(item for item in queue if item[0] != job_id)
+
+    def delete(self, key):
+        with self._lock:
+            self._remove(key)
+
+    def filled(self, key):
+        with self._lock:
+            self._swiped.pop(key, None)
+
+    def _remove(self, key):
+        queue = self._queues.pop(key, None)
+        for item_id, _ in queue or ():
+            self._unhold(key, item_id)
+
+    def _unhold(self, key, item_id):
+        holders = self._holders.get((key[0], item_id))
+        if holders is not None:
+            holders.discard(key)
+            if not holders:
+                del self._holders[(key[0], item_id)]
+
+    def clear(self):
+        super().clear()
+        with self._lock:
+            self._queues.clear()
+            self._holders.clear()
+            self._swiped.clear()
+
+    def __len__(self):
+        return len(self._queues)
+
+
+class CacheDeckQueue(DeckQueue):
+    """
+    Queues stored in a Django cache, shared between processes on a shared
+    backend, which also does the eviction. A deactivated job stays in seekers'
+    queues until they are refilled; serving skips it.
+    """
+
+    def __init__(self, cache_alias='default', timeout=60 * 60, key_prefix='deck-queue', **options):
+        super().__init__(**options)
+        self.cache = caches[cache_alias]
+        self.timeout = timeout
+        self.key_prefix = key_prefix
+
+    def cache_key(self, key):
+        return '%s:%s:%s' % ((self.key_prefix,) + tuple(key))
+
+    def get(self, key):
+        items = self.cache.get(self.cache_key(key))
+        return None if items is None else [(item_id, tuple(cursor)) for item_id, cursor in items]
+
+    def put(self, key, items):
+        self.cache.set(self.cache_key(key), list(items), self.timeout)
+
+    def pop(self, key, item_ids):
+        items = self.get(key)
+        if items is None:
+            return None
+        item_ids = set(item_ids)
+        items = [item for item in items if item[0] not in item_ids]
+        self.put(key, items)
+        return len(items)
+
+    def delete(self, key):
+        self.cache.delete(self.cache_key(key))
+
+
+_queue = None
+_queue_lock = threading.Lock()
+
+
+def get_deck_queue():
+    global _queue
+    if _queue is None:
+        with _queue_lock:
+            if _queue is None:
+                config = getattr(settings, 'DECK_QUEUE', DEFAULT_SETTINGS)
+                backend = import_string(config.get('BACKEND', DEFAULT_SETTINGS['BACKEND']))
+                _queue = backend(**config.get('OPTIONS', {}))
+    return _queue
+
+
+def reset_deck_queue():
+    # Drop the process-wide queue, e.g. after settings change in tests
+    global _queue
+    with _queue_lock:
+        if _queue is not None:
+            _queue.clear()
+            _queue.shutdown()
+        _queue = None
+
+
+def queued_job_page(job_seeker, size, cards):
+    """
+    The first deck page from the seeker's queue as (jobs, next cursor), or None
+    when not enough dealable cards are queued. One query: the cards, re-checked
+    to be active and unswiped.
+    """
+    items = get_deck_queue().peek((JOB_DECK, job_seeker.id), size)
+    if items is None:
+        return None
+    swiped = SwipeAction.objects.filter(profile_id=job_seeker.profile_id, job=OuterRef('pk'))
+    by_id = cards.filter(is_active=True).filter(~Exists(swiped)).in_bulk([item_id for item_id, _ in items])
+    if len(by_id) < size:
+        return None
+    return [by_id[item_id] for item_id, _ in items], encode_cursor(*items[-1][1])
+
+
+def queued_candidate_page(job, size):
+    # As queued_job_page, for a recruiter's candidate deck
+    items = get_deck_queue().peek((CANDIDATE_DECK, job.id), size)
+    if items is None:
+        return None
+    by_id = candidate_base(job).in_bulk([item_id for item_id, _ in items])
+    if len(by_id) < size:
+        return None
+    candidates = []
+    for item_id, (phase, _) in items:
+        candidate = by_id[item_id]
+        candidate.interested = phase == 1
+        candidates.append(candidate)
+    return candidates, encode_cursor(*items[-1][1])
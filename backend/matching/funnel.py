@@ -0,0 +1,258 @@
+import atexit
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import DatabaseError, close_old_connections, transaction
+from django.db.models import Case, Count, F, OuterRef, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from jobs.models import Job, Application
+from .models import JobFunnel, SwipeAction, SwipeRollup, Match
+
+FUNNEL_FIELDS = ('views', 'left_swipes', 'right_swipes', 'matches', 'applications')
+SWIPE_FIELDS = {'left': 'left_swipes', 'right': 'right_swipes'}
+
+DEFAULT_SETTINGS = {
+    # Deck views are buffered in memory and written once this many are pending...
+    'VIEW_FLUSH_THRESHOLD': 1000,
+    # ...or this many seconds after the last write
+    'VIEW_FLUSH_INTERVAL': 10,
+    # Flush on a worker thread rather than in the request that fills the buffer
+    'VIEW_FLUSH_BACKGROUND': True,
+}
+
+
+def funnel_settings():
+    return {**DEFAULT_SETTINGS, **getattr(settings, 'JOB_FUNNEL', {})}
+
+
+def add_counts(deltas):
+    """
+    Add `deltas` ({job_id: {field: n}}) to the jobs' funnel rows with F()
+    expressions, in one UPDATE whatever the number of jobs. Rows are created with
+    their job; a job without one (created before the funnel existed) gets it
+    here, starting at its deltas, unless they decrement something: a missing row
+    then usually means the job is being deleted, and the decrement is skipped.
+    """
+    deltas = {job_id: counts for job_id, counts in deltas.items() if any(counts.values())}
+    if not deltas:
+        return
+    fields = sorted({field for counts in deltas.values() for field, n in counts.items() if n})
+    changes = {}
+    for field in fields:
+        per_job = [When(job_id=job_id, then=Value(counts[field])) for job_id, counts in deltas.items() if counts.get(field)]
+        if len(per_job) == len(deltas) and len({when.result.value for when in per_job}) == 1:
+            # Same delta for every job: no CASE needed
+            changes[field] = F(field) + per_job[0].result
+        else:
+            changes[field] = F(field) + Case(*per_job, default=Value(0))
+    updated = JobFunnel.objects.filter(job_id__in=list(deltas)).update(updated_at=timezone.now(), **changes)
+    creatable = [job_id for job_id, counts in deltas.items() if min(counts.values()) >= 0]
+    if updated < len(deltas) and creatable:
+        # Skips jobs deleted meanwhile; a row created concurrently wins and these
+        # deltas are lost until the next reconcile
+        missing = Job.objects.filter(id__in=creatable, funnel__isnull=True).values_list('id', flat=True)
+        JobFunnel.objects.bulk_create(
+            [JobFunnel(job_id=job_id, **deltas[job_id]) for job_id in missing], ignore_conflicts=True,
+        )
+
+
+def count_swipes(swipes, match_pairs=()):
+    # Seeker swipes on jobs and new (job_id, job_seeker_id) matches, written with them
+    deltas = {}
+    for swipe in swipes:
+        if swipe.job_id is not None:
+            counts = deltas.setdefault(swipe.job_id, Counter())
+            counts[SWIPE_FIELDS[swipe.direction]] += 1
+    for job_id, _ in match_pairs:
+        deltas.setdefault(job_id, Counter())['matches'] += 1
+    add_counts(deltas)
+
+
+class ViewBuffer:
+    """
+    Deck views counted in memory and flushed as one batch of UPDATEs, since
+    every deck page would otherwise write a row per card. Views still buffered
+    when a process dies are lost; the other counters are written with their rows.
+    Flushes run after the current transaction commits, on a worker thread unless
+    `background=False`.
+    """
+
+    def __init__(self, threshold=1000, interval=10, background=True):
+        self.threshold = threshold
+        self.interval = interval
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='funnel-views') if background else None
+        self._scheduled = False
+        self._views = Counter()
+        self._pending = 0
+        self._flushed_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def add(self, job_ids):
+        with self._lock:
+            self._views.update(job_ids)
+            self._pending += len(job_ids)
+            due = not self._scheduled and (
+                self._pending >= self.threshold or time.monotonic() - self._flushed_at >= self.interval
+            )
+            self._scheduled = self._scheduled or due
+        if due:
+            transaction.on_commit(self._schedule)
+
+    def _schedule(self):
+        if self._executor is None:
+            self.flush()
+        else:
+            self._executor.submit(self._flush_in_thread)
+
+    def _flush_in_thread(self):
+        close_old_connections()
+        try:
+            self.flush()
+        finally:
+            close_old_connections()
+
+    def flush(self):
+        with self._lock:
+            self._scheduled = False
+            views, self._views = self._views, Counter()
+            self._pending = 0
+            self._flushed_at = time.monotonic()
+        if not views:
+            return
+        try:
+            with transaction.atomic():
+                add_counts({job_id: {'views': n} for job_id, n in views.items()})
+        except DatabaseError:
+            # Keep them for the next flush
+            with self._lock:
+                self._views.update(views)
+                self._pending += sum(views.values())
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+
+    def __len__(self):
+        return self._pending
+
+
+_buffer = None
+_buffer_lock = threading.Lock()
+
+
+def get_view_buffer():
+    global _buffer
+    if _buffer is None:
+        with _buffer_lock:
+            if _buffer is None:
+                config = funnel_settings()
+                _buffer = ViewBuffer(
+                    config['VIEW_FLUSH_THRESHOLD'], config['VIEW_FLUSH_INTERVAL'], config['VIEW_FLUSH_BACKGROUND'],
+                )
+    return _buffer
+
+
+def reset_view_buffer():
+    # Drop the process-wide buffer, e.g. after settings change in tests
+    global _buffer
+    with _buffer_lock:
+        if _buffer is not None:
+            _buffer.shutdown()
+        _buffer = None
+
+
+@atexit.register
+def flush_views_at_exit():
+    if _buffer is not None:
+        _buffer.shutdown()
+        _buffer.flush()
+
+
+def source_count(queryset, **filters):
+    counts = (
+        queryset.filter(job=OuterRef('job_id'), **filters)
+        .order_by()
+        .values('job')
+        .annotate(count=Count('pk'))
+        .values('count')
+    )
+    return Coalesce(Subquery(counts), Value(0))
+
+
+def archived_left_swipes():
+    # Left swipes archived out of SwipeAction, from their monthly rollups (matching/archive.py)
+    totals = (
+        SwipeRollup.objects.filter(job=OuterRef('job_id'))
+        .order_by()
+        .values('job')
+        .annotate(total=Sum('left_swipes'))
+        .values('total')
+    )
+    return Coalesce(Subquery(totals), Value(0))
+
+
+def reconcile_funnels(job_ids=None, batch_size=1000):
+    """
+    Recompute the swipe, match and application counters from the source tables
+    (archived swipes from their rollups), `batch_size` jobs per transaction,
+    creating missing rows. Views have no
+    source table and are kept. Returns the number of jobs reconciled.
+    """
+    jobs = Job.objects.order_by('id')
+    if job_ids is not None:
+        jobs = jobs.filter(id__in=job_ids)
+    reconciled, last_id = 0, 0
+    while True:
+        batch = list(jobs.filter(id__gt=last_id).values_list('id', flat=True)[:batch_size])
+        if not batch:
+            return reconciled
+        with transaction.atomic():
+            JobFunnel.objects.bulk_create([JobFunnel(job_id=job_id) for job_id in batch], ignore_conflicts=True)
+            JobFunnel.objects.filter(job_id__in=batch).update(
+                left_swipes=source_count(SwipeAction.objects, direction='left') + archived_left_swipes(),
+                right_swipes=source_count(SwipeAction.objects, direction='right'),
+                matches=source_count(Match.objects),
+                applications=source_count(Application.objects),
+                updated_at=timezone.now(),
+            )
+        reconciled += len(batch)
+        last_id = batch[-1]
+
+
+def rate(numerator, denominator):
+    return round(numerator / denominator, 4) if denominator else None
+
+
+def funnel_summary(counts):
+    # Counters plus the conversion between each stage
+    swipes = counts['left_swipes'] + counts['right_swipes']
+    return {
+        **counts,
+        'swipe_rate': rate(swipes, counts['views']),
+        'right_swipe_rate': rate(counts['right_swipes'], swipes),
+        'match_rate': rate(counts['matches'], counts['right_swipes']),
+        'application_rate': rate(counts['applications'], counts['views']),
+    }
+
+
+def recruiter_funnels(recruiter):
+    """
+    Per-job funnels for the recruiter's jobs, newest first, and their totals.
+    One query over the counter rows; jobs without a row count as zero.
+    """
+    rows = Job.objects.filter(recruiter=recruiter).order_by('-created_at', '-id').values(
+        'id', 'title', 'is_active', *[f'funnel__{field}' for field in FUNNEL_FIELDS]
+    )
+    totals = dict.fromkeys(FUNNEL_FIELDS, 0)
+    jobs = []
+    for row in rows:
+        counts = {field: row[f'funnel__{field}'] or 0 for field in FUNNEL_FIELDS}
+        for field, n in counts.items():
+            totals[field] += n
+        jobs.append({'job_id': row['id'], 'title': row['title'], 'is_active': row['is_active'], **funnel_summary(counts)})
+    return {'jobs': jobs, 'totals': funnel_summary(totals)}
@@ -0,0 +1,41 @@
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Substr
+
+from .models import Message
+
+# Characters of the last message shown in the inbox
+SNIPPET_LENGTH = 100
+
+
+def with_inbox_fields(matches, reader):
+    """
+    Annotate `matches` with their last message (last_message_id / _text / _at /
+    _sender_id, None without messages) and the number of messages `reader` has
+    not read yet. Correlated subqueries, so a page of any size stays one query:
+    the last message walks message_match_created_idx, the unread count the
+    partial message_unread_idx.
+    """
+    latest = Message.objects.filter(match=OuterRef('pk')).order_by('-created_at', '-id')
+    unread = (
+        Message.objects.filter(match=OuterRef('pk'), is_read=False)
+        .exclude(sender=reader)
+        .values('match')
+        .annotate(count=Count('id'))
+        .values('count')
+    )
+    return matches.annotate(
+        last_message_id=Subquery(latest.values('id')[:1]),
+        last_message_text=Subquery(latest.annotate(snippet=Substr('content', 1, SNIPPET_LENGTH)).values('snippet')[:1]),
+        last_message_at=Subquery(latest.values('created_at')[:1]),
+        last_message_sender_id=Subquery(latest.values('sender_id')[:1]),
+        unread_count=Coalesce(Subquery(unread, output_field=IntegerField()), Value(0)),
+    )
+
+
+def inbox_queryset(matches, reader):
+    # The reader's counterpart is the recruiter for a job seeker and the seeker for a recruiter
+    if reader.user_type == 'job_seeker':
+        related = ('job__recruiter__profile__user',)
+    else:
+        related = ('job', 'job_seeker__profile__user')
+    return with_inbox_fields(matches.select_related(*related), reader)
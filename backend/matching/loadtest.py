@@ -0,0 +1,346 @@
+import json
+import random
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+
+from jobs.models import Job
+from .models import Match
+
+# Scenario -> (role, default weight); one request each
+SCENARIOS = {
+    'deck': ('job_seeker', 20),
+    'swipe': ('job_seeker', 25),
+    'swipe_batch': ('job_seeker', 5),
+    'job_list': ('job_seeker', 8),
+    'job_search': ('job_seeker', 8),
+    'matches': ('job_seeker', 4),
+    'inbox': ('job_seeker', 8),
+    'messages': ('job_seeker', 8),
+    'send_message': ('job_seeker', 4),
+    'candidate_deck': ('recruiter', 4),
+    'candidate_swipe': ('recruiter', 4),
+    'funnel': ('recruiter', 2),
+}
+SEARCH_TERMS = ['python', 'react', 'data', 'sales', 'engineer', 'manager', 'remote', 'designer']
+BATCH_SWIPES = 5
+# Swipe scenario -> the deck that deals its cards
+DEALT_BY = {'swipe': 'deck', 'swipe_batch': 'deck', 'candidate_swipe': 'candidate_deck'}
+
+
+class Session:
+    """
+    One benchmark account: its token, the ids its requests need and the cards
+    its deck requests dealt, which its swipes then use up. Each session belongs
+    to one worker thread, so two requests never swipe the same card.
+    """
+
+    def __init__(self, role, token, job_ids=(), match_ids=()):
+        self.role = role
+        self.token = token
+        self.job_ids = list(job_ids)
+        self.match_ids = list(match_ids)
+        self.cards = []
+
+
+def load_sessions(prefix, seekers, recruiters, rng):
+    # Random accounts generated by seed_bench (matching/seeding.py) with the ids their requests need
+    def pick(kind, count):
+        tokens = list(Token.objects.filter(user__username__startswith=f'{prefix}-{kind}').order_by('user_id').values_list(
+            'key', 'user__profile__jobseekerprofile__id' if kind == 's' else 'user__profile__recruiterprofile__id',
+        ))
+        return rng.sample(tokens, min(count, len(tokens)))
+
+    picked = pick('s', seekers)
+    matches = {}
+    for seeker_id, match_id in Match.objects.filter(
+        job_seeker_id__in=[seeker_id for _, seeker_id in picked], is_active=True
+    ).values_list('job_seeker_id', 'id'):
+        matches.setdefault(seeker_id, []).append(match_id)
+    sessions = [Session('job_seeker', key, match_ids=matches.get(seeker_id, ())) for key, seeker_id in picked]
+
+    picked = pick('r', recruiters)
+    jobs = {}
+    for recruiter_id, job_id in Job.objects.filter(
+        recruiter_id__in=[recruiter_id for _, recruiter_id in picked], is_active=True
+    ).values_list('recruiter_id', 'id'):
+        jobs.setdefault(recruiter_id, []).append(job_id)
+    sessions += [Session('recruiter', key, job_ids=jobs.get(recruiter_id, ())) for key, recruiter_id in picked]
+    return sessions
+
+
+def build_request(scenario, session, rng):
+    """
+    (method, path, JSON body) of one request of `scenario` for `session`, or
+    None when the session has nothing to do it on: no matches, no jobs, or no
+    cards left to swipe from its last deck.
+    """
+    if scenario == 'deck':
+        return 'GET', '/api/matching/deck/', None
+    if scenario == 'swipe' and session.cards:
+        return 'POST', '/api/matching/swipe/', {
+            'job_id': session.cards.pop(), 'direction': rng.choice(['left', 'left', 'right']),
+        }
+    if scenario == 'swipe_batch' and session.cards:
+        swipes = [
+            {'job_id': session.cards.pop(), 'direction': rng.choice(['left', 'left', 'right'])}
+            for _ in range(min(BATCH_SWIPES, len(session.cards)))
+        ]
+        return 'POST', '/api/matching/swipe/batch/', {'swipes': swipes}
+    if scenario == 'job_list':
+        return 'GET', '/api/jobs/jobs/', None
+    if scenario == 'job_search':
+        return 'GET', f'/api/jobs/jobs/search/?q={rng.choice(SEARCH_TERMS)}', None
+    if scenario == 'matches':
+        return 'GET', '/api/matching/matches/', None
+    if scenario == 'inbox':
+        return 'GET', '/api/matching/matches/inbox/', None
+    if scenario == 'messages' and session.match_ids:
+        return 'GET', f'/api/matching/messages/?match_id={rng.choice(session.match_ids)}', None
+    if scenario == 'send_message' and session.match_ids:
+        return 'POST', '/api/matching/messages/', {'match': rng.choice(session.match_ids), 'content': 'Benchmark message'}
+    if scenario == 'candidate_deck' and session.job_ids:
+        return 'GET', f'/api/matching/jobs/{rng.choice(session.job_ids)}/deck/', None
+    if scenario == 'candidate_swipe' and session.cards:
+        job_id, job_seeker_id = session.cards.pop()
+        return 'POST', '/api/matching/swipe/', {
+            'job_id': job_id, 'job_seeker_id': job_seeker_id, 'direction': rng.choice(['left', 'right']),
+        }
+    if scenario == 'funnel':
+        return 'GET', '/api/matching/jobs/funnel/', None
+    return None
+
+
+def keep_cards(scenario, session, path, body):
+    # Remember the cards a deck dealt for later swipes
+    if not isinstance(body, dict) or not isinstance(body.get('results'), list):
+        return
+    if scenario == 'deck':
+        session.cards = [card['id'] for card in body['results']][::-1]
+    elif scenario == 'candidate_deck':
+        job_id = int(path.strip('/').split('/')[-2])
+        session.cards = [(job_id, card['id']) for card in body['results']][::-1]
+
+
+class InProcessTransport:
+    """
+    Requests through Django's test client in this process, one client per
+    thread, with the queries each request ran counted. Nothing goes over the
+    network, so latencies are the application and database time alone.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def request(self, method, path, data, token):
+        client = getattr(self._local, 'client', None)
+        if client is None:
+            client = self._local.client = Client(raise_request_exception=False)
+        headers = {'Authorization': f'Token {token}'}
+        with CaptureQueriesContext(connection) as queries:
+            start = time.perf_counter()
+            if method == 'GET':
+                response = client.get(path, headers=headers)
+            else:
+                response = client.post(path, json.dumps(data), content_type='application/json', headers=headers)
+            elapsed = time.perf_counter() - start
+        body = response.json() if response.get('Content-Type', '').startswith('application/json') else None
+        return response.status_code, elapsed, len(queries), body
+
+    def close(self):
+        connection.close()
+
+
+class HttpTransport:
+    # Requests to a running server at `base_url`; queries per request are not visible from here
+
+    def __init__(self, base_url, timeout=30):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+
+    def request(self, method, path, data, token):
+        request = urllib.request.Request(
+            self.base_url + path, method=method, data=json.dumps(data).encode() if data is not None else None,
+            headers={'Authorization': f'Token {token}', 'Content-Type': 'application/json'},
+        )
+        start = time.perf_counter()
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                status, content = response.status, response.read()
+        except urllib.error.HTTPError as error:
+            status, content = error.code, error.read()
+        elapsed = time.perf_counter() - start
+        try:
+            body = json.loads(content) if content else None
+        except ValueError:
+            body = None
+        return status, elapsed, None, body
+
+    def close(self):
+        pass
+
+
+def parse_mix(text):
+    # "deck=20,swipe=30" -> weights; scenarios left out are not run
+    if not text:
+        return {name: weight for name, (_, weight) in SCENARIOS.items()}
+    mix = {}
+    for part in text.split(','):
+        name, _, weight = part.partition('=')
+        name = name.strip()
+        if name not in SCENARIOS:
+            raise ValueError(f'Unknown scenario {name!r}; choose from {", ".join(SCENARIOS)}')
+        mix[name] = float(weight) if weight else SCENARIOS[name][1]
+    return mix
+
+
+class LoadRunner:
+    """
+    Drives the API endpoints with `concurrency` worker threads, each issuing its
+    share of the requests back to back on its own sessions, with scenarios drawn
+    by weight from `mix`. Collects (scenario, seconds, status, queries) samples.
+    """
+
+    def __init__(self, transport, sessions, mix, concurrency=4, seed=0):
+        self.transport = transport
+        self.mix = mix
+        self.concurrency = concurrency
+        self.seed = seed
+        roles = {SCENARIOS[name][0] for name in mix}
+        for role in roles:
+            if sum(session.role == role for session in sessions) < concurrency:
+                raise ValueError(f'Need at least {concurrency} {role} accounts for {concurrency} workers')
+        # Every worker gets its own sessions of each role
+        self.worker_sessions = [
+            {role: [session for session in sessions if session.role == role][index::concurrency] for role in roles}
+            for index in range(concurrency)
+        ]
+
+    def run(self, requests, phase=0):
+        # Samples of `requests` requests and the wall-clock seconds they took
+        shares = [requests // self.concurrency + (index < requests % self.concurrency) for index in range(self.concurrency)]
+        start = time.perf_counter()
+        if self.concurrency == 1:
+            samples = [self.work(0, shares[0], phase)]
+        else:
+            with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='bench') as executor:
+                samples = list(executor.map(self.work_in_thread, range(self.concurrency), shares, [phase] * self.concurrency))
+        return [sample for worker in samples for sample in worker], time.perf_counter() - start
+
+    def work_in_thread(self, index, count, phase):
+        try:
+            return self.work(index, count, phase)
+        finally:
+            self.transport.close()
+
+    def work(self, index, count, phase):
+        rng = random.Random(f'{self.seed}-{phase}-{index}')
+        names, weights = list(self.mix), list(self.mix.values())
+        sessions = self.worker_sessions[index]
+        samples = []
+        while len(samples) < count:
+            scenario = rng.choices(names, weights)[0]
+            candidates = sessions[SCENARIOS[scenario][0]]
+            session = rng.choice(candidates)
+            request = build_request(scenario, session, rng)
+            if request is None and scenario in DEALT_BY:
+                # Out of cards: open the deck first, as the app would
+                scenario = DEALT_BY[scenario]
+                request = build_request(scenario, session, rng)
+            if request is None:
+                samples.append((scenario, None, None, None))
+                continue
+            method, path, data = request
+            try:
+                status, elapsed, queries, body = self.transport.request(method, path, data, session.token)
+            except Exception:
+                samples.append((scenario, None, 0, None))
+                continue
+            keep_cards(scenario, session, path, body)
+            samples.append((scenario, elapsed, status, queries))
+        return samples
+
+
+def percentile(values, q):
+    return round(float(np.percentile(values, q)), 3)
+
+
+def summarize(samples, elapsed):
+    # Throughput, latency percentiles (ms), status codes and queries per request of `samples`
+    timed = [sample for sample in samples if sample[1] is not None]
+    latencies = np.array([seconds * 1000 for _, seconds, _, _ in timed])
+    queries = [count for _, _, _, count in timed if count is not None]
+    statuses = Counter(str(status) for _, _, status, _ in samples if status is not None)
+    summary = {
+        'requests': len(timed),
+        'skipped': sum(sample[2] is None for sample in samples),
+        'errors': sum(status == 0 or status >= 500 for _, _, status, _ in samples if status is not None),
+        'throughput_rps': round(len(timed) / elapsed, 2) if elapsed else None,
+        'statuses': dict(sorted(statuses.items())),
+    }
+    if len(latencies):
+        summary.update({
+            'mean_ms': round(float(latencies.mean()), 3),
+            'p50_ms': percentile(latencies, 50),
+            'p95_ms': percentile(latencies, 95),
+            'p99_ms': percentile(latencies, 99),
+            'max_ms': round(float(latencies.max()), 3),
+        })
+    if queries:
+        summary.update({'queries_mean': round(sum(queries) / len(queries), 2), 'queries_max': max(queries)})
+    return summary
+
+
+def run_benchmark(runner, requests, warmup=0):
+    """
+    A report of `requests` requests after `warmup` discarded ones: `overall`
+    and per-`scenarios` summaries plus run metadata, ready for json.dumps.
+    """
+    if warmup:
+        runner.run(warmup, phase=1)
+    samples, elapsed = runner.run(requests)
+    scenarios = {}
+    for sample in samples:
+        scenarios.setdefault(sample[0], []).append(sample)
+    return {
+        'meta': {
+            'started_at': timezone.now().isoformat(),
+            'transport': type(runner.transport).__name__,
+            'database': connection.vendor,
+            'requests': requests,
+            'warmup': warmup,
+            'concurrency': runner.concurrency,
+            'seed': runner.seed,
+            'mix': runner.mix,
+            'elapsed_s': round(elapsed, 3),
+        },
+        'overall': summarize(samples, elapsed),
+        'scenarios': {name: summarize(scenarios[name], elapsed) for name in runner.mix if name in scenarios},
+    }
+
+
+COMPARED = ('throughput_rps', 'p50_ms', 'p95_ms', 'p99_ms', 'queries_mean')
+
+
+def compare_reports(baseline, report):
+    # (scenario, metric, before, after, relative change) for the metrics both reports have
+    rows = []
+    sections = [('overall', baseline.get('overall', {}), report['overall'])] + [
+        (name, baseline.get('scenarios', {}).get(name, {}), summary) for name, summary in report['scenarios'].items()
+    ]
+    for name, before, after in sections:
+        for metric in COMPARED:
+            if before.get(metric) is not None and after.get(metric) is not None:
+                change = (after[metric] - before[metric]) / before[metric] if before[metric] else None
+                rows.append((name, metric, before[metric], after[metric], change))
+    return rows
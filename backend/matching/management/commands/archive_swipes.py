@@ -0,0 +1,19 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from matching.archive import ARCHIVE_BATCH_SIZE, DEFAULT_ARCHIVE_AFTER_DAYS, archive_swipes
+
+
+class Command(BaseCommand):
+    help = ('Move left swipes older than --older-than days, or on inactive jobs, out of SwipeAction '
+            'into packed per-profile archives and monthly per-job rollups')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--older-than', type=int, default=DEFAULT_ARCHIVE_AFTER_DAYS, help='Age in days')
+        parser.add_argument('--batch-size', type=int, default=ARCHIVE_BATCH_SIZE, help='Swipes per transaction')
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        count = archive_swipes(options['older_than'], options['batch_size'])
+        self.stdout.write(f'Archived {count} swipes in {time.perf_counter() - start:.2f} s')
@@ -0,0 +1,195 @@
+import random
+import statistics
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models import Exists, OuterRef
+
+from users.models import Profile, RecruiterProfile, JobSeekerProfile
+from jobs.models import Job
+from matching.models import SwipeAction, Match, Message
+
+
+def hot_queries(rng, ids):
+    # (label, callable building the queryset for one random parameter set)
+    def swipe_on_job():
+        return SwipeAction.objects.filter(
+            profile_id=rng.choice(ids['seeker_profiles']), job_id=rng.choice(ids['jobs']), direction='right'
+        )
+
+    def swipe_on_candidate():
+        return SwipeAction.objects.filter(
+            profile_id=rng.choice(ids['recruiter_profiles']), candidate_id=rng.choice(ids['seekers']), direction='right'
+        )
+
+    def deck_anti_join():
+        swiped = SwipeAction.objects.filter(profile_id=rng.choice(ids['seeker_profiles']), job=OuterRef('pk'))
+        return Job.objects.filter(is_active=True).filter(~Exists(swiped)).order_by('-id')[:20]
+
+    def seeker_matches():
+        return Match.objects.filter(job_seeker_id=rng.choice(ids['seekers']), is_active=True)
+
+    def recruiter_matches():
+        return Match.objects.filter(job__recruiter_id=rng.choice(ids['recruiters']), is_active=True)
+
+    def chat_history():
+        return Message.objects.filter(match_id=rng.choice(ids['matches'])).order_by('created_at')
+
+    return [
+        ('swipe (profile, job, direction)', swipe_on_job),
+        ('swipe (profile, candidate, direction)', swipe_on_candidate),
+        ('deck anti-join', deck_anti_join),
+        ('match (job_seeker, is_active)', seeker_matches),
+        ('match (job__recruiter, is_active)', recruiter_matches),
+        ('message (match_id, created_at)', chat_history),
+    ]
+
+
+def indexed_models():
+    return [SwipeAction, Match, Message, Job]
+
+
+class Command(BaseCommand):
+    help = (
+        'Seed a throwaway test database and compare query plans and timings of the hot '
+        'SwipeAction/Match/Message queries without and with their Meta indexes and constraints'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seekers', type=int, default=2000)
+        parser.add_argument('--recruiters', type=int, default=100)
+        parser.add_argument('--jobs', type=int, default=1000)
+        parser.add_argument('--swipes-per-seeker', type=int, default=50)
+        parser.add_argument('--messages', type=int, default=20000)
+        parser.add_argument('--repeat', type=int, default=50)
+        parser.add_argument('--plans', action='store_true', help='Print EXPLAIN output for each query')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            rng = random.Random(options['seed'])
+            ids = self.seed(rng, options)
+            queries = hot_queries(rng, ids)
+
+            self.analyze()
+            self.set_indexes(enabled=False)
+            before = self.measure(queries, options)
+            self.set_indexes(enabled=True)
+            self.analyze()
+            after = self.measure(queries, options)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+        self.stdout.write(f"{'query':<40}{'before ms':>12}{'after ms':>12}{'speedup':>10}")
+        for label, _ in queries:
+            speedup = before[label]['ms'] / after[label]['ms'] if after[label]['ms'] else float('inf')
+            self.stdout.write(f"{label:<40}{before[label]['ms']:12.3f}{after[label]['ms']:12.3f}{speedup:9.1f}x")
+            if options['plans']:
+                self.stdout.write(f"  before: {before[label]['plan']}")
+                self.stdout.write(f"  after:  {after[label]['plan']}")
+
+    def set_indexes(self, enabled):
+        # Meta is emptied while dropping so SQLite's table rebuilds don't recreate what was dropped
+        saved = {model: (model._meta.indexes, model._meta.constraints) for model in indexed_models()}
+        try:
+            for model, (indexes, constraints) in saved.items():
+                if not enabled:
+                    model._meta.indexes, model._meta.constraints = [], []
+                with connection.schema_editor() as editor:
+                    for index in indexes:
+                        if (index.name in self.existing(model)) != enabled:
+                            (editor.add_index if enabled else editor.remove_index)(model, index)
+                    for constraint in constraints:
+                        if (constraint.name in self.existing(model)) != enabled:
+                            (editor.add_constraint if enabled else editor.remove_constraint)(model, constraint)
+        finally:
+            for model, (indexes, constraints) in saved.items():
+                model._meta.indexes, model._meta.constraints = indexes, constraints
+
+    def analyze(self):
+        # Refresh planner statistics after bulk loads and index changes
+        if connection.vendor in ('sqlite', 'postgresql'):
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE')
+
+    def existing(self, model):
+        with connection.cursor() as cursor:
+            return connection.introspection.get_constraints(cursor, model._meta.db_table)
+
+    def measure(self, queries, options):
+        results = {}
+        for label, build in queries:
+            plan = ' | '.join(build().explain().splitlines())
+            timings = []
+            for _ in range(options['repeat']):
+                # Time only the database round trip, not ORM compilation
+                sql, params = build().query.sql_with_params()
+                with connection.cursor() as cursor:
+                    start = time.perf_counter()
+                    cursor.execute(sql, params)
+                    cursor.fetchall()
+                    timings.append(time.perf_counter() - start)
+            results[label] = {'ms': statistics.median(timings) * 1000, 'plan': plan}
+        return results
+
+    def seed(self, rng, options):
+        # Rows are re-read after bulk_create because MySQL does not return primary keys
+        self.stdout.write('Seeding benchmark data...')
+        User.objects.bulk_create([
+            User(username=f'bench{i}', password='!')
+            for i in range(options['recruiters'] + options['seekers'])
+        ])
+        users = list(User.objects.order_by('id'))
+        Profile.objects.bulk_create([
+            Profile(user=user, user_type='recruiter' if i < options['recruiters'] else 'job_seeker')
+            for i, user in enumerate(users)
+        ])
+        profiles = list(Profile.objects.order_by('id'))
+        RecruiterProfile.objects.bulk_create([
+            RecruiterProfile(profile=profile, company_name=f'Company {i}', position='Recruiter')
+            for i, profile in enumerate(profiles[:options['recruiters']])
+        ])
+        recruiters = list(RecruiterProfile.objects.order_by('id'))
+        JobSeekerProfile.objects.bulk_create([
+            JobSeekerProfile(profile=profile, experience_years=rng.randint(0, 15))
+            for profile in profiles[options['recruiters']:]
+        ])
+        seekers = list(JobSeekerProfile.objects.order_by('id'))
+        Job.objects.bulk_create([
+            Job(recruiter=rng.choice(recruiters), title=f'Job {i}', description='', requirements='',
+                location='Remote', is_active=rng.random() < 0.8)
+            for i in range(options['jobs'])
+        ])
+        jobs = list(Job.objects.order_by('id'))
+
+        swipes = []
+        for seeker in seekers:
+            for job in rng.sample(jobs, min(options['swipes_per_seeker'], len(jobs))):
+                swipes.append(SwipeAction(profile_id=seeker.profile_id, job=job, direction=rng.choice(['left', 'right'])))
+        for recruiter in recruiters:
+            for seeker in rng.sample(seekers, min(options['swipes_per_seeker'] * 4, len(seekers))):
+                swipes.append(SwipeAction(profile_id=recruiter.profile_id, candidate=seeker, direction=rng.choice(['left', 'right'])))
+        SwipeAction.objects.bulk_create(swipes, batch_size=5000)
+
+        pairs = {(rng.choice(jobs).id, rng.choice(seekers).id) for _ in range(len(seekers) * 2)}
+        Match.objects.bulk_create(
+            [Match(job_id=job_id, job_seeker_id=seeker_id) for job_id, seeker_id in pairs], batch_size=5000
+        )
+        match_ids = list(Match.objects.values_list('id', flat=True))
+        Message.objects.bulk_create([
+            Message(match_id=rng.choice(match_ids), sender=rng.choice(profiles), content='Hello')
+            for _ in range(options['messages'])
+        ], batch_size=5000)
+
+        self.stdout.write(f'  {len(swipes)} swipes, {len(match_ids)} matches, {options["messages"]} messages')
+        return {
+            'recruiters': [recruiter.id for recruiter in recruiters],
+            'recruiter_profiles': [recruiter.profile_id for recruiter in recruiters],
+            'seekers': [seeker.id for seeker in seekers],
+            'seeker_profiles': [seeker.profile_id for seeker in seekers],
+            'jobs': [job.id for job in jobs],
+            'matches': match_ids,
+        }
@@ -0,0 +1,96 @@
+import json
+import random
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.backends.signals import connection_created
+
+from matching.loadtest import (
+    HttpTransport, InProcessTransport, LoadRunner, compare_reports, load_sessions, parse_mix, run_benchmark,
+)
+
+
+def sqlite_for_load(sender, connection, **kwargs):
+    # Readers don't block the writer under WAL; writers wait for each other instead of failing
+    if connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA journal_mode=WAL')
+            cursor.execute('PRAGMA busy_timeout=30000')
+
+
+class Command(BaseCommand):
+    help = (
+        'Drive the API endpoints concurrently as accounts generated by seed_bench and report throughput, '
+        'p50/p95/p99 latency and queries per request, overall and per scenario, as JSON'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=2000)
+        parser.add_argument('--warmup', type=int, default=200, help='Requests run first and left out of the report')
+        parser.add_argument('--concurrency', type=int, default=4, help='Worker threads')
+        parser.add_argument('--users', type=int, default=100, help='Job seeker accounts used (recruiters: a tenth)')
+        parser.add_argument('--mix', default='', help='Scenario weights, e.g. deck=20,swipe=30 (default: all)')
+        parser.add_argument('--prefix', default='bench', help='Username prefix given to seed_bench')
+        parser.add_argument('--base-url', help='Benchmark a running server instead of this process (no query counts)')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--output', help='Write the JSON report here instead of stdout')
+        parser.add_argument('--baseline', help='An earlier JSON report to compare against')
+
+    def handle(self, *args, **options):
+        try:
+            mix = parse_mix(options['mix'])
+        except ValueError as error:
+            raise CommandError(error)
+        concurrency = max(1, options['concurrency'])
+        sessions = load_sessions(
+            options['prefix'], max(options['users'], concurrency), max(options['users'] // 10, concurrency),
+            random.Random(options['seed']),
+        )
+        if options['base_url']:
+            transport = HttpTransport(options['base_url'])
+        else:
+            transport = InProcessTransport()
+            connection_created.connect(sqlite_for_load)
+            if connection.connection is not None:
+                sqlite_for_load(None, connection)
+        try:
+            runner = LoadRunner(transport, sessions, mix, concurrency, options['seed'])
+        except ValueError as error:
+            raise CommandError(f'{error}; run seed_bench first')
+        try:
+            report = run_benchmark(runner, options['requests'], options['warmup'])
+        finally:
+            connection_created.disconnect(sqlite_for_load)
+
+        self.print_summary(report)
+        if options['baseline']:
+            with open(options['baseline'], encoding='utf-8') as handle:
+                self.print_comparison(compare_reports(json.load(handle), report))
+        text = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as handle:
+                handle.write(text + '\n')
+        else:
+            self.stdout.write(text)
+
+    def print_summary(self, report):
+        # Human-readable table on stderr, so stdout stays valid JSON
+        sys.stderr.write(
+            f"{'scenario':<18}{'requests':>9}{'rps':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+            f"{'queries':>9}{'errors':>8}\n"
+        )
+        for name, summary in [*report['scenarios'].items(), ('overall', report['overall'])]:
+            sys.stderr.write(
+                f"{name:<18}{summary['requests']:>9}{summary['throughput_rps'] or 0:>9.1f}"
+                f"{summary.get('p50_ms', 0):>9.1f}{summary.get('p95_ms', 0):>9.1f}{summary.get('p99_ms', 0):>9.1f}"
+                f"{summary.get('queries_mean', 0):>9.1f}{summary['errors']:>8}\n"
+            )
+
+    def print_comparison(self, rows):
+        sys.stderr.write(f"\n{'scenario':<18}{'metric':<16}{'baseline':>10}{'now':>10}{'change':>9}\n")
+        for name, metric, before, after, change in rows:
+            sys.stderr.write(
+                f"{name:<18}{metric:<16}{before:>10.1f}{after:>10.1f}"
+                f"{'' if change is None else f'{change:+.0%}':>9}\n"
+            )
@@ -0,0 +1,111 @@
+import random
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand
+
+from matching.scoring import (
+    EXPERIENCE_LEVELS, WEIGHTS, NEUTRAL, JobFeatures, SeekerFeatures, normalize_location, score_jobs,
+)
+
+LOCATIONS = ['Berlin', 'London', 'New York, NY', 'San Francisco, CA', 'Austin, TX', 'Remote']
+
+
+def naive_score_job(seeker, seeker_skills, job, job_skills):
+    # Reference per-object implementation of scoring.score_jobs
+    if job_skills and seeker_skills:
+        skills = len(job_skills & seeker_skills) / len(job_skills)
+    else:
+        skills = NEUTRAL
+
+    years = seeker['experience_years']
+    seeker_level = 3 if years >= 10 else 2 if years >= 5 else 1 if years >= 2 else 0
+    experience = 1.0 - abs(EXPERIENCE_LEVELS[job['experience_level']] - seeker_level) / 3
+
+    if job['salary_max'] is None or not seeker['desired_salary']:
+        salary = NEUTRAL
+    else:
+        salary = min(max(job['salary_max'] / seeker['desired_salary'], 0.0), 1.0)
+
+    seeker_location = normalize_location(seeker['profile__location'])
+    same_place = seeker_location != '' and normalize_location(job['location']) == seeker_location
+    location = 1.0 if job['is_remote'] or same_place else 0.0
+
+    return (
+        WEIGHTS['skills'] * skills
+        + WEIGHTS['experience'] * experience
+        + WEIGHTS['salary'] * salary
+        + WEIGHTS['location'] * location
+    )
+
+
+class Command(BaseCommand):
+    help = 'Benchmark vectorized job scoring against a naive per-object loop on synthetic data'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--jobs', type=int, default=5000)
+        parser.add_argument('--skills', type=int, default=200, help='Size of the skill vocabulary')
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        vocabulary = range(1, options['skills'] + 1)
+
+        jobs = []
+        job_links = []
+        for job_id in range(1, options['jobs'] + 1):
+            salary_max = rng.choice([None, rng.randrange(40000, 200000, 5000)])
+            jobs.append({
+                'id': job_id,
+                'experience_level': rng.choice(list(EXPERIENCE_LEVELS)),
+                'salary_min': None,
+                'salary_max': salary_max,
+                'is_remote': rng.random() < 0.2,
+                'location': rng.choice(LOCATIONS),
+            })
+            job_links.extend((job_id, skill_id) for skill_id in rng.sample(vocabulary, rng.randint(0, 8)))
+
+        seeker = {
+            'id': 1,
+            'experience_years': rng.randint(0, 15),
+            'desired_salary': rng.randrange(40000, 200000, 5000),
+            'profile__location': rng.choice(LOCATIONS),
+        }
+        seeker_skills = set(rng.sample(vocabulary, 6))
+
+        skills_by_job = {}
+        for job_id, skill_id in job_links:
+            skills_by_job.setdefault(job_id, set()).add(skill_id)
+
+        def naive():
+            return [naive_score_job(seeker, seeker_skills, job, skills_by_job.get(job['id'], set())) for job in jobs]
+
+        def vectorized():
+            job_features = JobFeatures(jobs, job_links)
+            seeker_features = SeekerFeatures([seeker], [(1, skill_id) for skill_id in seeker_skills])
+            return score_jobs(seeker_features, 0, job_features)
+
+        def vectorized_score_only():
+            return score_jobs(seeker_features, 0, job_features)
+
+        job_features = JobFeatures(jobs, job_links)
+        seeker_features = SeekerFeatures([seeker], [(1, skill_id) for skill_id in seeker_skills])
+
+        if not np.allclose(naive(), vectorized()):
+            self.stderr.write(self.style.ERROR('Vectorized scores differ from the naive implementation'))
+            return
+
+        self.stdout.write(f"Scoring {len(jobs)} jobs, best of {options['repeat']} runs")
+        for label, func in (
+            ('naive per-object loop', naive),
+            ('vectorized incl. encoding', vectorized),
+            ('vectorized scoring only', vectorized_score_only),
+        ):
+            best = min(self.timed(func) for _ in range(options['repeat']))
+            self.stdout.write(f"  {label:<28}{best * 1000:9.2f} ms{len(jobs) / best:14,.0f} jobs/s")
+
+    def timed(self, func):
+        start = time.perf_counter()
+        func()
+        return time.perf_counter() - start
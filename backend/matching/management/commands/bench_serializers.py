@@ -0,0 +1,109 @@
+import random
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from rest_framework.renderers import JSONRenderer
+
+from config.fastpath import RowSerializer
+from config.fieldsets import fieldset_queryset
+from config.renderers import FastJSONRenderer
+from users.models import Profile, RecruiterProfile, JobSeekerProfile
+from jobs.models import Job
+from jobs.serializers import JobSerializer
+from matching.models import Match
+from matching.serializers import MatchSerializer
+
+
+def cases():
+    # (label, serializer class, serializer kwargs)
+    return [
+        ('jobs (list)', JobSerializer, {'compact': True}),
+        ('jobs (full)', JobSerializer, {}),
+        ('matches (list)', MatchSerializer, {'compact': True}),
+        ('matches (full)', MatchSerializer, {}),
+    ]
+
+
+class Command(BaseCommand):
+    help = (
+        'Seed a throwaway test database and compare rows/second of the DRF serializer + JSONRenderer '
+        'path with the RowSerializer + FastJSONRenderer path for job and match lists'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1000)
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            self.seed(random.Random(options['seed']), options['rows'])
+            results = [self.measure(label, serializer_class, kwargs, options) for label, serializer_class, kwargs in cases()]
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+        self.stdout.write(f"{'payload':<18}{'rows':>7}{'drf rows/s':>14}{'fast rows/s':>14}{'speedup':>10}")
+        for label, rows, slow, fast in results:
+            self.stdout.write(f'{label:<18}{rows:>7}{rows / slow:>14.0f}{rows / fast:>14.0f}{slow / fast:>9.1f}x')
+
+    def measure(self, label, serializer_class, kwargs, options):
+        model = serializer_class.Meta.model
+        serializer = serializer_class(**kwargs)
+        queryset = fieldset_queryset(model.objects.order_by('-id'), serializer)
+        row_serializer = RowSerializer(serializer)
+        rows_queryset = model.objects.order_by('-id').values(*row_serializer.lookups)
+
+        def slow():
+            return JSONRenderer().render(serializer_class(list(queryset), many=True, **kwargs).data)
+
+        def fast():
+            return FastJSONRenderer().render(row_serializer(rows_queryset.all()))
+
+        if slow() != fast():
+            raise CommandError(f'{label}: fast path output differs from the serializer output')
+        rows = queryset.count()
+        return label, rows, best_of(slow, options['repeat']), best_of(fast, options['repeat'])
+
+    def seed(self, rng, count):
+        # Rows are re-read after bulk_create because MySQL does not return primary keys
+        self.stdout.write('Seeding benchmark data...')
+        User.objects.bulk_create([
+            User(username=f'bench{i}', first_name=f'First{i}', last_name=f'Last{i}', password='!')
+            for i in range(count * 2)
+        ])
+        users = list(User.objects.order_by('id'))
+        Profile.objects.bulk_create([
+            Profile(user=user, user_type='recruiter' if i < count else 'job_seeker', location='Berlin')
+            for i, user in enumerate(users)
+        ])
+        profiles = list(Profile.objects.order_by('id'))
+        RecruiterProfile.objects.bulk_create([
+            RecruiterProfile(profile=profile, company_name=f'Company {i}', position='Recruiter',
+                             company_description='About us. ' * 20)
+            for i, profile in enumerate(profiles[:count])
+        ])
+        JobSeekerProfile.objects.bulk_create([
+            JobSeekerProfile(profile=profile, experience_years=rng.randint(0, 15), skills='python, django')
+            for profile in profiles[count:]
+        ])
+        recruiters = list(RecruiterProfile.objects.order_by('id'))
+        seekers = list(JobSeekerProfile.objects.order_by('id'))
+        Job.objects.bulk_create([
+            Job(recruiter=recruiter, title=f'Job {i}', description='Description. ' * 50, requirements='Requirements. ' * 20,
+                location='Remote', salary_min=rng.choice([None, 50000]), salary_max=rng.choice([None, 90000]))
+            for i, recruiter in enumerate(recruiters)
+        ])
+        jobs = list(Job.objects.order_by('id'))
+        Match.objects.bulk_create([Match(job=job, job_seeker=seeker) for job, seeker in zip(jobs, seekers)])
+
+
+def best_of(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
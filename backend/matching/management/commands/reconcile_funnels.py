@@ -0,0 +1,18 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from matching.funnel import reconcile_funnels
+
+
+class Command(BaseCommand):
+    help = 'Recompute the per-job funnel counters from swipes, matches and applications'
+
+    def add_arguments(self, parser):
+        parser.add_argument('job_ids', nargs='*', type=int, help='Only these jobs (default: all)')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Jobs per transaction')
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        count = reconcile_funnels(options['job_ids'] or None, batch_size=options['batch_size'])
+        self.stdout.write(f'Reconciled {count} job funnels in {time.perf_counter() - start:.2f} s')
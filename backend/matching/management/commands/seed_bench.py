@@ -0,0 +1,48 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from matching.recommend import build_recommendations
+from matching.seeding import BENCH_PASSWORD, BenchSeeder
+
+
+class Command(BaseCommand):
+    help = ('Bulk-generate recruiters, job seekers, jobs, swipes, matches and messages for load tests; '
+            f'accounts are named <prefix>-r<n> / <prefix>-s<n> with password {BENCH_PASSWORD!r}')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--recruiters', type=int, default=200)
+        parser.add_argument('--seekers', type=int, default=5000)
+        parser.add_argument('--jobs', type=int, default=2000)
+        parser.add_argument('--swipes', type=int, default=200000, help='Seeker swipes on jobs, about')
+        parser.add_argument('--recruiter-swipes', type=int, default=20000, help='Recruiter swipes on candidates, about')
+        parser.add_argument('--messages-per-match', type=float, default=4, help='Mean messages per match')
+        parser.add_argument('--days', type=int, default=120, help='Spread swipe times over this many days')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Rows per bulk_create')
+        parser.add_argument('--prefix', default='bench', help='Username prefix of the generated accounts')
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--clear', action='store_true', help='Delete accounts with the prefix (and their data) first')
+        parser.add_argument('--recommendations', action='store_true', help='Build the recommendation lists afterwards')
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        seeder = BenchSeeder(
+            prefix=options['prefix'], seed=options['seed'], batch_size=options['batch_size'], days=options['days'],
+            log=lambda line: self.stdout.write(f'[{time.perf_counter() - start:7.1f} s] {line}'),
+        )
+        if options['clear']:
+            self.stdout.write(f'Deleted {seeder.clear()} rows')
+        if options['recruiters'] < 1 or options['seekers'] < 1 or options['jobs'] < 1:
+            raise CommandError('Need at least one recruiter, job seeker and job')
+        try:
+            counts = seeder.seed(
+                options['recruiters'], options['seekers'], options['jobs'], options['swipes'],
+                options['recruiter_swipes'], options['messages_per_match'],
+            )
+        except ValueError as error:
+            raise CommandError(f'{error} (--clear)')
+        if options['recommendations']:
+            build_recommendations(full=True)
+        for model, count in counts.items():
+            self.stdout.write(f'{model:<20} {count:>12}')
+        self.stdout.write(f'Seeded in {time.perf_counter() - start:.2f} s')
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-17 07:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0002_application_cover_letter_job_experience_level_and_more'),
+        ('matching', '0002_remove_swipeaction_entity_id_and_more'),
+        ('users', '0002_jobseekerprofile_desired_position_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='swipeaction',
+            index=models.Index(fields=['profile', 'job'], name='swipe_profile_job_idx'),
+        ),
+    ]
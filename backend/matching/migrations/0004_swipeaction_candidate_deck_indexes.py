@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-17 07:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0002_application_cover_letter_job_experience_level_and_more'),
+        ('matching', '0003_swipeaction_profile_job_idx'),
+        ('users', '0002_jobseekerprofile_desired_position_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='swipeaction',
+            index=models.Index(fields=['profile', 'candidate'], name='swipe_profile_candidate_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='swipeaction',
+            index=models.Index(fields=['job', 'direction'], name='swipe_job_direction_idx'),
+        ),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 5.2.18 on 2026-10-17 07:10
+
+from django.db import migrations, models
+from django.db.models import Max, Count
+
+
+def remove_duplicate_swipes(apps, schema_editor):
+    # Keep the latest swipe per (profile, target) before the unique constraints go in
+    SwipeAction = apps.get_model('matching', 'SwipeAction')
+    for target in ('job', 'candidate'):
+        duplicates = (
+            SwipeAction.objects.filter(profile__isnull=False, **{f'{target}__isnull': False})
+            .values('profile', target)
+            .annotate(latest=Max('id'), swipes=Count('id'))
+            .filter(swipes__gt=1)
+        )
+        for row in duplicates.iterator():
+            SwipeAction.objects.filter(
+                profile=row['profile'], **{target: row[target]}
+            ).exclude(id=row['latest']).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0004_job_recruiter_active_idx'),
+        ('matching', '0004_swipeaction_candidate_deck_indexes'),
+        ('users', '0003_skill_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_swipes, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='swipeaction',
+            constraint=models.UniqueConstraint(fields=('profile', 'job'), name='unique_swipe_profile_job'),
+        ),
+        migrations.AddConstraint(
+            model_name='swipeaction',
+            constraint=models.UniqueConstraint(fields=('profile', 'candidate'), name='unique_swipe_profile_candidate'),
+        ),
+        migrations.RemoveIndex(
+            model_name='swipeaction',
+            name='swipe_profile_job_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='swipeaction',
+            name='swipe_profile_candidate_idx',
+        ),
+        migrations.AddIndex(
+            model_name='match',
+            index=models.Index(fields=['job_seeker', 'is_active'], name='match_seeker_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='match',
+            index=models.Index(fields=['job', 'is_active'], name='match_job_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(fields=['match', 'created_at'], name='message_match_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(condition=models.Q(('is_read', False)), fields=['match', 'sender'], name='message_unread_idx'),
+        ),
+    ]
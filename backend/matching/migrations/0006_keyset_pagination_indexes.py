@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-17 07:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0005_keyset_pagination_indexes'),
+        ('matching', '0005_hot_query_indexes'),
+        ('users', '0003_skill_index'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='match',
+            name='match_seeker_active_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='match',
+            name='match_job_active_idx',
+        ),
+        migrations.AddIndex(
+            model_name='match',
+            index=models.Index(fields=['job_seeker', 'is_active', 'created_at'], name='match_seeker_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='match',
+            index=models.Index(fields=['job', 'is_active', 'created_at'], name='match_job_active_idx'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-17 07:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('matching', '0006_keyset_pagination_indexes'),
+        ('users', '0003_skill_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='match',
+            name='chat_updated_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='match',
+            name='chat_version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='message',
+            name='version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(fields=['match', 'version', 'id'], name='message_match_version_idx'),
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 5.2.18 on 2026-10-17 07:58
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0007_geocoded_location'),
+        ('matching', '0007_message_sync_version'),
+        ('users', '0004_geocoded_location'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CandidateRecommendations',
+            fields=[
+                ('item_ids', models.BinaryField()),
+                ('scores', models.BinaryField()),
+                ('computed_at', models.DateTimeField()),
+                ('job', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='candidate_recommendations', serialize=False, to='jobs.job')),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='JobRecommendations',
+            fields=[
+                ('item_ids', models.BinaryField()),
+                ('scores', models.BinaryField()),
+                ('computed_at', models.DateTimeField()),
+                ('job_seeker', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='job_recommendations', serialize=False, to='users.jobseekerprofile')),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='RecommendationRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('last_swipe_id', models.BigIntegerField()),
+                ('full', models.BooleanField()),
+                ('seekers', models.PositiveIntegerField()),
+                ('jobs', models.PositiveIntegerField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+    ]
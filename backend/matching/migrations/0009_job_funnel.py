@@ -0,0 +1,50 @@
+# Generated by Django 5.2.18 on 2026-10-17 08:30
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def backfill_funnels(apps, schema_editor):
+    # Counters for existing jobs from their rows, as reconcile_funnels computes them
+    Job = apps.get_model('jobs', 'Job')
+    JobFunnel = apps.get_model('matching', 'JobFunnel')
+    SwipeAction = apps.get_model('matching', 'SwipeAction')
+    Match = apps.get_model('matching', 'Match')
+    Application = apps.get_model('jobs', 'Application')
+    counts = {job_id: {} for job_id in Job.objects.values_list('id', flat=True).iterator()}
+    for field, rows in (
+        ('left_swipes', SwipeAction.objects.filter(job__isnull=False, direction='left')),
+        ('right_swipes', SwipeAction.objects.filter(job__isnull=False, direction='right')),
+        ('matches', Match.objects.all()),
+        ('applications', Application.objects.all()),
+    ):
+        for job_id, count in rows.order_by().values('job').annotate(count=Count('pk')).values_list('job', 'count'):
+            counts[job_id][field] = count
+    JobFunnel.objects.bulk_create(
+        [JobFunnel(job_id=job_id, **fields) for job_id, fields in counts.items()], batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0007_geocoded_location'),
+        ('matching', '0008_recommendations'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobFunnel',
+            fields=[
+                ('job', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='funnel', serialize=False, to='jobs.job')),
+                ('views', models.BigIntegerField(default=0)),
+                ('left_swipes', models.BigIntegerField(default=0)),
+                ('right_swipes', models.BigIntegerField(default=0)),
+                ('matches', models.BigIntegerField(default=0)),
+                ('applications', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.RunPython(backfill_funnels, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-17 08:39
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0007_geocoded_location'),
+        ('matching', '0009_job_funnel'),
+        ('users', '0004_geocoded_location'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SwipeArchive',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('job', 'Job'), ('candidate', 'Candidate')], max_length=10)),
+                ('item_ids', models.BinaryField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('profile', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='swipe_archives', to='users.profile')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('profile', 'kind'), name='unique_swipe_archive_profile_kind')],
+            },
+        ),
+        migrations.CreateModel(
+            name='SwipeRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField()),
+                ('left_swipes', models.PositiveIntegerField(default=0)),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='swipe_rollups', to='jobs.job')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('job', 'month'), name='unique_swipe_rollup_job_month')],
+            },
+        ),
+    ]
@@ -1,3 +1,4 @@
+import numpy as np
 from django.db import models
 from users.models import JobSeekerProfile, RecruiterProfile, Profile
 from jobs.models import Job
@@ -15,6 +16,23 @@ class SwipeAction(models.Model):
     direction = models.CharField(max_length=5, choices=DIRECTION_CHOICES)
     created_at = models.DateTimeField(auto_now_add=True)
     
+    class Meta:
+        constraints = [
+            # One swipe per profile and target. The unique indexes also serve the deck
+            # anti-joins and the (profile, job|candidate, direction) reciprocal lookups.
+            # Rows with a NULL target never collide, so each covers only its own kind.
+            # Recruiter swipes carry no job: a recruiter decides once per candidate,
+            # for all of their jobs, as the baseline stored them. A right swipe makes
+            # the candidate a match on any of the recruiter's jobs the seeker likes;
+            # a left swipe takes them out of every one of the recruiter's decks.
+            models.UniqueConstraint(fields=['profile', 'job'], name='unique_swipe_profile_job'),
+            models.UniqueConstraint(fields=['profile', 'candidate'], name='unique_swipe_profile_candidate'),
+        ]
+        indexes = [
+            # "Who liked this job?" for the recruiter deck
+            models.Index(fields=['job', 'direction'], name='swipe_job_direction_idx'),
+        ]
+    
     def __str__(self):
         if self.job:
             return f"{self.profile.user.username if self.profile else 'Unknown'} swiped {self.direction} on job {self.job.title}"
@@ -28,9 +46,18 @@ class Match(models.Model):
     job_seeker_viewed = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
     is_active = models.BooleanField(default=True)
+    # Bumped on every new message or read-state change in the chat (see matching.sync)
+    chat_version = models.PositiveIntegerField(default=0)
+    chat_updated_at = models.DateTimeField(null=True, blank=True)
     
     class Meta:
         unique_together = ('job', 'job_seeker')
+        indexes = [
+            # Filter plus the (created_at, id) keyset order of the match list
+            models.Index(fields=['job_seeker', 'is_active', 'created_at'], name='match_seeker_active_idx'),
+            # Recruiter listings join through Job (recruiter, is_active)
+            models.Index(fields=['job', 'is_active', 'created_at'], name='match_job_active_idx'),
+        ]
         
     def __str__(self):
         return f"Match: {self.job_seeker.profile.user.username} - {self.job.title}"
@@ -41,6 +68,117 @@ class Message(models.Model):
     content = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
     is_read = models.BooleanField(default=False)
+    # Match.chat_version at which this message was created or last changed
+    version = models.PositiveIntegerField(default=0)
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['match', 'created_at'], name='message_match_created_idx'),
+            # Incremental sync walks (version, id) within a match
+            models.Index(fields=['match', 'version', 'id'], name='message_match_version_idx'),
+            # Partial index for unread counts; not created on MySQL, which lacks them
+            models.Index(fields=['match', 'sender'], condition=models.Q(is_read=False), name='message_unread_idx'),
+        ]
     
     def __str__(self):
-        return f"Message from {self.sender.user.username} in {self.match}"
\ No newline at end of file
+        return f"Message from {self.sender.user.username} in {self.match}"
+
+class RankedList(models.Model):
+    # Top-K ids and scores packed as little-endian int64 / float32 arrays, best first
+    item_ids = models.BinaryField()
+    scores = models.BinaryField()
+    computed_at = models.DateTimeField()
+
+    class Meta:
+        abstract = True
+
+    @staticmethod
+    def pack(ids, scores):
+        return {
+            'item_ids': np.asarray(ids, dtype='<i8').tobytes(),
+            'scores': np.asarray(scores, dtype='<f4').tobytes(),
+        }
+
+    def ranked(self):
+        # (ids, scores) arrays
+        return np.frombuffer(bytes(self.item_ids), dtype='<i8'), np.frombuffer(bytes(self.scores), dtype='<f4')
+
+
+class JobRecommendations(RankedList):
+    # Jobs for a seeker from matching.recommend, consumed by the job deck
+    job_seeker = models.OneToOneField(
+        JobSeekerProfile, on_delete=models.CASCADE, primary_key=True, related_name='job_recommendations'
+    )
+
+
+class CandidateRecommendations(RankedList):
+    # Seekers for a job from matching.recommend, consumed by the candidate deck
+    job = models.OneToOneField(Job, on_delete=models.CASCADE, primary_key=True, related_name='candidate_recommendations')
+
+
+class RecommendationRun(models.Model):
+    # One row per build_recommendations run; the next incremental run starts after last_swipe_id
+    last_swipe_id = models.BigIntegerField()
+    full = models.BooleanField()
+    seekers = models.PositiveIntegerField()
+    jobs = models.PositiveIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+
+class JobFunnel(models.Model):
+    """
+    Running totals for one job's funnel, kept up to date as swipes, matches and
+    applications are written (matching.funnel) so the recruiter dashboard never
+    counts rows. reconcile_funnels rebuilds them from the source tables.
+    """
+    job = models.OneToOneField(Job, on_delete=models.CASCADE, primary_key=True, related_name='funnel')
+    # Times the job was dealt as a deck card
+    views = models.BigIntegerField(default=0)
+    left_swipes = models.BigIntegerField(default=0)
+    right_swipes = models.BigIntegerField(default=0)
+    matches = models.BigIntegerField(default=0)
+    applications = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+
+class SwipeArchive(models.Model):
+    """
+    A profile's archived swipes of one kind (matching/archive.py): the swiped job
+    or candidate ids, sorted and packed as little-endian int64. They keep the
+    deck from dealing those cards again once the rows leave SwipeAction.
+    """
+    JOB = 'job'
+    CANDIDATE = 'candidate'
+    KIND_CHOICES = (
+        (JOB, 'Job'),
+        (CANDIDATE, 'Candidate'),
+    )
+
+    profile = models.ForeignKey(Profile, on_delete=models.CASCADE, related_name='swipe_archives')
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    item_ids = models.BinaryField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['profile', 'kind'], name='unique_swipe_archive_profile_kind'),
+        ]
+
+    def ids(self):
+        return np.frombuffer(bytes(self.item_ids), dtype='<i8')
+
+    @staticmethod
+    def pack(ids):
+        return np.unique(np.asarray(ids, dtype='<i8')).astype('<i8').tobytes()
+
+
+class SwipeRollup(models.Model):
+    # Seeker left swipes on a job archived out of SwipeAction, per month of the swipe
+    job = models.ForeignKey(Job, on_delete=models.CASCADE, related_name='swipe_rollups')
+    month = models.DateField()
+    left_swipes = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['job', 'month'], name='unique_swipe_rollup_job_month'),
+        ]
@@ -0,0 +1,58 @@
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.db.models import Q
+
+from .models import Match
+from .serializers import MessageSerializer
+from .sync import mark_messages_read, mark_matches_read
+
+
+def match_group(match_id):
+    return f'match_{match_id}'
+
+
+def match_for_profile(match_id, profile):
+    # The match if `profile` is its job seeker or the recruiter who owns its job
+    return Match.objects.filter(
+        Q(job_seeker__profile=profile) | Q(job__recruiter__profile=profile),
+        id=match_id,
+        is_active=True,
+    ).first()
+
+
+def send_to_match(match_id, event):
+    channel_layer = get_channel_layer()
+    if channel_layer is not None:
+        async_to_sync(channel_layer.group_send)(match_group(match_id), event)
+
+
+def broadcast_message(message):
+    # Serialized once here, then fanned out to every socket in the match group
+    send_to_match(message.match_id, {
+        'type': 'chat.message',
+        'message': MessageSerializer(message).data,
+    })
+
+
+def mark_read(match_id, reader):
+    # Mark the other side's unread messages as read and announce it
+    message_ids = mark_messages_read(match_id, reader)
+    if message_ids:
+        send_to_match(match_id, {
+            'type': 'chat.read',
+            'reader_id': reader.id,
+            'message_ids': message_ids,
+        })
+    return message_ids
+
+
+def mark_read_many(match_ids, reader, viewed_field):
+    # mark_read for several matches in one bulk update, announced per match
+    read = mark_matches_read(match_ids, reader, viewed_field)
+    for match_id, message_ids in read.items():
+        send_to_match(match_id, {
+            'type': 'chat.read',
+            'reader_id': reader.id,
+            'message_ids': message_ids,
+        })
+    return read
@@ -0,0 +1,256 @@
+from itertools import chain
+
+import numpy as np
+from django.db import transaction
+from django.db.models import Case, FloatField, Max, Value, When
+from django.utils import timezone
+
+from jobs.models import Job
+from .models import SwipeAction, JobRecommendations, CandidateRecommendations, RecommendationRun
+
+# Interaction weights: a seeker's own swipe on a job, and a recruiter's swipe on a
+# candidate, which counts towards each of the recruiter's jobs
+SEEKER_WEIGHTS = {'right': 1.0, 'left': -0.5}
+RECRUITER_WEIGHTS = {'right': 0.5, 'left': -0.25}
+
+DEFAULT_FACTORS = 32
+# Extra random directions and power iterations for the randomized SVD
+OVERSAMPLE = 10
+POWER_ITERATIONS = 2
+# Recommendations kept per seeker and per job
+DEFAULT_TOP_K = 100
+# Score-matrix cells per batch (float32), bounding memory whatever the corpus size
+BATCH_CELLS = 4_000_000
+
+
+def swipe_weight(weights):
+    return Case(
+        *[When(direction=direction, then=Value(weight)) for direction, weight in weights.items()],
+        output_field=FloatField(),
+    )
+
+
+def triples(rows):
+    return np.fromiter(chain.from_iterable(rows), dtype=np.float64).reshape(-1, 3)
+
+
+class InteractionMatrix:
+    """
+    Sparse seeker x job matrix in coordinate form, with the row and column ids it
+    was built from. Duplicate (seeker, job) entries add up.
+    """
+
+    def __init__(self, seeker_ids, job_ids, values):
+        self.seeker_ids, self.rows = np.unique(np.asarray(seeker_ids, dtype=np.int64), return_inverse=True)
+        self.job_ids, self.cols = np.unique(np.asarray(job_ids, dtype=np.int64), return_inverse=True)
+        self.values = np.asarray(values, dtype=np.float64)
+        self.shape = (len(self.seeker_ids), len(self.job_ids))
+        self._by_row = self.grouping(self.rows)
+        self._by_col = self.grouping(self.cols)
+
+    @staticmethod
+    def grouping(keys):
+        # (order, group starts, group keys) for summing entries per key with reduceat
+        order = np.argsort(keys, kind='stable')
+        keys = keys[order]
+        starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]]) if len(keys) else np.array([], dtype=np.int64)
+        return order, starts, keys[starts]
+
+    def _product(self, grouping, index, other, size):
+        order, starts, keys = grouping
+        out = np.zeros((size, other.shape[1]))
+        if len(order):
+            contributions = self.values[order, None] * other[index[order]]
+            out[keys] = np.add.reduceat(contributions, starts, axis=0)
+        return out
+
+    def dot(self, other):
+        # R @ other
+        return self._product(self._by_row, self.cols, other, self.shape[0])
+
+    def rdot(self, other):
+        # R.T @ other
+        return self._product(self._by_col, self.rows, other, self.shape[1])
+
+    @classmethod
+    def from_swipes(cls, swipes=None):
+        """
+        Seeker swipes on jobs, plus recruiter swipes on candidates spread over the
+        recruiter's active jobs. Returns the matrix and the (seeker id, job id)
+        pairs behind each: jobs the seeker swiped, candidates the job's recruiter swiped.
+        """
+        swipes = SwipeAction.objects.all() if swipes is None else swipes
+        seeker_swipes = triples(
+            swipes.filter(job__isnull=False, profile__jobseekerprofile__isnull=False)
+            .values_list('profile__jobseekerprofile__id', 'job_id', swipe_weight(SEEKER_WEIGHTS))
+            .iterator(chunk_size=10000)
+        )
+        recruiter_swipes = triples(
+            swipes.filter(candidate__isnull=False, profile__recruiterprofile__jobs__is_active=True)
+            .values_list('candidate_id', 'profile__recruiterprofile__jobs__id', swipe_weight(RECRUITER_WEIGHTS))
+            .iterator(chunk_size=10000)
+        )
+        entries = np.concatenate([seeker_swipes, recruiter_swipes])
+        matrix = cls(entries[:, 0], entries[:, 1], entries[:, 2])
+        return matrix, seeker_swipes[:, :2].astype(np.int64), recruiter_swipes[:, :2].astype(np.int64)
+
+
+def factorize(matrix, factors=DEFAULT_FACTORS, seed=0):
+    """
+    Rank-`factors` approximation R ~= U @ V.T by randomized SVD (Halko et al.),
+    using only sparse products with R. U (seekers) carries the singular values,
+    so U[i] @ V[j] is the predicted affinity of seeker i for job j.
+    """
+    rank = min(factors, *matrix.shape)
+    if rank == 0:
+        return np.zeros((matrix.shape[0], 0), np.float32), np.zeros((matrix.shape[1], 0), np.float32)
+    width = min(rank + OVERSAMPLE, *matrix.shape)
+    rng = np.random.default_rng(seed)
+    basis, _ = np.linalg.qr(matrix.dot(rng.standard_normal((matrix.shape[1], width))))
+    for _ in range(POWER_ITERATIONS):
+        basis, _ = np.linalg.qr(matrix.rdot(basis))
+        basis, _ = np.linalg.qr(matrix.dot(basis))
+    small_u, singular, small_vt = np.linalg.svd(matrix.rdot(basis).T, full_matrices=False)
+    seeker_factors = (basis @ small_u[:, :rank]) * singular[:rank]
+    return seeker_factors.astype(np.float32), small_vt[:rank].T.astype(np.float32)
+
+
+def top_k(scores, k):
+    # Per row: column indices of the k best positive scores, best first, and the scores
+    k = min(k, scores.shape[1])
+    if k == 0:
+        return [np.array([], dtype=np.int64)] * len(scores), [np.array([], dtype=np.float32)] * len(scores)
+    best = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    best_scores = np.take_along_axis(scores, best, axis=1)
+    order = np.argsort(-best_scores, axis=1, kind='stable')
+    best = np.take_along_axis(best, order, axis=1)
+    best_scores = np.take_along_axis(best_scores, order, axis=1)
+    keep = best_scores > 0
+    return [row[mask] for row, mask in zip(best, keep)], [row[mask] for row, mask in zip(best_scores, keep)]
+
+
+def recommend(owner_factors, owners, item_factors, items, excluded, k):
+    """
+    Yield (owner position, item positions, scores) for each of `owners` (rows of
+    `owner_factors`) over the candidate `items` (rows of `item_factors`), in
+    batches of at most BATCH_CELLS scores. `excluded` holds (owner, item) position
+    pairs, e.g. jobs already swiped.
+    """
+    # Item position -> column among the candidates, -1 when not a candidate
+    columns = np.full(len(item_factors), -1, dtype=np.int64)
+    columns[items] = np.arange(len(items))
+    excluded = excluded[columns[excluded[:, 1]] >= 0] if len(excluded) else excluded
+    candidates = item_factors[items].T
+    batch = max(1, BATCH_CELLS // max(len(items), 1))
+
+    for start in range(0, len(owners), batch):
+        chunk = owners[start:start + batch]
+        scores = owner_factors[chunk] @ candidates
+        if len(excluded):
+            # Rows of `excluded` belonging to this chunk
+            position = np.full(len(owner_factors), -1, dtype=np.int64)
+            position[chunk] = np.arange(len(chunk))
+            hit = excluded[position[excluded[:, 0]] >= 0]
+            scores[position[hit[:, 0]], columns[hit[:, 1]]] = -np.inf
+        best, best_scores = top_k(scores, k)
+        for owner, picked, picked_scores in zip(chunk, best, best_scores):
+            yield owner, items[picked], picked_scores
+
+
+def positions(ids, values):
+    # Positions of `values` in the sorted array `ids`; -1 where missing
+    values = np.asarray(values, dtype=np.int64)
+    if not len(ids):
+        return np.full(len(values), -1, dtype=np.int64)
+    found = np.minimum(np.searchsorted(ids, values), len(ids) - 1)
+    return np.where(ids[found] == values, found, -1)
+
+
+def pair_positions(matrix, pairs):
+    # (seeker id, job id) pairs -> (row, column) pairs inside the matrix
+    if not len(pairs):
+        return np.zeros((0, 2), dtype=np.int64)
+    found = np.column_stack([positions(matrix.seeker_ids, pairs[:, 0]), positions(matrix.job_ids, pairs[:, 1])])
+    return found[(found >= 0).all(axis=1)]
+
+
+def save_lists(model, owner_field, lists, computed_at):
+    # Replace the stored list of each owner in `lists` [(owner id, ids, scores)]; owners
+    # left without recommendations lose their row
+    with transaction.atomic():
+        model.objects.filter(**{f'{owner_field}__in': [owner for owner, _, _ in lists]}).delete()
+        model.objects.bulk_create([
+            model(**{f'{owner_field}_id': owner}, computed_at=computed_at, **model.pack(ids, scores))
+            for owner, ids, scores in lists if len(ids)
+        ])
+
+
+def store(model, owner_field, owner_ids, item_ids, recommendations, computed_at, batch_size=1000):
+    pending, stored = [], 0
+    for owner, items, scores in recommendations:
+        pending.append((int(owner_ids[owner]), item_ids[items], scores))
+        if len(pending) >= batch_size:
+            save_lists(model, owner_field, pending, computed_at)
+            stored += len(pending)
+            pending = []
+    if pending:
+        save_lists(model, owner_field, pending, computed_at)
+        stored += len(pending)
+    return stored
+
+
+def build_recommendations(full=False, factors=DEFAULT_FACTORS, k=DEFAULT_TOP_K, seed=0):
+    """
+    Factorize the whole swipe matrix and store the top-`k` jobs per seeker and
+    candidates per active job.
+
+    Incremental runs (the default once a run exists) refresh only the seekers and
+    jobs with swipes since the last run; the others keep their lists until the
+    next full run. Returns the RecommendationRun.
+    """
+    started = timezone.now()
+    last_run = None if full else RecommendationRun.objects.order_by('-id').first()
+    last_swipe_id = SwipeAction.objects.aggregate(last=Max('id'))['last'] or 0
+
+    matrix, seeker_seen, recruiter_seen = InteractionMatrix.from_swipes()
+    seeker_factors, job_factors = factorize(matrix, factors, seed)
+    active = np.flatnonzero(np.isin(
+        matrix.job_ids, np.fromiter(Job.objects.filter(is_active=True).values_list('id', flat=True), dtype=np.int64)
+    ))
+    seekers, jobs = np.arange(matrix.shape[0]), active
+    if last_run is not None:
+        changed = SwipeAction.objects.filter(id__gt=last_run.last_swipe_id)
+        changed_matrix, _, _ = InteractionMatrix.from_swipes(changed)
+        seekers = positions(matrix.seeker_ids, changed_matrix.seeker_ids)
+        seekers = seekers[seekers >= 0]
+        jobs = np.intersect1d(positions(matrix.job_ids, changed_matrix.job_ids), active)
+
+    # Seekers already in the job's deck history: swiped by its recruiter, or swiped on it
+    # themselves (those who liked it are dealt first anyway)
+    job_seen = pair_positions(matrix, np.concatenate([recruiter_seen, seeker_seen]))[:, ::-1]
+    seeker_lists = store(
+        JobRecommendations, 'job_seeker', matrix.seeker_ids, matrix.job_ids,
+        recommend(seeker_factors, seekers, job_factors, active, pair_positions(matrix, seeker_seen), k), started,
+    )
+    job_lists = store(
+        CandidateRecommendations, 'job', matrix.job_ids, matrix.seeker_ids,
+        recommend(job_factors, jobs, seeker_factors, np.arange(matrix.shape[0]), job_seen, k),
+        started,
+    )
+    if last_run is None:
+        # Owners that no longer get any recommendation
+        JobRecommendations.objects.filter(computed_at__lt=started).delete()
+        CandidateRecommendations.objects.filter(computed_at__lt=started).delete()
+
+    return RecommendationRun.objects.create(
+        last_swipe_id=last_swipe_id, full=last_run is None, seekers=seeker_lists, jobs=job_lists,
+    )
+
+
+def recommended_candidates(job):
+    # Stored seeker ids for the job, best first; reads a select_related row when loaded
+    try:
+        return job.candidate_recommendations.ranked()[0]
+    except CandidateRecommendations.DoesNotExist:
+        return np.array([], dtype=np.int64)
+
@@ -0,0 +1,210 @@
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.module_loading import import_string
+
+from .models import SwipeAction
+
+# Keys are (kind, profile_id, target_id):
+#   ('job', seeker_profile_id, job_id)              seeker swiped right on a job
+#   ('candidate', recruiter_profile_id, seeker_id)  recruiter swiped right on a candidate
+JOB = 'job'
+CANDIDATE = 'candidate'
+
+DEFAULT_SETTINGS = {
+    'BACKEND': 'matching.right_swipes.LocalRightSwipeIndex',
+    'OPTIONS': {},
+}
+
+
+def key_for(swipe):
+    if swipe.job_id:
+        return (JOB, swipe.profile_id, swipe.job_id)
+    return (CANDIDATE, swipe.profile_id, swipe.candidate_id)
+
+
+def load_right_swipes(keys):
+    # SQL fallback: which of `keys` exist as right swipes, one query per kind
+    found = set()
+    for kind, target in ((JOB, 'job_id'), (CANDIDATE, 'candidate_id')):
+        wanted = {key for key in keys if key[0] == kind}
+        if not wanted:
+            continue
+        rows = SwipeAction.objects.filter(
+            profile_id__in={profile_id for _, profile_id, _ in wanted},
+            direction='right',
+            **{f'{target}__in': {target_id for _, _, target_id in wanted}}
+        ).values_list('profile_id', target)
+        found.update(key for key in ((kind, profile_id, target_id) for profile_id, target_id in rows) if key in wanted)
+    return found
+
+
+class RightSwipeIndex:
+    """
+    Answers "has the other side already swiped right?" from memory.
+
+    Only right swipes that exist are stored. Keys not in the index are looked
+    up in SQL in one batch and remembered when found; absence is never cached,
+    since the right swipe may be recorded at any time by another process (or
+    race the lookup in this one) and a stale "no" would lose the match.
+    Subclasses implement get_many/set_many/delete_many over their storage.
+    """
+
+    def __init__(self, warm_limit=50000, **options):
+        self.warm_limit = warm_limit
+        self._warmed = False
+        self._warm_lock = threading.Lock()
+
+    def get_many(self, keys):
+        raise NotImplementedError
+
+    def set_many(self, mapping):
+        raise NotImplementedError
+
+    def delete_many(self, keys):
+        raise NotImplementedError
+
+    def swiped_right(self, keys):
+        # Subset of `keys` that are right swipes
+        self.ensure_warm()
+        keys = set(keys)
+        known = set(self.get_many(keys))
+        missing = keys - known
+        if missing:
+            found = load_right_swipes(missing)
+            if found:
+                self.set_many(dict.fromkeys(found, True))
+            known |= found
+        return known
+
+    def record(self, swipes):
+        right = {key_for(swipe): True for swipe in swipes if swipe.direction == 'right'}
+        if right:
+            self.set_many(right)
+
+    def forget(self, swipes):
+        self.delete_many({key_for(swipe) for swipe in swipes})
+
+    def ensure_warm(self):
+        if self._warmed:
+            return
+        with self._warm_lock:
+            if not self._warmed:
+                self.warm()
+                self._warmed = True
+
+    def warm(self):
+        # Preload the most recent right swipes, newest last so LRU keeps them longest
+        rows = SwipeAction.objects.filter(direction='right').order_by('-id').values_list(
+            'profile_id', 'job_id', 'candidate_id'
+        )[:self.warm_limit]
+        entries = {}
+        for profile_id, job_id, candidate_id in reversed(list(rows)):
+            key = (JOB, profile_id, job_id) if job_id else (CANDIDATE, profile_id, candidate_id)
+            entries[key] = True
+        if entries:
+            self.set_many(entries)
+
+    def clear(self):
+        self._warmed = False
+
+
+class LocalRightSwipeIndex(RightSwipeIndex):
+    # Bounded in-process index with LRU eviction
+
+    def __init__(self, max_entries=100000, **options):
+        super().__init__(**options)
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_many(self, keys):
+        found = {}
+        with self._lock:
+            for key in keys:
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    found[key] = self._entries[key]
+        return found
+
+    def set_many(self, mapping):
+        with self._lock:
+            for key, exists in mapping.items():
+                self._entries[key] = exists
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete_many(self, keys):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self):
+        super().clear()
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class CacheRightSwipeIndex(RightSwipeIndex):
+    # Index stored in a Django cache; shared between processes on a shared backend
+
+    def __init__(self, cache_alias='default', timeout=24 * 60 * 60, key_prefix='right-swipe', **options):
+        super().__init__(**options)
+        self.cache = caches[cache_alias]
+        self.timeout = timeout
+        self.key_prefix = key_prefix
+
+    def cache_key(self, key):
+        return '%s:%s:%s:%s' % ((self.key_prefix,) + tuple(key))
+
+    def get_many(self, keys):
+        cache_keys = {self.cache_key(key): key for key in keys}
+        return {cache_keys[cache_key]: value for cache_key, value in self.cache.get_many(cache_keys).items()}
+
+    def set_many(self, mapping):
+        self.cache.set_many({self.cache_key(key): value for key, value in mapping.items()}, self.timeout)
+
+    def delete_many(self, keys):
+        self.cache.delete_many([self.cache_key(key) for key in keys])
+
+    def warm(self):
+        # The cache may already be warm from another process
+        marker = f'{self.key_prefix}:warmed'
+        if self.cache.get(marker):
+            return
+        super().warm()
+        self.cache.set(marker, True, self.timeout)
+
+    def clear(self):
+        super().clear()
+        self.cache.delete(f'{self.key_prefix}:warmed')
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_right_swipe_index():
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                config = getattr(settings, 'RIGHT_SWIPE_INDEX', DEFAULT_SETTINGS)
+                backend = import_string(config.get('BACKEND', DEFAULT_SETTINGS['BACKEND']))
+                _index = backend(**config.get('OPTIONS', {}))
+    return _index
+
+
+def reset_right_swipe_index():
+    # Drop the process-wide index, e.g. after settings change in tests
+    global _index
+    with _index_lock:
+        if _index is not None:
+            _index.clear()
+        _index = None
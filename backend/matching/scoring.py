@@ -0,0 +1,208 @@
+from itertools import chain
+
+import numpy as np
+
+from config.geo import KM_PER_DEGREE
+from jobs.models import JobSkill
+from users.models import SeekerSkill
+
+# Ordinal positions of Job.EXPERIENCE_LEVEL_CHOICES
+EXPERIENCE_LEVELS = {'entry': 0, 'mid': 1, 'senior': 2, 'executive': 3}
+
+WEIGHTS = {
+    'skills': 0.4,
+    'experience': 0.25,
+    'salary': 0.2,
+    'location': 0.15,
+}
+
+# Score given to a component when one side did not fill it in
+NEUTRAL = 0.5
+
+JOB_FIELDS = ('id', 'experience_level', 'salary_min', 'salary_max', 'is_remote', 'location', 'latitude', 'longitude')
+SEEKER_FIELDS = ('id', 'experience_years', 'desired_salary', 'profile__location')
+
+
+def experience_rank_for_years(years):
+    # Vectorized: years of experience -> ordinal experience level, as deck.experience_level_for_years
+    return np.searchsorted([2, 5, 10], np.asarray(years), side='right')
+
+
+def normalize_location(location):
+    return ' '.join((location or '').split()).lower()
+
+
+def normalize_locations(locations):
+    # Locations repeat heavily, so normalize each distinct value once
+    codes = {}
+    inverse = np.fromiter(
+        (codes.setdefault(location or '', len(codes)) for location in locations), dtype=np.int64, count=len(locations)
+    )
+    return np.array([normalize_location(location) for location in codes], dtype=object)[inverse]
+
+
+class JobFeatures:
+    # Column arrays for a batch of jobs, built from .values() rows
+
+    def __init__(self, rows, skill_links=()):
+        self.ids = np.array([row['id'] for row in rows], dtype=np.int64)
+        self.levels = np.array([EXPERIENCE_LEVELS.get(row['experience_level'], 0) for row in rows], dtype=np.int8)
+        self.salary_max = np.array([row['salary_max'] for row in rows], dtype=np.float64)
+        self.is_remote = np.array([row['is_remote'] for row in rows], dtype=bool)
+        self.locations = normalize_locations([row['location'] for row in rows])
+        # NaN where the location was not geocoded
+        self.latitudes = np.array([row.get('latitude') for row in rows], dtype=np.float64)
+        self.longitudes = np.array([row.get('longitude') for row in rows], dtype=np.float64)
+        self.skills = SkillMatrix(self.ids, skill_links)
+
+    def __len__(self):
+        return len(self.ids)
+
+    @classmethod
+    def from_queryset(cls, queryset, exclude=(), extra=()):
+        # Rows with ids in `exclude` are dropped here rather than in the query. `extra`
+        # columns are read too; `fetched` and `last_row` describe the rows before dropping
+        rows = list(queryset.values(*JOB_FIELDS, *extra))
+        fetched, last_row = len(rows), rows[-1] if rows else None
+        if rows and len(exclude):
+            ids = np.fromiter((row['id'] for row in rows), dtype=np.int64, count=len(rows))
+            rows = [row for row, kept in zip(rows, np.isin(ids, exclude, invert=True)) if kept]
+        links = JobSkill.objects.filter(job_id__in=[row['id'] for row in rows]).values_list('job_id', 'skill_id')
+        features = cls(rows, links)
+        features.fetched, features.last_row = fetched, last_row
+        return features
+
+
+class SeekerFeatures:
+    # Column arrays for a batch of job seekers, built from .values() rows
+
+    def __init__(self, rows, skill_links=()):
+        self.ids = np.array([row['id'] for row in rows], dtype=np.int64)
+        self.levels = experience_rank_for_years([row['experience_years'] or 0 for row in rows]).astype(np.int8)
+        self.desired_salary = np.array(
+            [row['desired_salary'] if row['desired_salary'] else np.nan for row in rows], dtype=np.float64
+        )
+        self.locations = normalize_locations([row['profile__location'] for row in rows])
+        self.skills = SkillMatrix(self.ids, skill_links)
+
+    def __len__(self):
+        return len(self.ids)
+
+    @classmethod
+    def from_instance(cls, job_seeker):
+        row = {
+            'id': job_seeker.id,
+            'experience_years': job_seeker.experience_years,
+            'desired_salary': job_seeker.desired_salary,
+            'profile__location': job_seeker.profile.location,
+        }
+        return cls([row], job_seeker.skill_links.values_list('job_seeker_id', 'skill_id'))
+
+    @classmethod
+    def from_queryset(cls, queryset):
+        rows = list(queryset.values(*SEEKER_FIELDS))
+        links = SeekerSkill.objects.filter(
+            job_seeker_id__in=[row['id'] for row in rows]
+        ).values_list('job_seeker_id', 'skill_id')
+        return cls(rows, links)
+
+
+class SkillMatrix:
+    # Sparse (row, skill_id) pairs plus per-row skill counts
+
+    def __init__(self, owner_ids, links):
+        links = np.fromiter(chain.from_iterable(links), dtype=np.int64).reshape(-1, 2)
+        sorter = np.argsort(owner_ids)
+        self.rows = sorter[np.searchsorted(owner_ids, links[:, 0], sorter=sorter)]
+        self.skill_ids = links[:, 1]
+        self.counts = np.bincount(self.rows, minlength=len(owner_ids))
+
+    def overlap(self, skill_ids):
+        # Per row: how many of `skill_ids` this row has
+        hits = np.isin(self.skill_ids, np.asarray(list(skill_ids), dtype=np.int64))
+        return np.bincount(self.rows[hits], minlength=len(self.counts))
+
+    def skill_set(self, row):
+        return set(self.skill_ids[self.rows == row].tolist())
+
+
+def skill_fit(overlap, required_counts, offered_counts):
+    # Share of the required skills that are covered; neutral when either side lists none
+    required_counts = np.asarray(required_counts, dtype=np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        fit = np.asarray(overlap, dtype=np.float64) / required_counts
+    return np.where((required_counts > 0) & (np.asarray(offered_counts) > 0), fit, NEUTRAL)
+
+
+def experience_fit(job_levels, seeker_levels):
+    distance = np.abs(np.asarray(job_levels, dtype=np.float64) - np.asarray(seeker_levels, dtype=np.float64))
+    return 1.0 - distance / (len(EXPERIENCE_LEVELS) - 1)
+
+
+def salary_fit(salary_max, desired_salary):
+    # 1.0 when the top of the range meets the ask, tapering linearly below it
+    salary_max = np.asarray(salary_max, dtype=np.float64)
+    desired_salary = np.asarray(desired_salary, dtype=np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        fit = np.clip(salary_max / desired_salary, 0.0, 1.0)
+    return np.where(np.isnan(fit), NEUTRAL, fit)
+
+
+def location_fit(job_locations, is_remote, seeker_locations):
+    same_place = (np.asarray(job_locations, dtype=object) == np.asarray(seeker_locations, dtype=object))
+    same_place &= np.asarray(seeker_locations, dtype=object) != ''
+    return (np.asarray(is_remote, dtype=bool) | same_place).astype(np.float64)
+
+
+def proximity_fit(latitudes, longitudes, is_remote, near):
+    # 1.0 at the centre of `near`, falling linearly to 0 at its radius; remote jobs fit anywhere
+    scale = np.cos(np.radians(near.latitude))
+    d_lat = np.asarray(latitudes, dtype=np.float64) - near.latitude
+    d_lon = (np.asarray(longitudes, dtype=np.float64) - near.longitude) * scale
+    distance = KM_PER_DEGREE * np.sqrt(d_lat ** 2 + d_lon ** 2)
+    fit = np.nan_to_num(np.clip(1.0 - distance / near.radius_km, 0.0, 1.0), nan=0.0)
+    return np.where(np.asarray(is_remote, dtype=bool), 1.0, fit)
+
+
+def combine(skills, experience, salary, location):
+    return (
+        WEIGHTS['skills'] * skills
+        + WEIGHTS['experience'] * experience
+        + WEIGHTS['salary'] * salary
+        + WEIGHTS['location'] * location
+    )
+
+
+def score_jobs(seekers, row, jobs, near=None):
+    # Score every job in `jobs` for seeker number `row` of `seekers` in one pass.
+    # With `near` (config.geo.Near) the location component is distance-based.
+    offered = seekers.skills.skill_set(row)
+    overlap = jobs.skills.overlap(offered)
+    if near is not None:
+        location = proximity_fit(jobs.latitudes, jobs.longitudes, jobs.is_remote, near)
+    else:
+        location = location_fit(jobs.locations, jobs.is_remote, seekers.locations[row])
+    return combine(
+        skill_fit(overlap, jobs.skills.counts, len(offered)),
+        experience_fit(jobs.levels, seekers.levels[row]),
+        salary_fit(jobs.salary_max, seekers.desired_salary[row]),
+        location,
+    )
+
+
+def score_candidates(jobs, row, seekers):
+    # Score every seeker in `seekers` for job number `row` of `jobs` in one pass
+    required = jobs.skills.skill_set(row)
+    overlap = seekers.skills.overlap(required)
+    return combine(
+        skill_fit(overlap, len(required), seekers.skills.counts),
+        experience_fit(jobs.levels[row], seekers.levels),
+        salary_fit(jobs.salary_max[row], seekers.desired_salary),
+        location_fit(jobs.locations[row], jobs.is_remote[row], seekers.locations),
+    )
+
+
+def rank(ids, scores):
+    # Order by score desc, then id desc (the deck tie-break)
+    order = np.lexsort((-ids, -scores))
+    return ids[order], scores[order]
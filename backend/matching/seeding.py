@@ -0,0 +1,324 @@
+import csv
+from datetime import timedelta
+
+import numpy as np
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db.models import Max, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+
+from config.geo import GAZETTEER_PATH, geo_fields
+from users.models import Profile, RecruiterProfile, JobSeekerProfile, SeekerSkill
+from users.skills import skill_ids
+from jobs.models import Job, JobSkill
+from .funnel import reconcile_funnels
+from .models import SwipeAction, Match, Message
+
+# Password of every generated account, so the data can also be explored by hand
+BENCH_PASSWORD = 'bench-password'
+
+SKILLS = [
+    'python', 'django', 'javascript', 'typescript', 'react', 'react native', 'node.js', 'sql', 'postgresql',
+    'mysql', 'redis', 'docker', 'kubernetes', 'aws', 'gcp', 'azure', 'terraform', 'go', 'rust', 'java',
+    'kotlin', 'swift', 'c#', '.net', 'php', 'ruby', 'rails', 'graphql', 'rest', 'linux', 'git', 'ci/cd',
+    'machine learning', 'pandas', 'numpy', 'data analysis', 'spark', 'airflow', 'tableau', 'excel',
+    'figma', 'ux research', 'product management', 'agile', 'scrum', 'sales', 'marketing', 'seo',
+    'copywriting', 'customer support', 'accounting', 'recruiting', 'project management', 'security',
+]
+TITLES = [
+    'Backend Engineer', 'Frontend Engineer', 'Full Stack Developer', 'Mobile Developer', 'Data Engineer',
+    'Data Scientist', 'DevOps Engineer', 'Site Reliability Engineer', 'QA Engineer', 'Product Manager',
+    'Product Designer', 'UX Researcher', 'Marketing Manager', 'Sales Representative', 'Account Manager',
+    'Customer Success Manager', 'Technical Writer', 'Security Engineer', 'Machine Learning Engineer',
+    'Engineering Manager',
+]
+LEVEL_YEARS = {'entry': (0, 2), 'mid': (2, 5), 'senior': (5, 10), 'executive': (10, 20)}
+JOB_TYPES = ['full_time', 'full_time', 'full_time', 'part_time', 'contract', 'internship']
+
+
+def places():
+    with open(GAZETTEER_PATH, newline='', encoding='utf-8') as handle:
+        return [row['name'] for row in csv.DictReader(handle)]
+
+
+def popularity(rng, count, exponent=1.0):
+    # Zipf-like weights in random order: a few items draw most of the attention
+    weights = 1.0 / np.arange(1, count + 1) ** exponent
+    return rng.permutation(weights / weights.sum())
+
+
+def sample_without_replacement(rng, cumulative, size):
+    # About `size` distinct indexes drawn by weight: oversample with replacement, then dedupe
+    size = min(size, len(cumulative))
+    picked = np.unique(np.searchsorted(cumulative, rng.random(size * 2 + 8)))
+    picked = picked[picked < len(cumulative)]
+    return rng.permutation(picked)[:size]
+
+
+def spread_created_at(model, ids, days):
+    # auto_now_add overwrites created_at on insert: spread the batches over the last `days`
+    # days afterwards, one UPDATE per batch, oldest first
+    if not len(ids):
+        return
+    now = timezone.now()
+    batches = np.array_split(np.sort(ids), min(len(ids), 200))
+    for index, batch in enumerate(batches):
+        if len(batch):
+            age = timedelta(days=days) * (1 - (index + 1) / len(batches))
+            model.objects.filter(id__gte=int(batch[0]), id__lte=int(batch[-1])).update(created_at=now - age)
+
+
+class BenchSeeder:
+    """
+    Bulk-generates users, profiles, jobs, swipes, matches and messages that look
+    like production: skewed job popularity and user activity, matches only where
+    both sides swiped right, and chat versions consistent with their messages.
+    Everything goes through bulk_create in batches of `batch_size`; the signals
+    bulk_create skips (skill links, geocoding, funnels) are applied directly.
+    """
+
+    def __init__(self, prefix='bench', seed=42, batch_size=5000, days=120, log=print):
+        self.prefix = prefix
+        self.rng = np.random.default_rng(seed)
+        self.batch_size = batch_size
+        self.days = days
+        self.log = log
+        self.counts = {}
+
+    def username(self, kind, index):
+        return f'{self.prefix}-{kind}{index}'
+
+    def users(self):
+        return User.objects.filter(username__startswith=f'{self.prefix}-')
+
+    def clear(self):
+        deleted, _ = self.users().delete()
+        return deleted
+
+    def seed(self, recruiters, seekers, jobs, swipes, recruiter_swipes, messages_per_match):
+        if self.users().exists():
+            raise ValueError(f'Accounts prefixed {self.prefix}- already exist; clear them first')
+        self.locations = places() + ['Remote']
+        ids = skill_ids(SKILLS)
+        self.skill_ids = np.array(list(ids.values()), dtype=np.int64)
+        self.skill_names = {skill_id: name for name, skill_id in ids.items()}
+        self.skill_weights = np.cumsum(popularity(self.rng, len(self.skill_ids)))
+
+        recruiter_profiles, seeker_profiles = self.seed_accounts(recruiters, seekers)
+        recruiter_ids = self.seed_recruiters(recruiter_profiles)
+        seeker_ids = self.seed_seekers(seeker_profiles)
+        job_ids, job_recruiters = self.seed_jobs(jobs, recruiter_ids)
+        right_pairs = self.seed_seeker_swipes(swipes, seeker_ids, seeker_profiles, job_ids)
+        matches = self.seed_recruiter_swipes(
+            recruiter_swipes, recruiter_ids, recruiter_profiles, seeker_ids, job_ids, job_recruiters, right_pairs,
+        )
+        self.seed_messages(matches, messages_per_match, seeker_ids, seeker_profiles, recruiter_ids,
+                           recruiter_profiles, job_ids, job_recruiters)
+        # Funnel rows are created by a post_save signal that bulk_create skips
+        self.counts['jobfunnel'] = reconcile_funnels(job_ids.tolist())
+        return self.counts
+
+    def bulk(self, model, rows):
+        for start in range(0, len(rows), self.batch_size):
+            model.objects.bulk_create(rows[start:start + self.batch_size])
+        self.counts[model._meta.model_name] = self.counts.get(model._meta.model_name, 0) + len(rows)
+
+    def pick_skills(self, low, high):
+        return self.skill_ids[sample_without_replacement(self.rng, self.skill_weights, int(self.rng.integers(low, high)))]
+
+    def seed_accounts(self, recruiters, seekers):
+        # Rows are re-read after bulk_create because MySQL does not return primary keys
+        self.log(f'Accounts: {recruiters} recruiters, {seekers} job seekers')
+        password = make_password(BENCH_PASSWORD)
+        names = [self.username('r', i) for i in range(recruiters)] + [self.username('s', i) for i in range(seekers)]
+        self.bulk(User, [
+            User(username=name, email=f'{name}@example.com', first_name=name.split('-')[-1].title(), password=password)
+            for name in names
+        ])
+        user_ids = dict(self.users().values_list('username', 'id'))
+        self.bulk(Token, [Token(key=Token.generate_key(), user_id=user_ids[name]) for name in names])
+
+        profiles = []
+        for index, name in enumerate(names):
+            location = self.locations[int(self.rng.integers(len(self.locations)))]
+            profiles.append(Profile(
+                user_id=user_ids[name], user_type='recruiter' if index < recruiters else 'job_seeker',
+                location=location, **geo_fields(location),
+            ))
+        self.bulk(Profile, profiles)
+        by_user = dict(Profile.objects.filter(user__username__startswith=f'{self.prefix}-').values_list('user_id', 'id'))
+        ordered = np.array([by_user[user_ids[name]] for name in names], dtype=np.int64)
+        return ordered[:recruiters], ordered[recruiters:]
+
+    def seed_recruiters(self, profile_ids):
+        self.bulk(RecruiterProfile, [
+            RecruiterProfile(profile_id=int(profile_id), company_name=f'Company {index}', position='Recruiter',
+                             industry=str(self.rng.choice(['Software', 'Finance', 'Retail', 'Health', 'Media'])))
+            for index, profile_id in enumerate(profile_ids)
+        ])
+        by_profile = dict(RecruiterProfile.objects.filter(profile_id__in=profile_ids.tolist()).values_list('profile_id', 'id'))
+        return np.array([by_profile[int(profile_id)] for profile_id in profile_ids], dtype=np.int64)
+
+    def seed_seekers(self, profile_ids):
+        self.log(f'Job seekers: {len(profile_ids)}')
+        seekers, skills = [], []
+        for profile_id in profile_ids:
+            picked = self.pick_skills(3, 9)
+            skills.append(picked)
+            seekers.append(JobSeekerProfile(
+                profile_id=int(profile_id), experience_years=int(self.rng.integers(0, 20)),
+                desired_position=str(self.rng.choice(TITLES)),
+                desired_salary=int(self.rng.integers(30, 180)) * 1000 if self.rng.random() < 0.7 else None,
+                skills=', '.join(self.skill_names[skill_id] for skill_id in picked.tolist()),
+            ))
+        self.bulk(JobSeekerProfile, seekers)
+        by_profile = dict(JobSeekerProfile.objects.filter(profile_id__in=profile_ids.tolist()).values_list('profile_id', 'id'))
+        seeker_ids = np.array([by_profile[int(profile_id)] for profile_id in profile_ids], dtype=np.int64)
+        self.bulk(SeekerSkill, [
+            SeekerSkill(job_seeker_id=int(seeker_id), skill_id=int(skill_id))
+            for seeker_id, picked in zip(seeker_ids, skills) for skill_id in picked
+        ])
+        return seeker_ids
+
+    def seed_jobs(self, count, recruiter_ids):
+        # Recruiters post a skewed number of jobs each
+        self.log(f'Jobs: {count}')
+        names = self.skill_names
+        owners = recruiter_ids[self.rng.choice(len(recruiter_ids), size=count, p=popularity(self.rng, len(recruiter_ids), 0.8))]
+        jobs, skills = [], []
+        for index, recruiter_id in enumerate(owners):
+            level = str(self.rng.choice(list(LEVEL_YEARS), p=[0.3, 0.4, 0.25, 0.05]))
+            salary_min = int(self.rng.integers(30, 150)) * 1000
+            is_remote = self.rng.random() < 0.25
+            location = 'Remote' if is_remote else self.locations[int(self.rng.integers(len(self.locations) - 1))]
+            picked = self.pick_skills(2, 7)
+            skills.append(picked)
+            title = str(self.rng.choice(TITLES))
+            jobs.append(Job(
+                recruiter_id=int(recruiter_id), title=title,
+                description=f'{title} working with {", ".join(names[skill_id] for skill_id in picked.tolist())}.',
+                requirements=f'{LEVEL_YEARS[level][0]}+ years of experience.',
+                location=location, **geo_fields(location), job_type=str(self.rng.choice(JOB_TYPES)),
+                experience_level=level, salary_min=salary_min, salary_max=salary_min + int(self.rng.integers(5, 60)) * 1000,
+                is_remote=is_remote, is_active=self.rng.random() < 0.85,
+                skills_required=', '.join(names[skill_id] for skill_id in picked.tolist()),
+            ))
+        start = Job.objects.aggregate(last=Max('id'))['last'] or 0
+        self.bulk(Job, jobs)
+        rows = list(Job.objects.filter(id__gt=start, recruiter_id__in=recruiter_ids.tolist()).order_by('id').values_list('id', 'recruiter_id'))
+        job_ids = np.array([job_id for job_id, _ in rows], dtype=np.int64)
+        self.bulk(JobSkill, [
+            JobSkill(job_id=int(job_id), skill_id=int(skill_id))
+            for job_id, picked in zip(job_ids, skills) for skill_id in picked
+        ])
+        return job_ids, np.array([recruiter_id for _, recruiter_id in rows], dtype=np.int64)
+
+    def seed_seeker_swipes(self, total, seeker_ids, profile_ids, job_ids):
+        """
+        About `total` seeker swipes: activity per seeker is log-normal, jobs are
+        picked by popularity, about a third are right swipes. Returns the right
+        swipes as (job position, seeker position) pairs.
+        """
+        self.log(f'Seeker swipes: {total}')
+        activity = self.rng.lognormal(0, 1, len(seeker_ids))
+        per_seeker = np.minimum(np.round(activity / activity.sum() * total).astype(np.int64), len(job_ids))
+        cumulative = np.cumsum(popularity(self.rng, len(job_ids)))
+        start = SwipeAction.objects.aggregate(last=Max('id'))['last'] or 0
+        right_pairs, pending = [], []
+        for position, count in enumerate(per_seeker):
+            if not count:
+                continue
+            picked = sample_without_replacement(self.rng, cumulative, int(count))
+            right = self.rng.random(len(picked)) < 0.35
+            right_pairs.append(np.column_stack([picked[right], np.full(right.sum(), position)]))
+            profile_id = int(profile_ids[position])
+            pending.extend(
+                SwipeAction(profile_id=profile_id, job_id=int(job_ids[job]), direction='right' if is_right else 'left')
+                for job, is_right in zip(picked.tolist(), right.tolist())
+            )
+            if len(pending) >= self.batch_size:
+                self.bulk(SwipeAction, pending)
+                pending = []
+        self.bulk(SwipeAction, pending)
+        self.spread_swipes(start)
+        return np.concatenate(right_pairs) if right_pairs else np.zeros((0, 2), dtype=np.int64)
+
+    def spread_swipes(self, after_id):
+        spread_created_at(SwipeAction, np.fromiter(
+            SwipeAction.objects.filter(id__gt=after_id).values_list('id', flat=True).iterator(), dtype=np.int64
+        ), self.days)
+
+    def seed_recruiter_swipes(self, total, recruiter_ids, profile_ids, seeker_ids, job_ids, job_recruiters, right_pairs):
+        """
+        About `total` recruiter swipes, mostly on seekers who liked one of the
+        recruiter's jobs (right half the time), the rest on random seekers.
+        Returns the matches created as (job position, seeker position) pairs.
+        """
+        self.log(f'Recruiter swipes: {total}')
+        recruiter_position = {int(recruiter_id): index for index, recruiter_id in enumerate(recruiter_ids)}
+        owner = np.array([recruiter_position[int(recruiter_id)] for recruiter_id in job_recruiters], dtype=np.int64)
+        interested = np.unique(owner[right_pairs[:, 0]] * len(seeker_ids) + right_pairs[:, 1]) if len(right_pairs) else np.array([], dtype=np.int64)
+        reviewed = interested[self.rng.random(len(interested)) < min(1.0, 0.8 * total / max(len(interested), 1))]
+        extra = np.unique(
+            self.rng.integers(len(recruiter_ids), size=max(total - len(reviewed), 0)) * len(seeker_ids)
+            + self.rng.integers(len(seeker_ids), size=max(total - len(reviewed), 0))
+        )
+        extra = extra[~np.isin(extra, reviewed)]
+        keys = np.concatenate([reviewed, extra])
+        right = np.concatenate([self.rng.random(len(reviewed)) < 0.5, self.rng.random(len(extra)) < 0.2])
+
+        swipes = [
+            SwipeAction(profile_id=int(profile_ids[key // len(seeker_ids)]), candidate_id=int(seeker_ids[key % len(seeker_ids)]),
+                        direction='right' if is_right else 'left')
+            for key, is_right in zip(keys.tolist(), right.tolist())
+        ]
+        start = SwipeAction.objects.aggregate(last=Max('id'))['last'] or 0
+        self.bulk(SwipeAction, swipes)
+        self.spread_swipes(start)
+
+        # A match wherever the seeker liked the job and its recruiter liked the seeker
+        liked_back = keys[right]
+        if not len(right_pairs):
+            return np.zeros((0, 2), dtype=np.int64)
+        matched = right_pairs[np.isin(owner[right_pairs[:, 0]] * len(seeker_ids) + right_pairs[:, 1], liked_back)]
+        self.log(f'Matches: {len(matched)}')
+        self.bulk(Match, [
+            Match(job_id=int(job_ids[job]), job_seeker_id=int(seeker_ids[seeker]), job_seeker_viewed=True,
+                  recruiter_viewed=bool(self.rng.random() < 0.7))
+            for job, seeker in matched.tolist()
+        ])
+        return matched
+
+    def seed_messages(self, matches, per_match, seeker_ids, seeker_profiles, recruiter_ids, recruiter_profiles,
+                      job_ids, job_recruiters):
+        # A geometric number of messages per match, alternating sides; all but the last few read
+        if not len(matches):
+            return
+        match_ids = dict(
+            ((job_id, seeker_id), match_id) for match_id, job_id, seeker_id in
+            Match.objects.filter(job_id__in=job_ids.tolist(), job_seeker_id__in=seeker_ids.tolist())
+            .values_list('id', 'job_id', 'job_seeker_id').iterator()
+        )
+        recruiter_profile = dict(zip(recruiter_ids.tolist(), recruiter_profiles.tolist()))
+        counts = self.rng.geometric(1 / (per_match + 1), len(matches)) - 1
+        self.log(f'Messages: {int(counts.sum())}')
+        pending = []
+        for (job, seeker), count in zip(matches.tolist(), counts.tolist()):
+            match_id = match_ids[(int(job_ids[job]), int(seeker_ids[seeker]))]
+            sides = [int(seeker_profiles[seeker]), recruiter_profile[int(job_recruiters[job])]]
+            first = int(self.rng.integers(2))
+            for version in range(1, count + 1):
+                pending.append(Message(
+                    match_id=match_id, sender_id=sides[(first + version) % 2],
+                    content=f'Message {version} about the role', version=version, is_read=version <= count - 2,
+                ))
+            if len(pending) >= self.batch_size:
+                self.bulk(Message, pending)
+                pending = []
+        self.bulk(Message, pending)
+        latest = Message.objects.filter(match=OuterRef('pk')).order_by('-version').values('version')[:1]
+        Match.objects.filter(id__in=list(match_ids.values())).update(
+            chat_version=Coalesce(Subquery(latest), Value(0)), chat_updated_at=timezone.now(),
+        )
@@ -1,5 +1,7 @@
+from django.utils.functional import cached_property
 from rest_framework import serializers
 from .models import SwipeAction, Match, Message
+from config.fieldsets import SparseFieldsetMixin
 from jobs.serializers import JobSerializer
 from users.serializers import JobSeekerProfileSerializer, ProfileSerializer
 
@@ -8,17 +10,65 @@ class SwipeActionSerializer(serializers.ModelSerializer):
         model = SwipeAction
         fields = '__all__'
 
-class MatchSerializer(serializers.ModelSerializer):
+class MatchSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     job = JobSerializer(read_only=True)
     job_seeker = JobSeekerProfileSerializer(read_only=True)
     
     class Meta:
         model = Match
         fields = '__all__'
+        read_only_fields = ['chat_version', 'chat_updated_at']
+        list_fields = ['id', 'job', 'job_seeker', 'recruiter_viewed', 'job_seeker_viewed', 'created_at', 'is_active']
         
 class MessageSerializer(serializers.ModelSerializer):
     sender = ProfileSerializer(read_only=True)
     
     class Meta:
         model = Message
-        fields = '__all__'
\ No newline at end of file
+        fields = '__all__'
+        read_only_fields = ['version']
+
+class InboxSerializer(serializers.ModelSerializer):
+    # One inbox row per match, from matching.inbox.inbox_queryset(); `reader` comes from the context
+    job = serializers.SerializerMethodField()
+    counterpart = serializers.SerializerMethodField()
+    last_message = serializers.SerializerMethodField()
+    unread_count = serializers.IntegerField(read_only=True)
+    viewed = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = Match
+        fields = ['id', 'job', 'counterpart', 'last_message', 'unread_count', 'viewed', 'created_at']
+    
+    def reader(self):
+        return self.context['reader']
+    
+    def get_job(self, match):
+        return {'id': match.job.id, 'title': match.job.title}
+    
+    def get_counterpart(self, match):
+        if self.reader().user_type == 'job_seeker':
+            profile = match.job.recruiter.profile
+            extra = {'company_name': match.job.recruiter.company_name}
+        else:
+            profile = match.job_seeker.profile
+            extra = {'job_seeker_id': match.job_seeker.id}
+        return {'profile': self.profile_serializer.to_representation(profile), **extra}
+    
+    @cached_property
+    def profile_serializer(self):
+        # Built once per response, not per row
+        return ProfileSerializer(compact=True, context=self.context)
+    
+    def get_last_message(self, match):
+        if match.last_message_id is None:
+            return None
+        return {
+            'id': match.last_message_id,
+            'text': match.last_message_text,
+            'created_at': serializers.DateTimeField().to_representation(match.last_message_at),
+            'is_mine': match.last_message_sender_id == self.reader().id,
+        }
+    
+    def get_viewed(self, match):
+        return match.job_seeker_viewed if self.reader().user_type == 'job_seeker' else match.recruiter_viewed
@@ -0,0 +1,86 @@
+from django.core.signals import setting_changed
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from jobs.models import Job, Application
+from .models import SwipeAction, Match, Message, JobFunnel
+from .realtime import broadcast_message
+from .right_swipes import get_right_swipe_index, reset_right_swipe_index
+from .deck_queue import get_deck_queue, reset_deck_queue
+from .funnel import add_counts, count_swipes, reset_view_buffer
+from .tasks import notify_match, schedule_unread_notice
+
+
+@receiver(post_save, sender=SwipeAction)
+def index_right_swipe(sender, instance, created=False, **kwargs):
+    if created and instance.direction == 'right':
+        transaction.on_commit(lambda: get_right_swipe_index().record([instance]))
+
+
+@receiver(post_delete, sender=SwipeAction)
+def unindex_swipe(sender, instance, **kwargs):
+    # Dropping the entry is always safe: the next lookup falls back to SQL
+    get_right_swipe_index().forget([instance])
+
+
+@receiver(post_save, sender=Job)
+def create_job_funnel(sender, instance, created=False, **kwargs):
+    if created:
+        JobFunnel.objects.create(job=instance)
+
+
+# Funnel counters for rows saved one at a time; record_swipes counts its bulk inserts itself
+@receiver(post_save, sender=SwipeAction)
+def count_swipe(sender, instance, created=False, **kwargs):
+    if created:
+        count_swipes([instance])
+
+
+@receiver(post_save, sender=Match)
+def count_match(sender, instance, created=False, **kwargs):
+    if created:
+        add_counts({instance.job_id: {'matches': 1}})
+        notify_match.enqueue(instance.job_id, instance.job_seeker_id)
+
+
+@receiver(post_save, sender=Application)
+def count_application(sender, instance, created=False, **kwargs):
+    if created:
+        add_counts({instance.job_id: {'applications': 1}})
+
+
+@receiver(post_delete, sender=Application)
+def uncount_application(sender, instance, **kwargs):
+    # A plain UPDATE: when the job itself is being deleted its funnel row is already gone
+    add_counts({instance.job_id: {'applications': -1}})
+
+
+@receiver(post_save, sender=Job)
+def unqueue_inactive_job(sender, instance, **kwargs):
+    if not instance.is_active:
+        transaction.on_commit(lambda: get_deck_queue().discard_job(instance.id))
+
+
+@receiver(post_delete, sender=Job)
+def unqueue_deleted_job(sender, instance, **kwargs):
+    get_deck_queue().discard_job(instance.id)
+
+
+@receiver(post_save, sender=Message)
+def push_new_message(sender, instance, created=False, **kwargs):
+    # Reaches open chat sockets whether the message came over REST or WebSocket
+    if created:
+        transaction.on_commit(lambda: broadcast_message(instance))
+        # After commit, so a rolled-back message leaves no pending-notice marker behind
+        transaction.on_commit(lambda: schedule_unread_notice(instance))
+
+
+@receiver(setting_changed)
+def reset_index_on_setting_change(setting, **kwargs):
+    if setting == 'RIGHT_SWIPE_INDEX':
+        reset_right_swipe_index()
+    elif setting == 'DECK_QUEUE':
+        reset_deck_queue()
+    elif setting == 'JOB_FUNNEL':
+        reset_view_buffer()
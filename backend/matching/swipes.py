@@ -0,0 +1,246 @@
+from django.db import IntegrityError, transaction
+from rest_framework import status
+
+from users.models import JobSeekerProfile
+from jobs.models import Job
+from .models import SwipeAction, SwipeArchive, Match
+from .archive import archived_among
+from .right_swipes import get_right_swipe_index, JOB, CANDIDATE
+from .deck_queue import get_deck_queue, JOB_DECK, CANDIDATE_DECK
+from .funnel import count_swipes
+from .tasks import notify_match
+
+MAX_SWIPE_BATCH = 100
+
+# HTTP status for each per-item error, used when a single swipe is posted
+SWIPE_ERROR_STATUS = {
+    'Invalid direction': status.HTTP_400_BAD_REQUEST,
+    'Job ID required': status.HTTP_400_BAD_REQUEST,
+    'Job seeker ID and Job ID required': status.HTTP_400_BAD_REQUEST,
+    'Job not found': status.HTTP_404_NOT_FOUND,
+    'Invalid job': status.HTTP_403_FORBIDDEN,
+    'Job seeker not found': status.HTTP_404_NOT_FOUND,
+    'Already swiped': status.HTTP_409_CONFLICT,
+}
+
+
+def as_id(value):
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        return None
+    return value if value > 0 else None
+
+
+def record_swipes(profile, items):
+    """
+    Record an ordered list of swipes by `profile` and create the matches they complete.
+
+    Returns one result per item ({'index', 'recorded', 'matched'} plus 'error' when
+    the item was rejected) and the list of newly created matches. Swipes are written
+    with bulk_create and reciprocal right swipes are answered by the right-swipe
+    index, which needs at most one SQL query for the whole batch on a miss. Only
+    swipes this call inserted are counted, matched and reported as recorded; one
+    that lost a race with a concurrent request is 'Already swiped'.
+    Raises JobSeekerProfile.DoesNotExist for a seeker without a profile.
+    """
+    if profile.user_type == 'job_seeker':
+        job_seeker = profile.jobseekerprofile
+        results, pending = seeker_swipes(profile, job_seeker, items)
+        reciprocal = seeker_reciprocal_pairs(job_seeker, pending)
+    else:
+        results, pending = recruiter_swipes(profile, items)
+        reciprocal = recruiter_reciprocal_pairs(pending)
+
+    swipes = [swipe for _, swipe, _ in pending]
+    with transaction.atomic():
+        # A concurrent request may have recorded the same swipe since we checked
+        inserted = {id(swipe) for swipe in insert_new(SwipeAction, swipes)}
+        for result, swipe, _ in pending:
+            if id(swipe) not in inserted:
+                result['error'] = 'Already swiped'
+        pending = [entry for entry in pending if id(entry[1]) in inserted]
+        # A pair completes only through a right swipe that was actually stored
+        reciprocal &= {pair for _, swipe, pair in pending if swipe.direction == 'right'}
+        new_pairs = create_matches(reciprocal)
+        stored = [swipe for _, swipe, _ in pending]
+        # Funnel counters move in the same transaction as the rows they count
+        count_swipes(stored, new_pairs)
+        # bulk_create sends no post_save, so update the right-swipe index here, with the
+        # stored swipes only: a cached right swipe that lost its race would fake a match
+        transaction.on_commit(lambda: get_right_swipe_index().record(stored))
+        transaction.on_commit(lambda: pop_deck_queues(profile, pending))
+        # Slower side effects run on a task worker after commit
+        notify_match.enqueue_many([(pair, {}) for pair in new_pairs])
+
+    matches = []
+    for result, swipe, pair in pending:
+        result['recorded'] = True
+        # Only the first swipe that completes a pair reports the match
+        if swipe.direction == 'right' and pair in new_pairs:
+            new_pairs.discard(pair)
+            result['matched'] = True
+            matches.append({'job_id': pair[0], 'job_seeker_id': pair[1]})
+    return results, matches
+
+
+def pop_deck_queues(profile, pending):
+    # Swiped cards leave the swiper's queued decks (matching/deck_queue.py)
+    if not pending:
+        return
+    queued = {}
+    if profile.user_type == 'job_seeker':
+        for _, _, (job_id, job_seeker_id) in pending:
+            queued.setdefault((JOB_DECK, job_seeker_id), []).append(job_id)
+    else:
+        # A recruiter's swipe decides the candidate for all of their jobs, so it leaves every job's deck
+        job_seeker_ids = [job_seeker_id for _, _, (_, job_seeker_id) in pending]
+        for job_id in Job.objects.filter(recruiter__profile=profile, is_active=True).values_list('id', flat=True):
+            queued[(CANDIDATE_DECK, job_id)] = job_seeker_ids
+    deck_queue = get_deck_queue()
+    for key, item_ids in queued.items():
+        deck_queue.swiped(key, item_ids)
+
+
+def new_result(index):
+    return {'index': index, 'recorded': False, 'matched': False}
+
+
+def seeker_swipes(profile, job_seeker, items):
+    # Job seeker swiping on jobs; pending entries are (result, swipe, (job_id, job_seeker_id))
+    job_ids = {as_id(item.get('job_id')) for item in items} - {None}
+    jobs = Job.objects.select_related('recruiter').in_bulk(job_ids)
+    swiped = set(SwipeAction.objects.filter(profile=profile, job_id__in=job_ids).values_list('job_id', flat=True))
+    swiped |= archived_among(profile.id, SwipeArchive.JOB, job_ids)
+
+    results, pending = [], []
+    for index, item in enumerate(items):
+        result = new_result(index)
+        results.append(result)
+        direction = item.get('direction')
+        if direction not in ('left', 'right'):
+            result['error'] = 'Invalid direction'
+            continue
+        if not item.get('job_id'):
+            result['error'] = 'Job ID required'
+            continue
+        job = jobs.get(as_id(item.get('job_id')))
+        if job is None:
+            result['error'] = 'Job not found'
+            continue
+        if job.id in swiped:
+            result['error'] = 'Already swiped'
+            continue
+        swiped.add(job.id)
+        swipe = SwipeAction(profile=profile, job=job, direction=direction)
+        pending.append((result, swipe, (job.id, job_seeker.id)))
+    return results, pending
+
+
+def recruiter_swipes(profile, items):
+    # Recruiter swiping on candidates for a job. Swipes are recorded per candidate, not per
+    # job (see SwipeAction.Meta): a candidate already swiped for any of the recruiter's jobs
+    # is 'Already swiped' for all of them
+    job_seeker_ids = {as_id(item.get('job_seeker_id')) for item in items} - {None}
+    job_seekers = JobSeekerProfile.objects.in_bulk(job_seeker_ids)
+    swiped = set(SwipeAction.objects.filter(
+        profile=profile, candidate_id__in=job_seeker_ids
+    ).values_list('candidate_id', flat=True))
+    swiped |= archived_among(profile.id, SwipeArchive.CANDIDATE, job_seeker_ids)
+    # Job id -> whether it is one of this recruiter's jobs
+    owned = {
+        job_id: recruiter_profile_id == profile.id
+        for job_id, recruiter_profile_id in Job.objects.filter(
+            id__in={as_id(item.get('job_id')) for item in items} - {None}
+        ).values_list('id', 'recruiter__profile_id')
+    }
+
+    results, pending = [], []
+    for index, item in enumerate(items):
+        result = new_result(index)
+        results.append(result)
+        direction = item.get('direction')
+        if direction not in ('left', 'right'):
+            result['error'] = 'Invalid direction'
+            continue
+        if not item.get('job_seeker_id') or not item.get('job_id'):
+            result['error'] = 'Job seeker ID and Job ID required'
+            continue
+        job_seeker = job_seekers.get(as_id(item.get('job_seeker_id')))
+        if job_seeker is None:
+            result['error'] = 'Job seeker not found'
+            continue
+        job_id = as_id(item.get('job_id'))
+        if job_id not in owned:
+            result['error'] = 'Job not found'
+            continue
+        if not owned[job_id]:
+            result['error'] = 'Invalid job'
+            continue
+        if job_seeker.id in swiped:
+            result['error'] = 'Already swiped'
+            continue
+        swiped.add(job_seeker.id)
+        swipe = SwipeAction(profile=profile, candidate=job_seeker, direction=direction)
+        pending.append((result, swipe, (job_id, job_seeker.id)))
+    return results, pending
+
+
+def seeker_reciprocal_pairs(job_seeker, pending):
+    # Jobs whose recruiter already swiped right on this seeker
+    right = [(swipe, pair) for _, swipe, pair in pending if swipe.direction == 'right']
+    if not right:
+        return set()
+    keys = [(CANDIDATE, swipe.job.recruiter.profile_id, job_seeker.id) for swipe, _ in right]
+    liked = get_right_swipe_index().swiped_right(keys)
+    return {pair for key, (_, pair) in zip(keys, right) if key in liked}
+
+
+def recruiter_reciprocal_pairs(pending):
+    # Candidates who already swiped right on the job
+    right = [(swipe, pair) for _, swipe, pair in pending if swipe.direction == 'right']
+    if not right:
+        return set()
+    keys = [(JOB, swipe.candidate.profile_id, pair[0]) for swipe, pair in right]
+    liked = get_right_swipe_index().swiped_right(keys)
+    return {pair for key, (_, pair) in zip(keys, right) if key in liked}
+
+
+def insert_new(model, objs):
+    """
+    Insert `objs` and return the ones this call wrote: rows that conflict with a
+    unique constraint (written meanwhile by a concurrent request) are left out.
+    One INSERT in the common case; after a conflict, one savepoint per row. Like
+    bulk_create, sends no post_save.
+    """
+    if not objs:
+        return []
+    try:
+        with transaction.atomic():
+            model.objects.bulk_create(objs)
+        return objs
+    except IntegrityError:
+        pass
+    inserted = []
+    for obj in objs:
+        try:
+            with transaction.atomic():
+                model.objects.bulk_create([obj])
+        except IntegrityError:
+            continue
+        inserted.append(obj)
+    return inserted
+
+
+def create_matches(pairs):
+    # Insert the pairs that are not matched yet; returns only the ones this call created
+    if not pairs:
+        return set()
+    existing = set(Match.objects.filter(
+        job_id__in={job_id for job_id, _ in pairs},
+        job_seeker_id__in={job_seeker_id for _, job_seeker_id in pairs},
+    ).values_list('job_id', 'job_seeker_id'))
+    created = insert_new(Match, [
+        Match(job_id=job_id, job_seeker_id=job_seeker_id) for job_id, job_seeker_id in pairs - existing
+    ])
+    return {(match.job_id, match.job_seeker_id) for match in created}
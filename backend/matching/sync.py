@@ -0,0 +1,113 @@
+import time
+
+from django.db import transaction
+from django.db.models import F, OuterRef, Subquery
+from django.utils import timezone
+
+from config.pagination import encode_cursor, decode_cursor, keyset_filter
+from .models import Match, Message
+
+SYNC_PAGE_SIZE = 200
+# Long-polls hold a worker thread and re-read the match once per POLL_INTERVAL,
+# so they stay short; clients wanting instant delivery use the WebSocket
+MAX_SYNC_WAIT = 5
+POLL_INTERVAL = 1.0
+# Matches per bulk mark-read request
+MAX_READ_BATCH = 100
+
+# Sync cursors are (version, id) of the last message the client has seen
+SYNC_FIELDS = ('version', 'id')
+
+
+def bump_chat_version(match_id):
+    """
+    Advance the match's chat version and return the new value.
+
+    Must run inside the transaction that writes the changed messages: the UPDATE
+    holds the match row lock until commit, so versions commit in order and a
+    client that has seen version N can never miss a later write stamped <= N.
+    """
+    Match.objects.filter(pk=match_id).update(chat_version=F('chat_version') + 1, chat_updated_at=timezone.now())
+    return Match.objects.filter(pk=match_id).values_list('chat_version', flat=True).get()
+
+
+def create_message(match_id, sender, content):
+    with transaction.atomic():
+        version = bump_chat_version(match_id)
+        return Message.objects.create(match_id=match_id, sender=sender, content=content, version=version)
+
+
+def mark_messages_read(match_id, reader):
+    # Mark the other side's unread messages read in one UPDATE; returns their ids
+    with transaction.atomic():
+        unread = Message.objects.filter(match_id=match_id, is_read=False).exclude(sender=reader)
+        message_ids = list(unread.values_list('id', flat=True))
+        if message_ids:
+            version = bump_chat_version(match_id)
+            Message.objects.filter(id__in=message_ids).update(is_read=True, version=version)
+    return message_ids
+
+
+def mark_matches_read(match_ids, reader, viewed_field):
+    """
+    Mark the other side's unread messages in `match_ids` read and set the reader's
+    `viewed_field` on each match, in a fixed number of UPDATEs whatever the number
+    of matches or messages. Returns {match_id: [message ids]} for the matches that
+    had unread messages.
+    """
+    match_ids = list(match_ids)
+    read = {}
+    with transaction.atomic():
+        Match.objects.filter(id__in=match_ids).update(**{viewed_field: True})
+        unread = Message.objects.filter(match_id__in=match_ids, is_read=False).exclude(sender=reader)
+        for match_id, message_id in unread.values_list('match_id', 'id'):
+            read.setdefault(match_id, []).append(message_id)
+        if read:
+            # As bump_chat_version, for every match at once; each message takes its match's new version
+            Match.objects.filter(id__in=read).update(
+                chat_version=F('chat_version') + 1, chat_updated_at=timezone.now()
+            )
+            version = Match.objects.filter(pk=OuterRef('match_id')).values('chat_version')
+            Message.objects.filter(id__in=[message_id for ids in read.values() for message_id in ids]).update(
+                is_read=True, version=Subquery(version)
+            )
+    return read
+
+
+def chat_state(match_id):
+    # (chat_version, chat_updated_at) of the match; one primary key lookup
+    return Match.objects.filter(pk=match_id).values_list('chat_version', 'chat_updated_at').get()
+
+
+def messages_since(match_id, cursor=None, limit=SYNC_PAGE_SIZE):
+    """
+    Messages created or changed (e.g. read) after `cursor`, oldest change first.
+
+    Returns (messages, next_cursor, has_more). Raises InvalidCursor.
+    """
+    queryset = Message.objects.filter(match_id=match_id).select_related('sender__user')
+    if cursor:
+        queryset = queryset.filter(keyset_filter(SYNC_FIELDS, decode_cursor(cursor, len(SYNC_FIELDS)), False))
+    messages = list(queryset.order_by(*SYNC_FIELDS)[:limit + 1])
+    has_more = len(messages) > limit
+    messages = messages[:limit]
+    if messages:
+        cursor = encode_cursor(messages[-1].version, messages[-1].id)
+    return messages, cursor, has_more
+
+
+def cursor_version(cursor):
+    return decode_cursor(cursor, len(SYNC_FIELDS))[0] if cursor else 0
+
+
+def wait_for_change(match_id, version, timeout):
+    # Long-poll: re-read the match version until it moves past `version` or time runs out
+    deadline = time.monotonic() + min(timeout, MAX_SYNC_WAIT)
+    while True:
+        current, _ = chat_state(match_id)
+        if current > version:
+            return True
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False
+        time.sleep(min(POLL_INTERVAL, remaining))
@@ -0,0 +1,82 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.core.mail import send_mass_mail
+
+from tasks.queue import task
+from .models import Match, Message
+
+# Seconds a message may stay unread before the recipient is emailed about it
+UNREAD_NOTICE_DELAY = 5 * 60
+# Pending-notice markers outlive the delay, in case workers run behind
+UNREAD_NOTICE_TIMEOUT = 2 * UNREAD_NOTICE_DELAY
+
+
+def reachable_user(profile):
+    # The profile's user, or None without an email address
+    return profile.user if profile.user.email else None
+
+
+@task()
+def notify_match(job_id, job_seeker_id):
+    # Email both sides of a new match
+    match = Match.objects.select_related(
+        'job__recruiter__profile__user', 'job_seeker__profile__user'
+    ).filter(job_id=job_id, job_seeker_id=job_seeker_id, is_active=True).first()
+    if match is None:
+        return
+    seeker, recruiter = reachable_user(match.job_seeker.profile), reachable_user(match.job.recruiter.profile)
+    emails = []
+    if seeker is not None:
+        emails.append((
+            f"It's a match: {match.job.title}",
+            f"{match.job.recruiter.company_name} is interested in you for {match.job.title}. Say hello in the app.",
+            settings.DEFAULT_FROM_EMAIL, [seeker.email],
+        ))
+    if recruiter is not None:
+        name = match.job_seeker.profile.user.get_full_name() or match.job_seeker.profile.user.username
+        emails.append((
+            f"New match for {match.job.title}",
+            f"{name} matched with your {match.job.title} job. Say hello in the app.",
+            settings.DEFAULT_FROM_EMAIL, [recruiter.email],
+        ))
+    send_mass_mail(emails)
+
+
+def unread_notice_key(match_id, sender_id):
+    return f'unread-notice:{match_id}:{sender_id}'
+
+
+def schedule_unread_notice(message):
+    """
+    Schedule one unread-message notice per (match, recipient): while a notice is
+    pending, later messages from the same sender join it instead of queueing
+    their own. The marker lives in the default cache, so a shared cache backend
+    coalesces across processes too; a lost marker costs at most an extra email.
+    """
+    if caches['default'].add(unread_notice_key(message.match_id, message.sender_id), True, UNREAD_NOTICE_TIMEOUT):
+        notify_unread_messages.enqueue_in(UNREAD_NOTICE_DELAY, message.match_id, message.sender_id)
+
+
+@task()
+def notify_unread_messages(match_id, sender_id):
+    # Email the other side of the match once about the sender's messages they have not read by now
+    caches['default'].delete(unread_notice_key(match_id, sender_id))
+    unread = Message.objects.filter(match_id=match_id, sender_id=sender_id, is_read=False)
+    latest = unread.select_related(
+        'sender__user', 'match__job__recruiter__profile__user', 'match__job_seeker__profile__user'
+    ).order_by('-id').first()
+    if latest is None:
+        return
+    match = latest.match
+    seeker_profile, recruiter_profile = match.job_seeker.profile, match.job.recruiter.profile
+    recipient = reachable_user(recruiter_profile if sender_id == seeker_profile.id else seeker_profile)
+    if recipient is None:
+        return
+    sender = latest.sender.user.get_full_name() or latest.sender.user.username
+    count = unread.count()
+    if count == 1:
+        subject, body = f"New message about {match.job.title}", f"{sender} wrote: {latest.content[:200]}"
+    else:
+        subject = f"{count} new messages about {match.job.title}"
+        body = f"{sender} sent you {count} messages. The latest: {latest.content[:200]}"
+    send_mass_mail([(subject, body, settings.DEFAULT_FROM_EMAIL, [recipient.email])])
@@ -1,3 +1,1359 @@
-from django.test import TestCase
+import json
+import random
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+import numpy as np
+from channels.db import database_sync_to_async
+from channels.testing import WebsocketCommunicator
+from django.core import mail
+from django.core.cache import caches
+from django.db import IntegrityError, connection, transaction
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from rest_framework.renderers import JSONRenderer
+
+from config.asgi import application
+from config.geo import Near
+from config.fastpath import RowSerializer
+from config.fieldsets import parse_paths
+from config.renderers import FastJSONRenderer
+from config.testing import QueryBudgetMixin
+from jobs.models import Job, Application
+from jobs.serializers import JobSerializer
+from jobs.tests import make_recruiter, make_job_seeker
+from tasks.models import Task
+from tasks.queue import run_message
+from users.models import Profile
+from .models import (
+    SwipeAction, Match, Message, JobRecommendations, CandidateRecommendations, JobFunnel, SwipeArchive, SwipeRollup,
+)
+from .recommend import build_recommendations
+from .inbox import SNIPPET_LENGTH
+from .sync import create_message, MAX_SYNC_WAIT
+from . import right_swipes
+from .right_swipes import (
+    CacheRightSwipeIndex, LocalRightSwipeIndex, JOB, CANDIDATE, get_right_swipe_index, key_for,
+    reset_right_swipe_index,
+)
+from .deck_queue import get_deck_queue, reset_deck_queue, JOB_DECK, CANDIDATE_DECK
+from .funnel import ViewBuffer, get_view_buffer, reset_view_buffer, reconcile_funnels
+from .archive import archive_swipes
+from .seeding import BenchSeeder
+from . import swipes
+from .swipes import MAX_SWIPE_BATCH, create_matches, insert_new
+from .scoring import (
+    NEUTRAL, WEIGHTS, JobFeatures, SeekerFeatures, experience_fit, location_fit, salary_fit, score_candidates, score_jobs,
+    skill_fit,
+)
+from .loadtest import InProcessTransport, LoadRunner, compare_reports, load_sessions, parse_mix, run_benchmark
+from .serializers import MatchSerializer
+
+
+class MatchingQueryBudgetTests(QueryBudgetMixin, TestCase):
+    def setUp(self):
+        self.recruiter = make_recruiter('recruiter')
+        self.job_seeker = make_job_seeker('seeker')
+        self.job = self.new_job(self.recruiter)
+        self.match = Match.objects.create(job=self.job, job_seeker=self.job_seeker)
+        self.seeker_client = self.api_client(self.job_seeker.profile.user)
+        self.recruiter_client = self.api_client(self.recruiter.profile.user)
+        self.created = 0
+
+    def new_job(self, recruiter):
+        return Job.objects.create(recruiter=recruiter, title='Job', description='d', requirements='r', location='Remote')
+
+    def new_seeker(self):
+        self.created += 1
+        return make_job_seeker(f'candidate{self.created}')
+
+    def grow_seeker_matches(self, count=10):
+        for _ in range(count):
+            self.created += 1
+            job = self.new_job(make_recruiter(f'other-recruiter{self.created}'))
+            Match.objects.create(job=job, job_seeker=self.job_seeker)
+
+    def grow_recruiter_matches(self, count=10):
+        for _ in range(count):
+            Match.objects.create(job=self.new_job(self.recruiter), job_seeker=self.new_seeker())
+
+    def grow_messages(self, count=10):
+        for i in range(count):
+            sender = self.job_seeker.profile if i % 2 else self.recruiter.profile
+            Message.objects.create(match=self.match, sender=sender, content='Hello')
+
+    def grow_candidates(self, count=10):
+        for i in range(count):
+            seeker = self.new_seeker()
+            if i % 2:
+                SwipeAction.objects.create(profile=seeker.profile, job=self.job, direction='right')
+
+    def test_match_list_for_job_seeker(self):
+        self.assertQueryBudget(self.seeker_client, '/api/matching/matches/', 1, grow=self.grow_seeker_matches)
+
+    def test_match_list_for_recruiter(self):
+        self.assertQueryBudget(self.recruiter_client, '/api/matching/matches/', 1, grow=self.grow_recruiter_matches)
+
+    def test_message_list(self):
+        self.grow_messages(2)
+        self.assertQueryBudget(
+            self.seeker_client, '/api/matching/messages/', 1, grow=self.grow_messages, data={'match_id': self.match.id}
+        )
+
+    def test_message_sync(self):
+        self.grow_messages(2)
+        self.assertQueryBudget(
+            self.seeker_client, '/api/matching/messages/sync/', 2, grow=self.grow_messages,
+            data={'match_id': self.match.id},
+        )
+
+    def test_inbox(self):
+        def grow():
+            self.grow_seeker_matches()
+            self.grow_recruiter_matches()
+            for match in Match.objects.all():
+                Message.objects.create(match=match, sender=self.job_seeker.profile, content='Hi')
+
+        grow()
+        self.assertQueryBudget(self.seeker_client, '/api/matching/matches/inbox/', 1, grow=grow)
+        self.assertQueryBudget(self.recruiter_client, '/api/matching/matches/inbox/', 1, grow=grow)
+
+    def test_job_deck(self):
+        def grow():
+            for _ in range(10):
+                self.created += 1
+                self.new_job(make_recruiter(f'deck-recruiter{self.created}'))
+
+        # Stored recommendations, then (with none) the scored pool, skill links and cards
+        self.assertQueryBudget(self.seeker_client, '/api/matching/deck/', 5, grow=grow)
+
+    def test_candidate_deck(self):
+        self.grow_candidates(2)
+        self.assertQueryBudget(
+            self.recruiter_client, f'/api/matching/jobs/{self.job.id}/deck/', 3, grow=self.grow_candidates
+        )
+
+
+class InboxTests(QueryBudgetMixin, TestCase):
+    def setUp(self):
+        self.recruiter = make_recruiter('recruiter')
+        self.job_seeker = make_job_seeker('seeker')
+        self.matches = []
+        for title in ['Backend', 'Frontend']:
+            job = Job.objects.create(recruiter=self.recruiter, title=title, description='d', requirements='r')
+            self.matches.append(Match.objects.create(job=job, job_seeker=self.job_seeker))
+        self.seeker_client = self.api_client(self.job_seeker.profile.user)
+        self.recruiter_client = self.api_client(self.recruiter.profile.user)
+
+    def say(self, match, sender, content):
+        return create_message(match.id, sender.profile, content)
+
+    def inbox(self, client):
+        response = client.get('/api/matching/matches/inbox/')
+        self.assertEqual(response.status_code, 200, response.data)
+        return {entry['job']['title']: entry for entry in response.data['results']}
+
+    def test_last_message_and_unread_counts(self):
+        backend, frontend = self.matches
+        self.say(backend, self.recruiter, 'Hello')
+        self.say(backend, self.recruiter, 'x' * 300)
+        self.say(frontend, self.job_seeker, 'Any news?')
+
+        inbox = self.inbox(self.seeker_client)
+        self.assertEqual(inbox['Backend']['unread_count'], 2)
+        self.assertEqual(inbox['Backend']['last_message']['text'], 'x' * SNIPPET_LENGTH)
+        self.assertFalse(inbox['Backend']['last_message']['is_mine'])
+        self.assertEqual(inbox['Backend']['counterpart']['company_name'], 'Acme')
+        # The seeker's own message is never unread for them
+        self.assertEqual(inbox['Frontend']['unread_count'], 0)
+        self.assertTrue(inbox['Frontend']['last_message']['is_mine'])
+
+        inbox = self.inbox(self.recruiter_client)
+        self.assertEqual((inbox['Backend']['unread_count'], inbox['Frontend']['unread_count']), (0, 1))
+        self.assertEqual(inbox['Frontend']['counterpart']['job_seeker_id'], self.job_seeker.id)
+
+    def test_message_pages_walk_back_in_time(self):
+        backend, _ = self.matches
+        sent = [self.say(backend, self.recruiter, f'Line {i}').id for i in range(5)]
+        pages, url = [], f'/api/matching/messages/?match_id={backend.id}&limit=2'
+        while url:
+            response = self.seeker_client.get(url)
+            self.assertEqual(response.status_code, 200, response.data)
+            pages.append([message['id'] for message in response.data['results']])
+            url = response.data['next']
+        # Newest page first, each page oldest -> newest
+        self.assertEqual(pages, [sent[3:5], sent[1:3], sent[0:1]])
+        response = self.seeker_client.get('/api/matching/messages/', {'match_id': backend.id, 'cursor': 'bad'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_bulk_mark_read(self):
+        backend, frontend = self.matches
+        hello = self.say(backend, self.recruiter, 'Hello')
+        news = self.say(frontend, self.recruiter, 'News')
+        mine = self.say(frontend, self.job_seeker, 'Thanks')
+        other = Match.objects.create(job=backend.job, job_seeker=make_job_seeker('other'))
+        self.say(other, self.recruiter, 'Not yours')
+
+        response = self.seeker_client.post('/api/matching/matches/read/', {
+            'match_ids': [backend.id, frontend.id, other.id],
+        }, format='json')
+        self.assertEqual(response.status_code, 200, response.data)
+        read = {entry['match_id']: entry['message_ids'] for entry in response.data['results']}
+        # Matches of other seekers are ignored
+        self.assertEqual(read, {backend.id: [hello.id], frontend.id: [news.id]})
+        self.assertFalse(Message.objects.get(id=mine.id).is_read)
+        self.assertEqual(Message.objects.filter(match=other, is_read=False).count(), 1)
+        self.assertEqual(
+            set(Match.objects.filter(job_seeker=self.job_seeker).values_list('job_seeker_viewed', 'recruiter_viewed')),
+            {(True, False)},
+        )
+        # Read receipts reach incremental sync: each message carries its match's new version
+        backend.refresh_from_db()
+        self.assertEqual(Message.objects.get(id=hello.id).version, backend.chat_version)
+        self.assertEqual({entry['unread_count'] for entry in self.inbox(self.seeker_client).values()}, {0})
+
+    def test_mark_read_queries_do_not_grow(self):
+        def mark_all_read():
+            for match in self.matches:
+                for _ in range(3):
+                    self.say(match, self.recruiter, 'Hello')
+            ids = [match.id for match in self.matches]
+            with CaptureQueriesContext(connection) as queries:
+                self.seeker_client.post('/api/matching/matches/read/', {'match_ids': ids}, format='json')
+            return len(queries)
+
+        small = mark_all_read()
+        for title in ['Data', 'Mobile', 'Platform']:
+            job = Job.objects.create(recruiter=self.recruiter, title=title, description='d', requirements='r')
+            self.matches.append(Match.objects.create(job=job, job_seeker=self.job_seeker))
+        self.assertEqual(mark_all_read(), small)
+
+    def test_invalid_request(self):
+        response = self.seeker_client.post('/api/matching/matches/read/', {'match_ids': 'all'}, format='json')
+        self.assertEqual((response.status_code, response.data), (400, {'error': 'A list of match IDs is required'}))
+
+
+class MessageSyncTests(QueryBudgetMixin, TestCase):
+    url = '/api/matching/messages/sync/'
+
+    def setUp(self):
+        self.recruiter = make_recruiter('recruiter')
+        self.job_seeker = make_job_seeker('seeker')
+        job = Job.objects.create(recruiter=self.recruiter, title='Backend', description='d', requirements='r')
+        self.match = Match.objects.create(job=job, job_seeker=self.job_seeker)
+        self.seeker_client = self.api_client(self.job_seeker.profile.user)
+
+    def sync(self, since=None, etag=None, **params):
+        if since:
+            params['since'] = since
+        headers = {'HTTP_IF_NONE_MATCH': etag} if etag else {}
+        return self.seeker_client.get(self.url, {'match_id': self.match.id, **params}, **headers)
+
+    def test_since_returns_only_later_changes(self):
+        hello = create_message(self.match.id, self.recruiter.profile, 'Hello')
+        response = self.sync()
+        self.assertEqual([message['id'] for message in response.data['results']], [hello.id])
+        self.assertFalse(response.data['has_more'])
+
+        reply = create_message(self.match.id, self.job_seeker.profile, 'Hi')
+        self.seeker_client.post('/api/matching/matches/read/', {'match_ids': [self.match.id]}, format='json')
+        response = self.sync(response.data['cursor'])
+        # The new message and the one that was just read, in the order they changed
+        self.assertEqual([message['id'] for message in response.data['results']], [reply.id, hello.id])
+        self.assertEqual(self.sync(response.data['cursor']).data['results'], [])
+        self.assertEqual(self.sync('bad').status_code, 400)
+
+    def test_unchanged_chat_answers_304(self):
+        create_message(self.match.id, self.recruiter.profile, 'Hello')
+        response = self.sync()
+        etag = response['ETag']
+        with CaptureQueriesContext(connection) as queries:
+            response = self.sync(response.data['cursor'], etag)
+        self.assertEqual((response.status_code, response['ETag']), (304, etag))
+        self.assertEqual(len(queries), 1)
+
+        create_message(self.match.id, self.recruiter.profile, 'News')
+        response = self.sync(etag=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_rest_update_is_synced(self):
+        hello = create_message(self.match.id, self.recruiter.profile, 'Hello')
+        response = self.sync()
+        cursor, etag = response.data['cursor'], response['ETag']
+        response = self.seeker_client.patch(f'/api/matching/messages/{hello.id}/?match_id={self.match.id}',
+                                            {'is_read': True}, format='json')
+        self.assertEqual(response.status_code, 200, response.data)
+        response = self.sync(cursor, etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual([(message['id'], message['is_read']) for message in response.data['results']],
+                         [(hello.id, True)])
+
+    def test_wait_returns_a_change_made_while_waiting(self):
+        response = self.sync()
+        # The first sleep of the long-poll loop stands in for another request sending a message
+        with mock.patch('matching.sync.time.sleep', side_effect=lambda seconds: create_message(
+            self.match.id, self.recruiter.profile, 'Hello',
+        )) as sleep:
+            response = self.sync(response.data['cursor'], response['ETag'], wait=3)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([message['content'] for message in response.data['results']], ['Hello'])
+        self.assertEqual(sleep.call_count, 1)
+
+    def test_wait_is_capped(self):
+        response = self.sync()
+        with mock.patch('matching.views.wait_for_change', return_value=False) as wait_for_change:
+            response = self.sync(response.data['cursor'], response['ETag'], wait=600)
+        self.assertEqual(response.status_code, 304)
+        wait_for_change.assert_called_once_with(self.match.id, 0, MAX_SYNC_WAIT)
+        self.assertEqual(self.sync(wait='soon').status_code, 400)
+
+
+class DeckRadiusTests(QueryBudgetMixin, TestCase):
+    def setUp(self):
+        self.recruiter = make_recruiter('recruiter')
+        for location, is_remote in [('Berlin', False), ('Hamburg', False), ('Paris', False), ('Remote', True)]:
+            Job.objects.create(recruiter=self.recruiter, title=location, description='d', requirements='r',
+                               location=location, is_remote=is_remote)
+        self.job_seeker = make_job_seeker('seeker')
+        self.job_seeker.profile.location = 'Berlin'
+        self.job_seeker.profile.save()
+        self.client = self.api_client(self.job_seeker.profile.user)
+
+    def deck(self, url='/api/matching/deck/', client=None, **params):
+        response = (client or self.client).get(url, params)
+        self.assertEqual(response.status_code, 200, response.data)
+        return response.data['results']
+
+    def test_job_deck_around_own_location(self):
+        titles = [job['title'] for job in self.deck(radius_km=300)]
+        self.assertEqual(sorted(titles), ['Berlin', 'Hamburg'])
+        titles = [job['title'] for job in self.deck(radius_km=300, include_remote='true')]
+        self.assertEqual(sorted(titles), ['Berlin', 'Hamburg', 'Remote'])
+        titles = [job['title'] for job in self.deck(near='Paris', radius_km=50)]
+        self.assertEqual(titles, ['Paris'])
+
+    def test_job_deck_needs_a_centre(self):
+        self.job_seeker.profile.location = 'Somewhere'
+        self.job_seeker.profile.save()
+        response = self.client.get('/api/matching/deck/', {'radius_km': 50})
+        self.assertEqual((response.status_code, response.data),
+                         (400, {'error': 'lat/lon or near is required with radius_km'}))
+
+    def test_candidate_deck_around_job(self):
+        job = Job.objects.get(title='Hamburg')
+        url = f'/api/matching/jobs/{job.id}/deck/'
+        client = self.api_client(self.recruiter.profile.user)
+        far = make_job_seeker('far')
+        far.profile.location = 'Paris'
+        far.profile.save()
+        ids = [candidate['id'] for candidate in self.deck(url, client, radius_km=300)]
+        self.assertEqual(ids, [self.job_seeker.id])
+        ids = [candidate['id'] for candidate in self.deck(url, client)]
+        self.assertEqual(sorted(ids), sorted([self.job_seeker.id, far.id]))
+
+
+class RecommendationTests(QueryBudgetMixin, TestCase):
+    def setUp(self):
+        self.recruiter = make_recruiter('recruiter')
+        self.jobs = {
+            title: Job.objects.create(recruiter=self.recruiter, title=title, description='d', requirements='r',
+                                      location='Remote')
+            for title in ['A1', 'A2', 'A3', 'B1', 'B2', 'B3']
+        }
+        # Two taste clusters; the newcomer has only liked A1
+        self.newcomer = make_job_seeker('newcomer')
+        self.swipe(self.newcomer, ['A1'])
+        for i in range(4):
+            self.swipe(make_job_seeker(f'a{i}'), ['A1', 'A2', 'A3'])
+        for i in range(4):
+            self.swipe(make_job_seeker(f'b{i}'), ['B1', 'B2', 'B3'])
+
+    def swipe(self, job_seeker, titles):
+        for title in titles:
+            SwipeAction.objects.create(profile=job_seeker.profile, job=self.jobs[title], direction='right')
+
+    def titles(self, client, **params):
+        data = client.get('/api/matching/deck/', params).data
+        return [job['title'] for job in data['results']], data['next_cursor']
+
+    def test_lists_follow_the_swipe_matrix(self):
+        run = build_recommendations(factors=2)
+        self.assertTrue(run.full)
+        recommended = JobRecommendations.objects.get(job_seeker=self.newcomer).ranked()[0]
+        # Swiped jobs are never recommended
+        self.assertEqual(set(recommended[:2].tolist()), {self.jobs['A2'].id, self.jobs['A3'].id})
+        self.assertNotIn(self.jobs['A1'].id, recommended)
+        candidates = CandidateRecommendations.objects.get(job=self.jobs['A2']).ranked()[0]
+        self.assertEqual(candidates[0], self.newcomer.id)
+
+    def test_incremental_refresh(self):
+        build_recommendations(factors=2)
+        late = make_job_seeker('late')
+        self.swipe(late, ['B1'])
+        run = build_recommendations(factors=2)
+        self.assertFalse(run.full)
+        # Only the new swiper and the job it touched are refreshed
+        self.assertEqual((run.seekers, run.jobs), (1, 1))
+        self.assertTrue(JobRecommendations.objects.filter(job_seeker=late).exists())
+
+    def test_job_deck_serves_recommendations_first(self):
+        client = self.api_client(self.newcomer.profile.user)
+        build_recommendations(factors=2)
+        titles, _ = self.titles(client, limit=2)
+        self.assertEqual(set(titles), {'A2', 'A3'})
+        # One card at a time: recommendations, then the scored deck, each job once
+        dealt, cursor = [], None
+        while True:
+            titles, cursor = self.titles(client, limit=1, **({'cursor': cursor} if cursor else {}))
+            dealt += titles
+            if cursor is None:
+                break
+        self.assertEqual(set(dealt[:2]), {'A2', 'A3'})
+        self.assertEqual(sorted(dealt), ['A2', 'A3', 'B1', 'B2', 'B3'])
+        # Stored list, dealable check and cards; more jobs don't reach the scorer
+        def grow():
+            for i in range(5):
+                Job.objects.create(recruiter=self.recruiter, title=f'C{i}', description='d', requirements='r')
+
+        self.assertQueryBudget(client, '/api/matching/deck/', 3, grow=grow, data={'limit': 2})
+
+    def test_job_deck_pages_past_the_pool(self):
+        build_recommendations(factors=2)
+        fresh = make_job_seeker('fresh')
+        for job_seeker, expected in [
+            (self.newcomer, ['A2', 'A3', 'B1', 'B2', 'B3']),
+            (fresh, ['A1', 'A2', 'A3', 'B1', 'B2', 'B3']),
+        ]:
+            client = self.api_client(job_seeker.profile.user)
+            for limit in (1, 2, 4):
+                with self.subTest(seeker=job_seeker.profile.user.username, limit=limit), \
+                        mock.patch('matching.deck.DECK_POOL_SIZE', 2):
+                    # Each pool holds two jobs; the cursor moves on to the next one
+                    dealt, cursor = [], None
+                    while True:
+                        titles, cursor = self.titles(client, limit=limit, **({'cursor': cursor} if cursor else {}))
+                        dealt += titles
+                        if cursor is None:
+                            break
+                    self.assertEqual(sorted(dealt), expected)
+
+    def test_candidate_deck_serves_recommendations_after_interested(self):
+        client = self.api_client(self.recruiter.profile.user)
+        build_recommendations(factors=2)
+        data = client.get(f'/api/matching/jobs/{self.jobs["A2"].id}/deck/', {'limit': 5}).data
+        # The four seekers who liked A2, then the newcomer ahead of the B cluster
+        self.assertEqual([candidate['interested'] for candidate in data['results']], [True] * 4 + [False])
+        self.assertEqual(data['results'][4]['id'], self.newcomer.id)
+        ids, cursor = [], None
+        while True:
+            params = {'limit': 2, **({'cursor': cursor} if cursor else {})}
+            data = client.get(f'/api/matching/jobs/{self.jobs["A2"].id}/deck/', params).data
+            ids += [candidate['id'] for candidate in data['results']]
+            cursor = data['next_cursor']
+            if cursor is None:
+                break
+        self.assertEqual(len(ids), len(set(ids)))
+        self.assertEqual(len(ids), 9)
+
+
+@override_settings(DECK_QUEUE={
+    'BACKEND': 'matching.deck_queue.LocalDeckQueue',
+    'OPTIONS': {'size': 6, 'low_water': 3, 'max_users': 2, 'background': False},
+})
+class DeckQueueTests(QueryBudgetMixin, TestCase):
+    def setUp(self):
+        self.recruiter = make_recruiter('recruiter')
+        for i in range(10):
+            Job.objects.create(recruiter=self.recruiter, title=f'Job {i}', description='d', requirements='r',
+                               location='Remote')
+        self.job_seeker = make_job_seeker('seeker')
+        self.client = self.api_client(self.job_seeker.profile.user)
+        # Queues outlive a test's rolled-back rows
+        reset_deck_queue()
+        self.queue = get_deck_queue()
+
+    def open_deck(self, limit=3):
+        with self.captureOnCommitCallbacks(execute=True):
+            data = self.client.get('/api/matching/deck/', {'limit': limit}).data
+        return [job['id'] for job in data['results']], data['next_cursor']
+
+    def queued(self):
+        return [job_id for job_id, _ in self.queue.get((JOB_DECK, self.job_seeker.id)) or []]
+
+    def test_first_open_fills_the_queue(self):
+        ids, cursor = self.open_deck()
+        self.assertEqual(self.queued()[:3], ids)
+        self.assertEqual(len(self.queued()), 6)
+        # Served from the queue: only the cards are loaded, and the cursor continues the deck
+        self.assertEqual(self.open_deck(), (ids, cursor))
+        self.assertQueryBudget(self.client, '/api/matching/deck/', 1, data={'limit': 3}, grow=lambda: None)
+        rest = self.client.get('/api/matching/deck/', {'limit': 10, 'cursor': cursor}).data['results']
+        self.assertEqual(len(set(ids) | {job['id'] for job in rest}), 10)
+
+    def test_swipes_pop_and_refill_below_low_water(self):
+        ids, _ = self.open_deck()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post('/api/matching/swipe/', {'job_id': ids[0], 'direction': 'left'}, format='json')
+        self.assertEqual(self.queued()[:2], ids[1:])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post('/api/matching/swipe/batch/', {'swipes': [
+                {'job_id': job_id, 'direction': 'left'} for job_id in self.queued()[:3]
+            ]}, format='json')
+        # Two cards left, below the low-water mark: refilled to six unswiped jobs
+        self.assertEqual(len(self.queued()), 6)
+        self.assertEqual(SwipeAction.objects.filter(job_id__in=self.queued()).count(), 0)
+
+    def test_deactivated_job_leaves_the_queue(self):
+        ids, _ = self.open_deck()
+        job = Job.objects.get(id=ids[0])
+        job.is_active = False
+        with self.captureOnCommitCallbacks(execute=True):
+            job.save()
+        self.assertNotIn(job.id, self.queued())
+        self.assertNotIn(job.id, self.open_deck()[0])
+
+    def test_stale_cards_are_not_served(self):
+        ids, _ = self.open_deck()
+        # Swiped without going through record_swipes, e.g. from another process
+        SwipeAction.objects.create(profile=self.job_seeker.profile, job_id=ids[0], direction='left')
+        self.assertNotIn(ids[0], self.open_deck()[0])
+
+    def test_least_recently_used_queue_is_evicted(self):
+        self.queue.put((JOB_DECK, 1), [(1, (1, 1))])
+        self.queue.put((JOB_DECK, 2), [(2, (1, 2))])
+        self.queue.get((JOB_DECK, 1))
+        self.queue.put((JOB_DECK, 3), [(3, (1, 3))])
+        self.assertIsNone(self.queue.get((JOB_DECK, 2)))
+        self.assertEqual(len(self.queue), 2)
+
+    def test_candidate_deck(self):
+        for i in range(4):
+            make_job_seeker(f'candidate{i}')
+        job = Job.objects.first()
+        client = self.api_client(self.recruiter.profile.user)
+        url = f'/api/matching/jobs/{job.id}/deck/'
+        with self.captureOnCommitCallbacks(execute=True):
+            first = client.get(url, {'limit': 2}).data
+        self.assertEqual([job_seeker_id for job_seeker_id, _ in self.queue.get((CANDIDATE_DECK, job.id))][:2],
+                         [candidate['id'] for candidate in first['results']])
+        self.assertEqual(client.get(url, {'limit': 2}).data, first)
+
+    def test_recruiter_swipe_leaves_every_job_deck(self):
+        for i in range(4):
+            make_job_seeker(f'candidate{i}')
+        backend, frontend = Job.objects.all()[:2]
+        client = self.api_client(self.recruiter.profile.user)
+        for job in [backend, frontend]:
+            with self.captureOnCommitCallbacks(execute=True):
+                client.get(f'/api/matching/jobs/{job.id}/deck/', {'limit': 2})
+        candidate_id = self.queue.get((CANDIDATE_DECK, backend.id))[0][0]
+        self.assertIn(candidate_id, [item_id for item_id, _ in self.queue.get((CANDIDATE_DECK, frontend.id))])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            client.post('/api/matching/swipe/', {
+                'job_id': backend.id, 'job_seeker_id': candidate_id, 'direction': 'left',
+            }, format='json')
+        for job in [backend, frontend]:
+            self.assertNotIn(candidate_id, [item_id for item_id, _ in self.queue.get((CANDIDATE_DECK, job.id))])
+            self.assertNotIn(candidate_id, [
+                candidate['id'] for candidate in client.get(f'/api/matching/jobs/{job.id}/deck/').data['results']
+            ])
+
+
+class JobFunnelTests(QueryBudgetMixin, TestCase):
+    def setUp(self):
+        reset_view_buffer()
+        self.recruiter = make_recruiter('recruiter')
+        self.job_seeker = make_job_seeker('seeker')
+        self.jobs = [
+            Job.objects.create(recruiter=self.recruiter, title=title, description='d', requirements='r')
+            for title in ['Backend', 'Frontend']
+        ]
+        self.seeker_client = self.api_client(self.job_seeker.profile.user)
+        self.recruiter_client = self.api_client(self.recruiter.profile.user)
+
+    def counters(self, job):
+        funnel = JobFunnel.objects.get(job=job)
+        return funnel.views, funnel.left_swipes, funnel.right_swipes, funnel.matches, funnel.applications
+
+    def swipe(self, client, *swipes):
+        response = client.post('/api/matching/swipe/batch/', {'swipes': list(swipes)}, format='json')
+        self.assertEqual(response.status_code, 200, response.data)
+
+    def test_counters_follow_writes(self):
+        backend, frontend = self.jobs
+        self.swipe(self.recruiter_client, {'job_id': backend.id, 'job_seeker_id': self.job_seeker.id, 'direction': 'right'})
+        self.swipe(self.seeker_client,
+                   {'job_id': backend.id, 'direction': 'right'}, {'job_id': frontend.id, 'direction': 'left'})
+        application = Application.objects.create(job=backend, job_seeker=self.job_seeker)
+
+        self.assertEqual(self.counters(backend), (0, 0, 1, 1, 1))
+        self.assertEqual(self.counters(frontend), (0, 1, 0, 0, 0))
+        application.delete()
+        self.assertEqual(self.counters(backend), (0, 0, 1, 1, 0))
+
+        # Jobs that predate their funnel row get one on their first count
+        JobFunnel.objects.filter(job=frontend).delete()
+        Application.objects.create(job=frontend, job_seeker=self.job_seeker)
+        self.assertEqual(self.counters(frontend), (0, 0, 0, 0, 1))
+
+    def test_deleting_a_job_with_applications(self):
+        backend, frontend = self.jobs
+        Application.objects.create(job=backend, job_seeker=self.job_seeker)
+        Application.objects.create(job=frontend, job_seeker=self.job_seeker)
+        backend.delete()
+        self.assertFalse(JobFunnel.objects.filter(job_id=backend.id).exists())
+        self.assertEqual(self.counters(frontend), (0, 0, 0, 0, 1))
+
+        # A decrement never creates a row
+        JobFunnel.objects.filter(job=frontend).delete()
+        Application.objects.get(job=frontend).delete()
+        self.assertFalse(JobFunnel.objects.filter(job=frontend).exists())
+
+    def test_deck_views_are_buffered(self):
+        response = self.seeker_client.get('/api/matching/deck/')
+        self.assertEqual(len(response.data['results']), 2)
+        self.assertEqual([self.counters(job)[0] for job in self.jobs], [0, 0])
+        get_view_buffer().flush()
+        self.assertEqual([self.counters(job)[0] for job in self.jobs], [1, 1])
+
+        buffer = ViewBuffer(threshold=3, background=False)
+        with self.captureOnCommitCallbacks(execute=True):
+            buffer.add([self.jobs[0].id, self.jobs[1].id])
+        self.assertEqual(self.counters(self.jobs[0])[0], 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            buffer.add([self.jobs[0].id])
+        self.assertEqual([self.counters(job)[0] for job in self.jobs], [3, 2])
+        self.assertEqual(len(buffer), 0)
+
+    def test_reconcile_rebuilds_from_source(self):
+        backend, frontend = self.jobs
+        SwipeAction.objects.bulk_create([SwipeAction(profile=self.job_seeker.profile, job=backend, direction='right')])
+        Match.objects.bulk_create([Match(job=backend, job_seeker=self.job_seeker)])
+        JobFunnel.objects.filter(job=backend).delete()
+        JobFunnel.objects.filter(job=frontend).update(views=7, left_swipes=4)
+
+        self.assertEqual(reconcile_funnels(batch_size=1), 2)
+        self.assertEqual(self.counters(backend), (0, 0, 1, 1, 0))
+        # Views have no source rows and are kept
+        self.assertEqual(self.counters(frontend), (7, 0, 0, 0, 0))
+
+    def test_dashboard(self):
+        backend, _ = self.jobs
+        JobFunnel.objects.filter(job=backend).update(views=10, left_swipes=3, right_swipes=1, matches=1)
+        response = self.recruiter_client.get('/api/matching/jobs/funnel/')
+        self.assertEqual(response.status_code, 200, response.data)
+        by_title = {job['title']: job for job in response.data['jobs']}
+        self.assertEqual(by_title['Backend']['swipe_rate'], 0.4)
+        self.assertEqual(by_title['Backend']['match_rate'], 1.0)
+        self.assertEqual(by_title['Frontend']['views'], 0)
+        self.assertIsNone(by_title['Frontend']['swipe_rate'])
+        self.assertEqual(response.data['totals']['left_swipes'], 3)
+        self.assertEqual(self.seeker_client.get('/api/matching/jobs/funnel/').status_code, 404)
+
+        def grow():
+            for title in ['Data', 'Mobile']:
+                job = Job.objects.create(recruiter=self.recruiter, title=title, description='d', requirements='r')
+                JobFunnel.objects.filter(job=job).update(views=5)
+
+        self.assertQueryBudget(self.recruiter_client, '/api/matching/jobs/funnel/', 1, grow)
+
+
+@override_settings(TASK_QUEUE={'BACKEND': 'tasks.brokers.ThreadPoolBroker', 'OPTIONS': {'background': False}})
+class NotificationTaskTests(QueryBudgetMixin, TestCase):
+    def setUp(self):
+        self.recruiter = make_recruiter('recruiter')
+        self.job_seeker = make_job_seeker('seeker')
+        for user in (self.recruiter.profile.user, self.job_seeker.profile.user):
+            user.email = f'{user.username}@example.com'
+            user.save()
+        self.job = Job.objects.create(recruiter=self.recruiter, title='Backend', description='d', requirements='r')
+        # Committed swipes reach the process-wide right-swipe index; don't leak them into other tests
+        self.addCleanup(reset_right_swipe_index)
+        self.addCleanup(reset_deck_queue)
+        # As do pending unread-notice markers
+        caches['default'].clear()
+        self.addCleanup(caches['default'].clear)
+
+    def test_match_emails_both_sides_after_commit(self):
+        client = self.api_client(self.job_seeker.profile.user)
+        SwipeAction.objects.create(profile=self.recruiter.profile, candidate=self.job_seeker, direction='right')
+        with self.captureOnCommitCallbacks(execute=True):
+            response = client.post('/api/matching/swipe/', {'job_id': self.job.id, 'direction': 'right'}, format='json')
+            self.assertTrue(response.data['matched'])
+            self.assertEqual(mail.outbox, [])
+        self.assertEqual(sorted(email.to[0] for email in mail.outbox), ['recruiter@example.com', 'seeker@example.com'])
+
+    def test_unread_message_notice(self):
+        match = Match.objects.create(job=self.job, job_seeker=self.job_seeker)
+        with self.captureOnCommitCallbacks(execute=True):
+            create_message(match.id, self.recruiter.profile, 'Hello')
+        notices = [email for email in mail.outbox if email.subject.startswith('New message')]
+        self.assertEqual([email.to for email in notices], [['seeker@example.com']])
+
+    @override_settings(TASK_QUEUE={'BACKEND': 'tasks.brokers.DatabaseBroker'})
+    def test_unread_notices_are_coalesced(self):
+        match = Match.objects.create(job=self.job, job_seeker=self.job_seeker)
+        notices = Task.objects.filter(name='matching.tasks.notify_unread_messages')
+        with self.captureOnCommitCallbacks(execute=True):
+            for content in ['Hello', 'Are you there?', 'Call me']:
+                create_message(match.id, self.recruiter.profile, content)
+            create_message(match.id, self.job_seeker.profile, 'Hi')
+        # One pending notice per recipient, however many messages arrive meanwhile
+        self.assertEqual(
+            sorted(notices.values_list('args', flat=True)),
+            [[match.id, self.recruiter.profile.id], [match.id, self.job_seeker.profile.id]],
+        )
+
+        mail.outbox.clear()
+        for task in notices:
+            run_message({'name': task.name, 'args': task.args, 'kwargs': task.kwargs})
+        self.assertEqual(sorted((email.to[0], email.subject) for email in mail.outbox), [
+            ('recruiter@example.com', 'New message about Backend'),
+            ('seeker@example.com', '3 new messages about Backend'),
+        ])
+
+        # Once a notice has run, the next message schedules a new one
+        notices.delete()
+        with self.captureOnCommitCallbacks(execute=True):
+            create_message(match.id, self.recruiter.profile, 'Hello again')
+        self.assertEqual(notices.count(), 1)
+        # Nothing is sent for messages read in the meantime
+        mail.outbox.clear()
+        Message.objects.filter(match=match).update(is_read=True)
+        run_message({'name': notices[0].name, 'args': notices[0].args, 'kwargs': {}})
+        self.assertEqual(mail.outbox, [])
+
+
+class SwipeArchiveTests(QueryBudgetMixin, TestCase):
+    def setUp(self):
+        reset_deck_queue()
+        self.recruiter = make_recruiter('recruiter')
+        self.job_seeker = make_job_seeker('seeker')
+        self.other_seeker = make_job_seeker('other')
+        self.jobs = {
+            title: Job.objects.create(recruiter=self.recruiter, title=title, description='d', requirements='r')
+            for title in ['Old pass', 'Closed', 'Liked', 'Fresh']
+        }
+        seeker = self.job_seeker.profile
+        SwipeAction.objects.bulk_create([
+            SwipeAction(profile=seeker, job=self.jobs['Old pass'], direction='left'),
+            SwipeAction(profile=seeker, job=self.jobs['Closed'], direction='left'),
+            SwipeAction(profile=seeker, job=self.jobs['Liked'], direction='right'),
+            SwipeAction(profile=self.recruiter.profile, candidate=self.other_seeker, direction='left'),
+        ])
+        Job.objects.filter(id=self.jobs['Closed'].id).update(is_active=False)
+        long_ago = timezone.now() - timedelta(days=200)
+        SwipeAction.objects.exclude(job=self.jobs['Closed']).update(created_at=long_ago)
+        self.seeker_client = self.api_client(self.job_seeker.profile.user)
+        self.recruiter_client = self.api_client(self.recruiter.profile.user)
+
+    def test_archived_swipes_leave_the_hot_table(self):
+        self.assertEqual(archive_swipes(batch_size=2), 3)
+        # Right swipes stay for match detection
+        self.assertEqual(list(SwipeAction.objects.values_list('job__title', 'direction')), [('Liked', 'right')])
+        seeker_archive = SwipeArchive.objects.get(profile=self.job_seeker.profile, kind=SwipeArchive.JOB)
+        self.assertEqual(sorted(seeker_archive.ids()), sorted([self.jobs['Old pass'].id, self.jobs['Closed'].id]))
+        self.assertEqual(SwipeRollup.objects.get(job=self.jobs['Old pass']).left_swipes, 1)
+
+        # Later archival runs merge into the same rows
+        SwipeAction.objects.create(profile=self.job_seeker.profile, job=self.jobs['Fresh'], direction='left')
+        SwipeAction.objects.filter(job=self.jobs['Fresh']).update(created_at=timezone.now() - timedelta(days=100))
+        self.assertEqual(archive_swipes(), 1)
+        self.assertEqual(len(SwipeArchive.objects.get(pk=seeker_archive.pk).ids()), 3)
+
+    def test_decks_and_matching_stay_correct(self):
+        archive_swipes()
+        response = self.seeker_client.get('/api/matching/deck/')
+        self.assertEqual([job['title'] for job in response.data['results']], ['Fresh'])
+        response = self.seeker_client.post(
+            '/api/matching/swipe/', {'job_id': self.jobs['Old pass'].id, 'direction': 'right'}, format='json'
+        )
+        self.assertEqual(response.status_code, 409)
+
+        liked = self.jobs['Liked']
+        response = self.recruiter_client.get(f'/api/matching/jobs/{liked.id}/deck/')
+        self.assertEqual([candidate['id'] for candidate in response.data['results']], [self.job_seeker.id])
+        response = self.recruiter_client.post('/api/matching/swipe/', {
+            'job_id': liked.id, 'job_seeker_id': self.job_seeker.id, 'direction': 'right',
+        }, format='json')
+        self.assertTrue(response.data['matched'])
+        response = self.recruiter_client.post('/api/matching/swipe/', {
+            'job_id': liked.id, 'job_seeker_id': self.other_seeker.id, 'direction': 'right',
+        }, format='json')
+        self.assertEqual(response.status_code, 409)
+
+    def test_funnels_keep_archived_swipes(self):
+        archive_swipes()
+        reconcile_funnels()
+        self.assertEqual(JobFunnel.objects.get(job=self.jobs['Old pass']).left_swipes, 1)
+        self.assertEqual(JobFunnel.objects.get(job=self.jobs['Liked']).right_swipes, 1)
+
+    def test_deck_budgets_hold_with_an_archive(self):
+        archive_swipes()
+
+        def grow():
+            for index in range(3):
+                Job.objects.create(recruiter=self.recruiter, title=f'Extra {index}', description='d', requirements='r')
+
+        self.assertQueryBudget(self.seeker_client, '/api/matching/deck/', 5, grow)
+
+    def test_archived_candidates_crowding_a_page_are_skipped(self):
+        fresh = make_job_seeker('fresh')
+        # Passed on long ago, and newer than `fresh`, so they fill the first keyset batches
+        passed = [make_job_seeker(f'passed{index}') for index in range(5)]
+        SwipeAction.objects.bulk_create([
+            SwipeAction(profile=self.recruiter.profile, candidate=seeker, direction='left') for seeker in passed
+        ])
+        SwipeAction.objects.filter(candidate__in=passed).update(created_at=timezone.now() - timedelta(days=200))
+        archive_swipes()
+
+        url = f'/api/matching/jobs/{self.jobs["Liked"].id}/deck/'
+        response = self.recruiter_client.get(url, {'limit': 2})
+        self.assertEqual([candidate['id'] for candidate in response.data['results']], [self.job_seeker.id, fresh.id])
+        self.assertIsNone(response.data['next_cursor'])
+
+
+class ChatConsumerTests(TransactionTestCase):
+    # Consumers reach the database from worker threads, so rows must be committed
+    def setUp(self):
+        self.recruiter = make_recruiter('recruiter')
+        self.job_seeker = make_job_seeker('seeker')
+        job = Job.objects.create(recruiter=self.recruiter, title='Job', description='d', requirements='r')
+        self.match = Match.objects.create(job=job, job_seeker=self.job_seeker)
+        self.path = f'/ws/matches/{self.match.id}/'
+
+    def token(self, profile):
+        return Token.objects.get_or_create(user=profile.user)[0].key
+
+    async def connect(self, token=None, header=False):
+        if header:
+            communicator = WebsocketCommunicator(application, self.path, headers=[(b'authorization', f'Token {token}'.encode())])
+        else:
+            communicator = WebsocketCommunicator(application, self.path + (f'?token={token}' if token else ''))
+        connected, code = await communicator.connect()
+        return communicator, connected, code
+
+    async def connect_both(self):
+        seeker, connected, _ = await self.connect(await database_sync_to_async(self.token)(self.job_seeker.profile))
+        self.assertTrue(connected)
+        recruiter, connected, _ = await self.connect(
+            await database_sync_to_async(self.token)(self.recruiter.profile), header=True,
+        )
+        self.assertTrue(connected)
+        return seeker, recruiter
+
+    async def test_rejects_missing_and_unknown_tokens(self):
+        for token in [None, 'not-a-token']:
+            communicator, connected, code = await self.connect(token)
+            self.assertFalse(connected)
+            self.assertEqual(code, 4401)
+
+    async def test_rejects_non_members(self):
+        outsider = await database_sync_to_async(make_job_seeker)('outsider')
+        communicator, connected, code = await self.connect(await database_sync_to_async(self.token)(outsider.profile))
+        self.assertFalse(connected)
+        self.assertEqual(code, 4403)
+
+    async def test_messages_reach_both_sides(self):
+        seeker, recruiter = await self.connect_both()
+        await seeker.send_json_to({'type': 'message', 'content': 'Hello'})
+        for communicator in (seeker, recruiter):
+            event = await communicator.receive_json_from()
+            self.assertEqual(event['type'], 'message')
+            self.assertEqual(event['message']['content'], 'Hello')
+            self.assertEqual(event['message']['sender']['id'], self.job_seeker.profile.id)
+        self.assertTrue(await database_sync_to_async(Message.objects.filter(match=self.match, content='Hello').exists)())
+
+        # Messages written over REST are pushed too
+        await database_sync_to_async(create_message)(self.match.id, self.recruiter.profile, 'Over REST')
+        self.assertEqual((await seeker.receive_json_from())['message']['content'], 'Over REST')
+        self.assertEqual((await recruiter.receive_json_from())['message']['content'], 'Over REST')
+
+        await seeker.send_json_to({'type': 'message', 'content': '  '})
+        self.assertEqual(await seeker.receive_json_from(), {'type': 'error', 'error': 'Invalid message content'})
+        await seeker.send_json_to({'type': 'typing'})
+        self.assertEqual(await seeker.receive_json_from(), {'type': 'error', 'error': 'Unknown message type'})
+        self.assertTrue(await recruiter.receive_nothing())
+        await seeker.disconnect()
+        await recruiter.disconnect()
+
+    async def test_read_receipts_fan_out(self):
+        message = await database_sync_to_async(create_message)(self.match.id, self.recruiter.profile, 'Hi')
+        seeker, recruiter = await self.connect_both()
+        await seeker.send_json_to({'type': 'read'})
+        expected = {'type': 'read', 'reader_id': self.job_seeker.profile.id, 'message_ids': [message.id]}
+        self.assertEqual(await seeker.receive_json_from(), expected)
+        self.assertEqual(await recruiter.receive_json_from(), expected)
+        # Nothing left unread: no second receipt
+        await seeker.send_json_to({'type': 'read'})
+        self.assertTrue(await recruiter.receive_nothing())
+        await seeker.disconnect()
+        await recruiter.disconnect()
+
+
+class SwipeConstraintTests(QueryBudgetMixin, TestCase):
+    def setUp(self):
+        self.addCleanup(reset_right_swipe_index)
+        self.recruiter = make_recruiter('recruiter')
+        self.job_seeker = make_job_seeker('seeker')
+        self.backend, self.frontend = [
+            Job.objects.create(recruiter=self.recruiter, title=title, description='d', requirements='r')
+            for title in ['Backend', 'Frontend']
+        ]
+        self.seeker_client = self.api_client(self.job_seeker.profile.user)
+        self.recruiter_client = self.api_client(self.recruiter.profile.user)
+
+    def seeker_swipe(self, job, direction):
+        return self.seeker_client.post('/api/matching/swipe/', {'job_id': job.id, 'direction': direction}, format='json')
+
+    def recruiter_swipe(self, job, direction, client=None):
+        return (client or self.recruiter_client).post('/api/matching/swipe/', {
+            'job_id': job.id, 'job_seeker_id': self.job_seeker.id, 'direction': direction,
+        }, format='json')
+
+    def test_seeker_swipes_once_per_job(self):
+        self.assertEqual(self.seeker_swipe(self.backend, 'left').status_code, 200)
+        response = self.seeker_swipe(self.backend, 'right')
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data['error'], 'Already swiped')
+        self.assertEqual(self.seeker_swipe(self.frontend, 'right').status_code, 200)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            SwipeAction.objects.create(profile=self.job_seeker.profile, job=self.backend, direction='right')
+
+    def test_recruiter_decides_once_per_candidate(self):
+        self.assertEqual(self.recruiter_swipe(self.backend, 'left').status_code, 200)
+        # The decision covers all of the recruiter's jobs
+        response = self.recruiter_swipe(self.frontend, 'right')
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data['error'], 'Already swiped')
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            SwipeAction.objects.create(profile=self.recruiter.profile, candidate=self.job_seeker, direction='right')
+        # Other recruiters decide for themselves
+        other = make_recruiter('other')
+        other_job = Job.objects.create(recruiter=other, title='Other', description='d', requirements='r')
+        self.assertEqual(self.recruiter_swipe(other_job, 'right', self.api_client(other.profile.user)).status_code, 200)
+
+    def test_recruiter_right_swipe_covers_all_their_jobs(self):
+        self.assertFalse(self.recruiter_swipe(self.backend, 'right').data['matched'])
+        self.assertTrue(self.seeker_swipe(self.frontend, 'right').data['matched'])
+        self.assertTrue(Match.objects.filter(job=self.frontend, job_seeker=self.job_seeker).exists())
+        self.assertFalse(Match.objects.filter(job=self.backend).exists())
+
+
+class SwipeBatchTests(QueryBudgetMixin, TestCase):
+    url = '/api/matching/swipe/batch/'
+
+    def setUp(self):
+        self.addCleanup(reset_right_swipe_index)
+        self.recruiter = make_recruiter('recruiter')
+        self.job_seeker = make_job_seeker('seeker')
+        self.jobs = [
+            Job.objects.create(recruiter=self.recruiter, title=title, description='d', requirements='r')
+            for title in ['Backend', 'Frontend', 'Data']
+        ]
+        self.seeker_client = self.api_client(self.job_seeker.profile.user)
+        self.recruiter_client = self.api_client(self.recruiter.profile.user)
+
+    def post(self, client, swipes):
+        return client.post(self.url, {'swipes': swipes}, format='json')
+
+    def recruiter_likes(self, job):
+        self.post(self.recruiter_client, [{'job_id': job.id, 'job_seeker_id': self.job_seeker.id, 'direction': 'right'}])
+
+    def test_valid_items_are_recorded_around_invalid_ones(self):
+        backend, frontend, data = self.jobs
+        response = self.post(self.seeker_client, [
+            {'job_id': backend.id, 'direction': 'right'},
+            {'job_id': frontend.id, 'direction': 'up'},
+            {'direction': 'left'},
+            {'job_id': 999999, 'direction': 'left'},
+            {'job_id': backend.id, 'direction': 'left'},
+            {'job_id': data.id, 'direction': 'left'},
+        ])
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(
+            [(result['index'], result['recorded'], result.get('error')) for result in response.data['results']],
+            [
+                (0, True, None),
+                (1, False, 'Invalid direction'),
+                (2, False, 'Job ID required'),
+                (3, False, 'Job not found'),
+                # A repeat within the batch is rejected like one already stored
+                (4, False, 'Already swiped'),
+                (5, True, None),
+            ],
+        )
+        self.assertEqual(
+            dict(SwipeAction.objects.filter(profile=self.job_seeker.profile).values_list('job_id', 'direction')),
+            {backend.id: 'right', data.id: 'left'},
+        )
+        response = self.post(self.seeker_client, [{'job_id': data.id, 'direction': 'right'}])
+        self.assertEqual(response.data['results'][0]['error'], 'Already swiped')
+
+    def test_recruiter_items_need_a_known_candidate_and_job(self):
+        backend = self.jobs[0]
+        response = self.post(self.recruiter_client, [
+            {'job_id': backend.id, 'direction': 'right'},
+            {'job_id': backend.id, 'job_seeker_id': 999999, 'direction': 'right'},
+            {'job_id': 999999, 'job_seeker_id': self.job_seeker.id, 'direction': 'right'},
+            {'job_id': backend.id, 'job_seeker_id': self.job_seeker.id, 'direction': 'right'},
+        ])
+        self.assertEqual(
+            [result.get('error') for result in response.data['results']],
+            ['Job seeker ID and Job ID required', 'Job seeker not found', 'Job not found', None],
+        )
+        self.assertEqual(response.data['matches'], [])
+
+    def test_recruiter_swipes_only_for_their_own_jobs(self):
+        other_job = Job.objects.create(
+            recruiter=make_recruiter('other'), title='Other', description='d', requirements='r',
+        )
+        self.post(self.seeker_client, [{'job_id': other_job.id, 'direction': 'right'}])
+        response = self.post(self.recruiter_client, [
+            {'job_id': other_job.id, 'job_seeker_id': self.job_seeker.id, 'direction': 'right'},
+        ])
+        self.assertEqual(response.data['results'][0]['error'], 'Invalid job')
+        self.assertEqual(response.data['matches'], [])
+        self.assertFalse(SwipeAction.objects.filter(profile=self.recruiter.profile).exists())
+        self.assertFalse(Match.objects.exists())
+        response = self.recruiter_client.post('/api/matching/swipe/', {
+            'job_id': other_job.id, 'job_seeker_id': self.job_seeker.id, 'direction': 'right',
+        }, format='json')
+        self.assertEqual((response.status_code, response.data['error']), (403, 'Invalid job'))
+
+    def test_only_the_swipe_completing_a_pair_reports_the_match(self):
+        backend, frontend, data = self.jobs
+        self.recruiter_likes(backend)
+        # Already matched before this batch: completing the pair again is not a new match
+        Match.objects.create(job=data, job_seeker=self.job_seeker)
+        response = self.post(self.seeker_client, [
+            {'job_id': backend.id, 'direction': 'right'},
+            {'job_id': frontend.id, 'direction': 'right'},
+            {'job_id': data.id, 'direction': 'right'},
+        ])
+        self.assertEqual([result['matched'] for result in response.data['results']], [True, True, False])
+        self.assertEqual(response.data['matches'], [
+            {'job_id': backend.id, 'job_seeker_id': self.job_seeker.id},
+            {'job_id': frontend.id, 'job_seeker_id': self.job_seeker.id},
+        ])
+        self.assertEqual(Match.objects.filter(job_seeker=self.job_seeker).count(), 3)
+
+    def test_left_swipe_on_a_liked_job_does_not_match(self):
+        backend = self.jobs[0]
+        self.recruiter_likes(backend)
+        response = self.post(self.seeker_client, [{'job_id': backend.id, 'direction': 'left'}])
+        self.assertEqual((response.data['results'][0]['matched'], response.data['matches']), (False, []))
+        self.assertFalse(Match.objects.exists())
+
+    def test_swipe_lost_to_a_concurrent_request(self):
+        backend, frontend, _ = self.jobs
+        self.recruiter_likes(backend)
+        lookup = swipes.seeker_reciprocal_pairs
+
+        def concurrent_pass(job_seeker, pending):
+            # Another request stores a left swipe on the same job after this one checked
+            SwipeAction.objects.create(profile=self.job_seeker.profile, job=backend, direction='left')
+            return lookup(job_seeker, pending)
+
+        with mock.patch('matching.swipes.seeker_reciprocal_pairs', side_effect=concurrent_pass):
+            response = self.post(self.seeker_client, [
+                {'job_id': backend.id, 'direction': 'right'},
+                {'job_id': frontend.id, 'direction': 'right'},
+            ])
+        self.assertEqual(
+            [(result['recorded'], result['matched'], result.get('error')) for result in response.data['results']],
+            # The recruiter's like covers all of their jobs, so the stored swipe still matches
+            [(False, False, 'Already swiped'), (True, True, None)],
+        )
+        self.assertEqual(response.data['matches'], [{'job_id': frontend.id, 'job_seeker_id': self.job_seeker.id}])
+        self.assertEqual(list(Match.objects.values_list('job_id', flat=True)), [frontend.id])
+        self.assertEqual(SwipeAction.objects.get(profile=self.job_seeker.profile, job=backend).direction, 'left')
+        # Only the stored swipes are counted
+        funnel = JobFunnel.objects.get(job=backend)
+        self.assertEqual((funnel.left_swipes, funnel.right_swipes, funnel.matches), (1, 0, 0))
+        funnel = JobFunnel.objects.get(job=frontend)
+        self.assertEqual((funnel.right_swipes, funnel.matches), (1, 1))
+
+    def test_matches_created_meanwhile_are_not_reported(self):
+        backend, frontend, _ = self.jobs
+        Match.objects.create(job=backend, job_seeker=self.job_seeker)
+        created = insert_new(Match, [Match(job=backend, job_seeker=self.job_seeker),
+                                     Match(job=frontend, job_seeker=self.job_seeker)])
+        self.assertEqual([match.job_id for match in created], [frontend.id])
+        self.assertEqual(create_matches({(backend.id, self.job_seeker.id), (frontend.id, self.job_seeker.id)}), set())
+        self.assertEqual(Match.objects.count(), 2)
+
+    def test_batch_size_and_shape(self):
+        swipes = [{'job_id': self.jobs[0].id, 'direction': 'left'}] * (MAX_SWIPE_BATCH + 1)
+        response = self.post(self.seeker_client, swipes)
+        self.assertEqual((response.status_code, response.data),
+                         (400, {'error': f'At most {MAX_SWIPE_BATCH} swipes per batch'}))
+        self.assertFalse(SwipeAction.objects.exists())
+        for body in [{}, {'swipes': 'all'}, {'swipes': [1, 2]}]:
+            response = self.seeker_client.post(self.url, body, format='json')
+            self.assertEqual((response.status_code, response.data), (400, {'error': 'A list of swipes is required'}))
+        self.assertEqual(self.post(self.seeker_client, swipes[:MAX_SWIPE_BATCH]).status_code, 200)
+
+
+class RightSwipeIndexTests(QueryBudgetMixin, TestCase):
+    def setUp(self):
+        recruiter = make_recruiter('recruiter')
+        self.job_seeker = make_job_seeker('seeker')
+        self.job = Job.objects.create(recruiter=recruiter, title='Job', description='d', requirements='r')
+        self.key = (JOB, self.job_seeker.profile_id, self.job.id)
+        self.candidate_key = (CANDIDATE, recruiter.profile_id, self.job_seeker.id)
+
+    def indexes(self):
+        # Two of each backend, standing in for two worker processes
+        cache_options = {'key_prefix': f'right-swipe-test-{self.id()}', 'warm_limit': 0}
+        return [
+            (LocalRightSwipeIndex(warm_limit=0), LocalRightSwipeIndex(warm_limit=0)),
+            (CacheRightSwipeIndex(**cache_options), CacheRightSwipeIndex(**cache_options)),
+        ]
+
+    def swipe_elsewhere(self, direction='right'):
+        # A swipe written without this process seeing it (bulk_create sends no signals)
+        return SwipeAction.objects.bulk_create([
+            SwipeAction(profile=self.job_seeker.profile, job=self.job, direction=direction)
+        ])[0]
+
+    def test_hit_and_miss(self):
+        for index, _ in self.indexes():
+            with self.subTest(index=type(index).__name__):
+                SwipeAction.objects.all().delete()
+                with self.assertNumQueries(2):
+                    self.assertEqual(index.swiped_right([self.key, self.candidate_key]), set())
+                swipe = self.swipe_elsewhere()
+                with self.assertNumQueries(1):
+                    self.assertEqual(index.swiped_right([self.key]), {self.key})
+                # Found right swipes are remembered
+                with self.assertNumQueries(0):
+                    self.assertEqual(index.swiped_right([self.key]), {self.key})
+                index.forget([swipe])
+                swipe.delete()
+                with self.assertNumQueries(1):
+                    self.assertEqual(index.swiped_right([self.key]), set())
+
+    def test_left_swipes_are_not_right_swipes(self):
+        index = LocalRightSwipeIndex(warm_limit=0)
+        swipe = self.swipe_elsewhere('left')
+        index.record([swipe])
+        self.assertEqual(index.swiped_right([key_for(swipe)]), set())
+
+    def test_right_swipe_recorded_by_another_process(self):
+        for index, other in self.indexes():
+            with self.subTest(index=type(index).__name__):
+                SwipeAction.objects.all().delete()
+                self.assertEqual(index.swiped_right([self.key]), set())
+                # The other worker records the swipe; this one never hears of it
+                other.record([self.swipe_elsewhere()])
+                self.assertEqual(index.swiped_right([self.key]), {self.key})
+
+    def test_right_swipe_recorded_during_a_lookup(self):
+        for index, _ in self.indexes():
+            with self.subTest(index=type(index).__name__):
+                SwipeAction.objects.all().delete()
+
+                def load_before_the_swipe_commits(keys):
+                    # The SQL read misses, then the swipe commits and is recorded
+                    index.record([SwipeAction(profile=self.job_seeker.profile, job=self.job, direction='right')])
+                    return set()
+
+                with mock.patch.object(right_swipes, 'load_right_swipes', load_before_the_swipe_commits):
+                    self.assertEqual(index.swiped_right([self.key]), set())
+                with self.assertNumQueries(0):
+                    self.assertEqual(index.swiped_right([self.key]), {self.key})
+
+    def test_swipe_lost_to_a_concurrent_request_is_not_indexed(self):
+        self.addCleanup(reset_right_swipe_index)
+        lookup = swipes.seeker_reciprocal_pairs
+
+        def concurrent_pass(job_seeker, pending):
+            # Another request stores a left swipe on the same job after this one checked
+            SwipeAction.objects.create(profile=self.job_seeker.profile, job=self.job, direction='left')
+            return lookup(job_seeker, pending)
+
+        client = self.api_client(self.job_seeker.profile.user)
+        with mock.patch('matching.swipes.seeker_reciprocal_pairs', side_effect=concurrent_pass), \
+                self.captureOnCommitCallbacks(execute=True):
+            response = client.post('/api/matching/swipe/', {'job_id': self.job.id, 'direction': 'right'}, format='json')
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(get_right_swipe_index().get_many([self.key]), {})
+        self.assertEqual(get_right_swipe_index().swiped_right([self.key]), set())
+
+    def test_reciprocal_swipe_after_a_miss_matches(self):
+        # on_commit callbacks don't run in TestCase, so nothing below is recorded in the
+        # index: each swipe looks to the others as if made by another worker
+        self.addCleanup(reset_right_swipe_index)
+        recruiter = self.job.recruiter
+        other_job = Job.objects.create(recruiter=recruiter, title='Other', description='d', requirements='r')
+        seeker_client = self.api_client(self.job_seeker.profile.user)
+        recruiter_client = self.api_client(recruiter.profile.user)
+
+        # The seeker likes a job first: the recruiter's side is looked up and missing
+        response = seeker_client.post('/api/matching/swipe/', {'job_id': self.job.id, 'direction': 'right'}, format='json')
+        self.assertFalse(response.data['matched'])
+        response = recruiter_client.post('/api/matching/swipe/', {
+            'job_id': other_job.id, 'job_seeker_id': self.job_seeker.id, 'direction': 'right',
+        }, format='json')
+        self.assertEqual(response.status_code, 200, response.data)
+        response = seeker_client.post('/api/matching/swipe/', {'job_id': other_job.id, 'direction': 'right'}, format='json')
+        self.assertTrue(response.data['matched'])
+
+
+class ScoringTests(SimpleTestCase):
+    def job(self, job_id, level, salary_max, is_remote, location, latitude=None, longitude=None):
+        return {'id': job_id, 'experience_level': level, 'salary_max': salary_max, 'is_remote': is_remote,
+                'location': location, 'latitude': latitude, 'longitude': longitude}
+
+    def setUp(self):
+        self.jobs = JobFeatures([
+            self.job(10, 'mid', 120000, False, ' berlin ', 52.52, 13.405),
+            self.job(11, 'executive', 50000, False, 'Paris', 48.857, 2.352),
+            self.job(12, 'entry', None, True, ''),
+        ], [(10, 1), (10, 2), (11, 1), (11, 3), (11, 4), (11, 5)])
+        self.seekers = SeekerFeatures([
+            {'id': 1, 'experience_years': 4, 'desired_salary': 100000, 'profile__location': 'Berlin'},
+            {'id': 2, 'experience_years': None, 'desired_salary': None, 'profile__location': ''},
+        ], [(1, 1), (1, 2)])
+
+    def test_components(self):
+        # Share of required skills covered; neutral when either side lists none
+        np.testing.assert_allclose(skill_fit([2, 1, 0, 0], [2, 4, 0, 3], [2, 2, 2, 0]), [1.0, 0.25, NEUTRAL, NEUTRAL])
+        # Linear in the distance between experience levels
+        np.testing.assert_allclose(experience_fit([1, 3, 0], 1), [1.0, 1 / 3, 2 / 3])
+        # Meeting the ask fits fully, less tapers, and a missing figure on either side is neutral
+        np.testing.assert_allclose(
+            salary_fit([120000, 50000, np.nan, 80000], [100000, 100000, 100000, np.nan]), [1.0, 0.5, NEUTRAL, NEUTRAL]
+        )
+        # Remote jobs fit anywhere; otherwise the same (normalized) place, never a blank one
+        np.testing.assert_allclose(
+            location_fit(['berlin', 'paris', '', ''], [False, False, True, False], ['berlin', 'berlin', '', '']),
+            [1.0, 0.0, 1.0, 0.0],
+        )
+
+    def test_score_jobs(self):
+        expected = [
+            1.0,
+            WEIGHTS['skills'] * 0.25 + WEIGHTS['experience'] / 3 + WEIGHTS['salary'] * 0.5,
+            (WEIGHTS['skills'] * NEUTRAL + WEIGHTS['experience'] * 2 / 3 + WEIGHTS['salary'] * NEUTRAL
+             + WEIGHTS['location']),
+        ]
+        np.testing.assert_allclose(score_jobs(self.seekers, 0, self.jobs), expected)
+
+    def test_profile_without_details_scores_neutral(self):
+        # No skills and no salary: neutral; an entry-level seeker; no location, so only remote jobs fit
+        scores = score_jobs(self.seekers, 1, self.jobs)
+        neutral = WEIGHTS['skills'] * NEUTRAL + WEIGHTS['salary'] * NEUTRAL
+        np.testing.assert_allclose(scores, [
+            neutral + WEIGHTS['experience'] * 2 / 3,
+            neutral,
+            neutral + WEIGHTS['experience'] + WEIGHTS['location'],
+        ])
+
+    def test_proximity_replaces_place_names(self):
+        near = Near(52.52, 13.405, 100)
+        local = score_jobs(self.seekers, 0, self.jobs)
+        scores = score_jobs(self.seekers, 0, self.jobs, near)
+        # At the centre and remote: full location fit as before; Paris is outside the radius
+        np.testing.assert_allclose(scores, local)
+        # Halfway to the edge of the radius: half the location fit
+        halfway = self.job(13, 'mid', 120000, False, 'Potsdam', 52.52 + 50 / 111.32, 13.405)
+        moved = JobFeatures([halfway], [(13, 1), (13, 2)])
+        np.testing.assert_allclose(score_jobs(self.seekers, 0, moved, near), [1.0 - WEIGHTS['location'] * 0.5])
+
+    def test_score_candidates_mirrors_score_jobs(self):
+        for row in range(len(self.jobs)):
+            np.testing.assert_allclose(
+                score_candidates(self.jobs, row, self.seekers),
+                [score_jobs(self.seekers, seeker, self.jobs)[row] for seeker in range(len(self.seekers))],
+            )
+
+
+class BenchSeedTests(TestCase):
+    def setUp(self):
+        self.addCleanup(reset_right_swipe_index)
+        self.addCleanup(reset_deck_queue)
+        self.counts = BenchSeeder(prefix='t', seed=1, batch_size=100, log=lambda line: None).seed(
+            recruiters=4, seekers=20, jobs=30, swipes=300, recruiter_swipes=80, messages_per_match=3,
+        )
+
+    def test_generated_data_is_consistent(self):
+        self.assertEqual(self.counts['swipeaction'], SwipeAction.objects.count())
+        self.assertTrue(Match.objects.exists())
+        for match in Match.objects.select_related('job__recruiter'):
+            self.assertTrue(SwipeAction.objects.filter(
+                profile_id=match.job_seeker.profile_id, job=match.job, direction='right'
+            ).exists())
+            self.assertTrue(SwipeAction.objects.filter(
+                profile_id=match.job.recruiter.profile_id, candidate=match.job_seeker, direction='right'
+            ).exists())
+            versions = list(match.messages.order_by('version').values_list('version', flat=True))
+            self.assertEqual(versions, list(range(1, len(versions) + 1)))
+            self.assertEqual(match.chat_version, len(versions))
+        for funnel in JobFunnel.objects.all():
+            self.assertEqual(funnel.right_swipes, SwipeAction.objects.filter(job=funnel.job, direction='right').count())
+            self.assertEqual(funnel.matches, Match.objects.filter(job=funnel.job).count())
+
+    def test_load_runner_reports_every_scenario(self):
+        sessions = load_sessions('t', 5, 2, random.Random(0))
+        runner = LoadRunner(InProcessTransport(), sessions, parse_mix(''), concurrency=1)
+        report = json.loads(json.dumps(run_benchmark(runner, requests=120, warmup=10)))
+
+        self.assertEqual(report['overall']['errors'], 0)
+        self.assertEqual(report['overall']['requests'] + report['overall']['skipped'], 120)
+        self.assertLessEqual(report['overall']['p50_ms'], report['overall']['p99_ms'])
+        self.assertIn('deck', report['scenarios'])
+        self.assertIn('swipe', report['scenarios'])
+        self.assertGreater(report['scenarios']['deck']['queries_mean'], 0)
+        rows = compare_reports(report, report)
+        self.assertTrue(rows)
+        self.assertTrue(all(change in (0, None) for *_, change in rows))
+
+
+class FastPathTests(TestCase):
+    # The fast list path must render exactly what the serializers render
+    def setUp(self):
+        recruiter = make_recruiter('recruiter')
+        recruiter.profile.profile_picture = 'profile_pictures/recruiter.png'
+        recruiter.profile.save()
+        for i in range(3):
+            job = Job.objects.create(
+                recruiter=recruiter, title=f'Job {i}', description='Déjà vu \u2028', requirements='r',
+                location='Remote', salary_min=1000 * i or None, is_remote=bool(i % 2),
+            )
+            Match.objects.create(job=job, job_seeker=make_job_seeker(f'seeker{i}'))
+
+    def assertSameBytes(self, serializer_class, **kwargs):
+        model = serializer_class.Meta.model
+        row_serializer = RowSerializer(serializer_class(**kwargs))
+        rows = model.objects.order_by('id').values(*row_serializer.lookups)
+        expected = JSONRenderer().render(serializer_class(model.objects.order_by('id'), many=True, **kwargs).data)
+        self.assertEqual(FastJSONRenderer().render(row_serializer(rows)), expected)
+
+    def test_job_serializer(self):
+        self.assertSameBytes(JobSerializer)
+        self.assertSameBytes(JobSerializer, compact=True)
+        self.assertSameBytes(JobSerializer, fieldset=parse_paths('id,title,recruiter.profile.user'))
+
+    def test_geocoded_jobs(self):
+        job = Job.objects.first()
+        job.location = 'Berlin'
+        job.save()
+        self.assertSameBytes(JobSerializer)
+        # Floats repr() writes with an exponent, which orjson writes differently
+        Job.objects.filter(id=job.id).update(latitude=0.00001, longitude=-2.5e-05)
+        self.assertSameBytes(JobSerializer)
+        self.assertSameBytes(JobSerializer, fieldset=parse_paths('id,latitude,longitude'))
+        Profile.objects.update(location='Berlin', latitude=52.52, longitude=1e-05)
+        self.assertSameBytes(MatchSerializer, compact=True, expand=parse_paths('job_seeker.profile'))
+
+    def test_match_serializer(self):
+        self.assertSameBytes(MatchSerializer)
+        self.assertSameBytes(MatchSerializer, compact=True)
+        self.assertSameBytes(MatchSerializer, compact=True, expand=parse_paths('job_seeker.profile'))
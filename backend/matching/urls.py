@@ -9,4 +9,8 @@ router.register(r'messages', views.MessageViewSet, basename='message')
 urlpatterns = [
     path('', include(router.urls)),
     path('swipe/', views.swipe_action, name='swipe'),
+    path('swipe/batch/', views.swipe_batch, name='swipe-batch'),
+    path('deck/', views.job_deck, name='deck'),
+    path('jobs/funnel/', views.job_funnels, name='job-funnels'),
+    path('jobs/<int:job_id>/deck/', views.candidate_deck, name='candidate-deck'),
 ]
\ No newline at end of file
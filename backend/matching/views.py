@@ -1,117 +1,174 @@
+import datetime
+
+from django.db import transaction
+from django.utils import timezone
+from django.utils.http import http_date, parse_http_date_safe
 from rest_framework import viewsets, status
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.response import Response
+from rest_framework.exceptions import PermissionDenied
 from rest_framework.permissions import IsAuthenticated
 from .models import SwipeAction, Match, Message
 from users.models import Profile, JobSeekerProfile
+from users.identity import request_identity
 from jobs.models import Job
-from .serializers import SwipeActionSerializer, MatchSerializer, MessageSerializer
+from jobs.serializers import JobSerializer
+from jobs.search import InvalidSearch, parse_bool, parse_location
+from users.serializers import JobSeekerProfileSerializer
+from .serializers import SwipeActionSerializer, MatchSerializer, MessageSerializer, InboxSerializer
+from .inbox import inbox_queryset
+from .funnel import get_view_buffer, recruiter_funnels
+from config.pagination import MessagePagination, InvalidCursor
+from config.fastpath import FastListMixin
+from config.geo import geo_point
+from config.fieldsets import SparseFieldsetViewMixin, fieldset_kwargs, fieldset_queryset
+from .archive import with_archived_candidates
+from .deck import job_deck_page, candidate_deck_page, parse_deck_size
+from .deck_queue import queued_job_page, queued_candidate_page
+from .swipes import record_swipes, MAX_SWIPE_BATCH, SWIPE_ERROR_STATUS, as_id
+from .realtime import match_for_profile, mark_read_many
+from .sync import (
+    bump_chat_version, chat_state, cursor_version, messages_since, wait_for_change, MAX_SYNC_WAIT, MAX_READ_BATCH,
+)
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def swipe_action(request):
     # Get user profile
+    profile = request_identity(request).profile
+    if profile is None:
+        return Response({'error': 'Profile not found'}, status=status.HTTP_404_NOT_FOUND)
+    
+    if profile.user_type not in ['job_seeker', 'recruiter']:
+        return Response({'error': 'Invalid user type'}, status=status.HTTP_400_BAD_REQUEST)
+    
     try:
-        profile = Profile.objects.get(user=request.user)
-    except Profile.DoesNotExist:
+        results, matches = record_swipes(profile, [request.data])
+    except JobSeekerProfile.DoesNotExist:
+        return Response({'error': 'Job seeker profile not found'}, status=status.HTTP_404_NOT_FOUND)
+    
+    result = results[0]
+    if 'error' in result:
+        return Response({'error': result['error']}, status=SWIPE_ERROR_STATUS[result['error']])
+    if result['matched']:
+        return Response({'message': 'Match created!', 'matched': True})
+    return Response({'message': 'Swipe recorded', 'matched': False})
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def swipe_batch(request):
+    # Ordered list of swipes, e.g. flushed from the client's offline queue
+    profile = request_identity(request).profile
+    if profile is None:
         return Response({'error': 'Profile not found'}, status=status.HTTP_404_NOT_FOUND)
     
-    direction = request.data.get('direction')
-    if direction not in ['left', 'right']:
-        return Response({'error': 'Invalid direction'}, status=status.HTTP_400_BAD_REQUEST)
+    if profile.user_type not in ['job_seeker', 'recruiter']:
+        return Response({'error': 'Invalid user type'}, status=status.HTTP_400_BAD_REQUEST)
     
-    # Handle job seeker swiping on a job
-    if profile.user_type == 'job_seeker':
-        job_id = request.data.get('job_id')
-        if not job_id:
-            return Response({'error': 'Job ID required'}, status=status.HTTP_400_BAD_REQUEST)
-        
-        try:
-            job = Job.objects.get(id=job_id)
-            job_seeker = JobSeekerProfile.objects.get(profile=profile)
-            
-            # Create swipe action
-            SwipeAction.objects.create(
-                profile=profile,
-                job=job,
-                direction=direction
-            )
-            
-            # Check for a match if swiped right
-            if direction == 'right':
-                # Check if the recruiter has already swiped right on this job seeker
-                recruiter_profile = job.recruiter.profile
-                recruiter_right_swipe = SwipeAction.objects.filter(
-                    profile=recruiter_profile,
-                    candidate=job_seeker,
-                    direction='right'
-                ).exists()
-                
-                if recruiter_right_swipe:
-                    # Create a match
-                    Match.objects.create(job=job, job_seeker=job_seeker)
-                    return Response({'message': 'Match created!', 'matched': True})
-            
-            return Response({'message': 'Swipe recorded', 'matched': False})
-            
-        except Job.DoesNotExist:
-            return Response({'error': 'Job not found'}, status=status.HTTP_404_NOT_FOUND)
-        except JobSeekerProfile.DoesNotExist:
-            return Response({'error': 'Job seeker profile not found'}, status=status.HTTP_404_NOT_FOUND)
-    
-    # Handle recruiter swiping on a job seeker
-    elif profile.user_type == 'recruiter':
-        job_seeker_id = request.data.get('job_seeker_id')
-        job_id = request.data.get('job_id')
-        
-        if not job_seeker_id or not job_id:
-            return Response({'error': 'Job seeker ID and Job ID required'}, 
-                            status=status.HTTP_400_BAD_REQUEST)
-        
-        try:
-            job_seeker = JobSeekerProfile.objects.get(id=job_seeker_id)
-            job = Job.objects.get(id=job_id)
-            
-            # Create swipe action
-            SwipeAction.objects.create(
-                profile=profile,
-                candidate=job_seeker,
-                direction=direction
-            )
-            
-            # Check for a match if swiped right
-            if direction == 'right':
-                # Check if the job seeker has already swiped right on this job
-                job_seeker_right_swipe = SwipeAction.objects.filter(
-                    profile=job_seeker.profile,
-                    job=job,
-                    direction='right'
-                ).exists()
-                
-                if job_seeker_right_swipe:
-                    # Create a match
-                    Match.objects.create(job=job, job_seeker=job_seeker)
-                    return Response({'message': 'Match created!', 'matched': True})
-            
-            return Response({'message': 'Swipe recorded', 'matched': False})
-            
-        except JobSeekerProfile.DoesNotExist:
-            return Response({'error': 'Job seeker not found'}, status=status.HTTP_404_NOT_FOUND)
-        except Job.DoesNotExist:
-            return Response({'error': 'Job not found'}, status=status.HTTP_404_NOT_FOUND)
+    items = request.data.get('swipes') if isinstance(request.data, dict) else None
+    if not isinstance(items, list) or not all(isinstance(item, dict) for item in items):
+        return Response({'error': 'A list of swipes is required'}, status=status.HTTP_400_BAD_REQUEST)
+    if len(items) > MAX_SWIPE_BATCH:
+        return Response({'error': f'At most {MAX_SWIPE_BATCH} swipes per batch'},
+                        status=status.HTTP_400_BAD_REQUEST)
+    
+    try:
+        results, matches = record_swipes(profile, items)
+    except JobSeekerProfile.DoesNotExist:
+        return Response({'error': 'Job seeker profile not found'}, status=status.HTTP_404_NOT_FOUND)
     
-    return Response({'error': 'Invalid user type'}, status=status.HTTP_400_BAD_REQUEST)
+    return Response({'results': results, 'matches': matches})
 
-class MatchViewSet(viewsets.ReadOnlyModelViewSet):
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def job_deck(request):
+    # Next unswiped active jobs for a job seeker, ranked by relevance
+    job_seeker = request_identity(request).job_seeker_profile
+    if job_seeker is None:
+        return Response({'error': 'Job seeker profile not found'}, status=status.HTTP_404_NOT_FOUND)
+    
+    size = parse_deck_size(request.query_params.get('limit'))
+    # ?fields= / ?expand= slim the cards down; without them each card is a full job
+    sparse = fieldset_kwargs(request.query_params)
+    cards = fieldset_queryset(Job.objects.all(), JobSerializer(**sparse))
+    try:
+        # ?radius_km= around ?lat=/?lon=, a ?near= place, or the seeker's own location
+        near = parse_location(request.query_params, geo_point(job_seeker.profile))
+        include_remote = parse_bool(request.query_params, 'include_remote')
+    except InvalidSearch as error:
+        return Response({'error': str(error)}, status=status.HTTP_400_BAD_REQUEST)
+    cursor = request.query_params.get('cursor')
+    # Opening the deck is served from the precomputed queue when it is full enough
+    page = queued_job_page(job_seeker, size, cards) if not cursor and near is None else None
+    try:
+        jobs, next_cursor = page or job_deck_page(job_seeker, size, cursor, cards,
+                                                  near=near, include_remote=bool(include_remote))
+    except InvalidCursor:
+        return Response({'error': 'Invalid cursor'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    # Dealt cards count as views in the jobs' funnels, written in batches
+    get_view_buffer().add([job.id for job in jobs])
+    return Response({
+        'results': JobSerializer(jobs, many=True, **sparse).data,
+        'next_cursor': next_cursor,
+    })
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def candidate_deck(request, job_id):
+    # Candidates for one of the recruiter's jobs, interested seekers first
+    recruiter = request_identity(request).recruiter_profile
+    try:
+        job = with_archived_candidates(Job.objects).select_related('recruiter', 'candidate_recommendations').get(
+            id=job_id, recruiter=recruiter
+        )
+    except Job.DoesNotExist:
+        return Response({'error': 'Job not found'}, status=status.HTTP_404_NOT_FOUND)
+    
+    size = parse_deck_size(request.query_params.get('limit'))
+    try:
+        # ?radius_km= around ?lat=/?lon=, a ?near= place, or the job's location
+        near = parse_location(request.query_params, geo_point(job))
+    except InvalidSearch as error:
+        return Response({'error': str(error)}, status=status.HTTP_400_BAD_REQUEST)
+    cursor = request.query_params.get('cursor')
+    page = queued_candidate_page(job, size) if not cursor and near is None else None
+    try:
+        candidates, next_cursor = page or candidate_deck_page(job, size, cursor, near)
+    except InvalidCursor:
+        return Response({'error': 'Invalid cursor'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    results = JobSeekerProfileSerializer(candidates, many=True).data
+    for data, candidate in zip(results, candidates):
+        data['interested'] = candidate.interested
+    
+    return Response({
+        'results': results,
+        'next_cursor': next_cursor,
+    })
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def job_funnels(request):
+    # Views, swipes, matches and applications per job of the recruiter, from the funnel counters
+    recruiter = request_identity(request).recruiter_profile
+    if recruiter is None:
+        return Response({'error': 'Recruiter profile not found'}, status=status.HTTP_404_NOT_FOUND)
+    return Response(recruiter_funnels(recruiter))
+
+class MatchViewSet(FastListMixin, SparseFieldsetViewMixin, viewsets.ReadOnlyModelViewSet):
     serializer_class = MatchSerializer
     permission_classes = [IsAuthenticated]
     
-    def get_queryset(self):
+    def owned_matches(self):
+        # Active matches of the requesting job seeker, or of all the requesting recruiter's jobs
         try:
-            profile = Profile.objects.get(user=self.request.user)
+            profile = request_identity(self.request).profile
+            if profile is None:
+                raise Profile.DoesNotExist
             
             if profile.user_type == 'job_seeker':
-                job_seeker = JobSeekerProfile.objects.get(profile=profile)
+                job_seeker = profile.jobseekerprofile
                 return Match.objects.filter(job_seeker=job_seeker, is_active=True)
             else:
                 # For recruiters, show matches for all their jobs
@@ -120,16 +177,150 @@ class MatchViewSet(viewsets.ReadOnlyModelViewSet):
                 
         except (Profile.DoesNotExist, JobSeekerProfile.DoesNotExist):
             return Match.objects.none()
+    
+    def get_queryset(self):
+        # MatchSerializer nests job -> recruiter -> profile -> user and job_seeker -> profile -> user
+        return self.apply_fieldset(self.owned_matches())
+    
+    @action(detail=False, methods=['get'])
+    def inbox(self, request):
+        """
+        A page of matches with the counterpart, the last message and the unread
+        count, in one query per page (see matching/inbox.py).
+        """
+        profile = request_identity(request).profile
+        if profile is None:
+            return Response({'error': 'Profile not found'}, status=status.HTTP_404_NOT_FOUND)
+        page = self.paginate_queryset(inbox_queryset(self.owned_matches(), profile))
+        serializer = InboxSerializer(page, many=True, context={**self.get_serializer_context(), 'reader': profile})
+        return self.get_paginated_response(serializer.data)
+    
+    @action(detail=False, methods=['post'])
+    def read(self, request):
+        """
+        Mark the matches in `match_ids` viewed and the other side's messages in
+        them read, in bulk; returns the ids of the messages marked read per match.
+        """
+        profile = request_identity(request).profile
+        if profile is None:
+            return Response({'error': 'Profile not found'}, status=status.HTTP_404_NOT_FOUND)
+        items = request.data.get('match_ids') if isinstance(request.data, dict) else None
+        if not isinstance(items, list) or not items:
+            return Response({'error': 'A list of match IDs is required'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(items) > MAX_READ_BATCH:
+            return Response({'error': f'At most {MAX_READ_BATCH} matches per request'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        
+        match_ids = list(self.owned_matches().filter(
+            id__in={as_id(item) for item in items} - {None}
+        ).values_list('id', flat=True))
+        viewed_field = 'job_seeker_viewed' if profile.user_type == 'job_seeker' else 'recruiter_viewed'
+        read = mark_read_many(match_ids, profile, viewed_field) if match_ids else {}
+        return Response({'results': [
+            {'match_id': match_id, 'message_ids': read.get(match_id, [])} for match_id in match_ids
+        ]})
 
 class MessageViewSet(viewsets.ModelViewSet):
     serializer_class = MessageSerializer
     permission_classes = [IsAuthenticated]
+    # Newest page first, `next` loads older messages
+    pagination_class = MessagePagination
     
     def perform_create(self, serializer):
-        serializer.save(sender=Profile.objects.get(user=self.request.user))
+        profile = request_identity(self.request).profile
+        if profile is None:
+            raise PermissionDenied('Profile not found')
+        with transaction.atomic():
+            version = bump_chat_version(serializer.validated_data['match'].id)
+            serializer.save(sender=profile, version=version)
+    
+    def perform_update(self, serializer):
+        # Edits such as is_read move the chat version like new messages do, or /sync/ and
+        # its validators would never report them; a moved message changes both chats
+        match_id = serializer.validated_data.get('match', serializer.instance.match).id
+        with transaction.atomic():
+            versions = {pk: bump_chat_version(pk) for pk in sorted({serializer.instance.match_id, match_id})}
+            serializer.save(version=versions[match_id])
     
     def get_queryset(self):
         match_id = self.request.query_params.get('match_id', None)
         if match_id:
-            return Message.objects.filter(match_id=match_id).order_by('created_at')
-        return Message.objects.none()
\ No newline at end of file
+            return Message.objects.filter(match_id=match_id).select_related('sender__user')
+        return Message.objects.none()
+    
+    @action(detail=False, methods=['get'])
+    def sync(self, request):
+        """
+        Incremental sync: messages created or marked read after ?since=<cursor>.
+
+        Send the returned `cursor` as `since` and the ETag as If-None-Match on the
+        next call; an unchanged chat answers 304 after a single primary key lookup.
+        ?wait=<seconds> (max 5) holds the request open until something changes.
+        """
+        profile = request_identity(request).profile
+        match_id = as_id(request.query_params.get('match_id'))
+        match = match_for_profile(match_id, profile) if profile and match_id else None
+        if match is None:
+            return Response({'error': 'Match not found'}, status=status.HTTP_404_NOT_FOUND)
+        
+        since = request.query_params.get('since')
+        try:
+            cursor_version(since)  # validate before doing any work
+            wait = max(0.0, min(float(request.query_params.get('wait', 0)), MAX_SYNC_WAIT))
+        except InvalidCursor:
+            return Response({'error': 'Invalid cursor'}, status=status.HTTP_400_BAD_REQUEST)
+        except ValueError:
+            return Response({'error': 'Invalid wait'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        version, updated_at = match.chat_version, match.chat_updated_at
+        if not_modified(request, match_id, version, updated_at):
+            if not (wait and wait_for_change(match_id, version, wait)):
+                return sync_not_modified(match_id, version, updated_at)
+            version, updated_at = chat_state(match_id)
+        
+        messages, cursor, has_more = messages_since(match_id, since)
+        if not messages and wait and wait_for_change(match_id, version, wait):
+            version, updated_at = chat_state(match_id)
+            messages, cursor, has_more = messages_since(match_id, since)
+        
+        response = Response({
+            'results': MessageSerializer(messages, many=True).data,
+            'cursor': cursor,
+            'has_more': has_more,
+        })
+        if not has_more:
+            set_validators(response, match_id, version, updated_at)
+        return response
+
+
+def chat_etag(match_id, version):
+    return f'"{match_id}-{version}"'
+
+
+def settled_last_modified(updated_at):
+    # Last-Modified has whole-second precision, so it is only sent once the chat has been
+    # quiet for a full second; any later change then lands in a later second.
+    if updated_at is None or timezone.now() - updated_at < datetime.timedelta(seconds=1):
+        return None
+    return int(updated_at.timestamp())
+
+
+def not_modified(request, match_id, version, updated_at):
+    if_none_match = request.headers.get('If-None-Match')
+    if if_none_match:
+        etags = [etag.strip() for etag in if_none_match.split(',')]
+        return chat_etag(match_id, version) in etags or '*' in etags
+    if_modified_since = parse_http_date_safe(request.headers.get('If-Modified-Since', ''))
+    return if_modified_since is not None and updated_at is not None and int(updated_at.timestamp()) <= if_modified_since
+
+
+def set_validators(response, match_id, version, updated_at):
+    response['ETag'] = chat_etag(match_id, version)
+    last_modified = settled_last_modified(updated_at)
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified)
+    return response
+
+
+def sync_not_modified(match_id, version, updated_at):
+    return set_validators(Response(status=status.HTTP_304_NOT_MODIFIED), match_id, version, updated_at)
\ No newline at end of file
@@ -0,0 +1,172 @@
+import logging
+import threading
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.db import close_old_connections
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import Task
+from .queue import UnknownTask, get_task, run_message
+
+logger = logging.getLogger(__name__)
+
+
+def run_in_thread(function, *args):
+    # Worker threads open their own connections; close them like a request would
+    close_old_connections()
+    try:
+        return function(*args)
+    finally:
+        close_old_connections()
+
+
+class Broker:
+    # Takes messages ({'name', 'args', 'kwargs', 'run_after'}) from tasks.queue.enqueue
+
+    def push(self, messages):
+        raise NotImplementedError
+
+    def shutdown(self):
+        pass
+
+
+class DatabaseBroker(Broker):
+    """
+    Tasks stored as rows of the Task table and run by `manage.py run_tasks`.
+
+    Workers claim due rows in batches with a conditional UPDATE, so concurrent
+    workers never run the same task, and hold them for `lease` seconds: rows of
+    a worker that died are claimed again once the lease lapses. Finished tasks
+    are deleted; tasks out of retries stay behind as failed with their last error.
+    """
+
+    def __init__(self, lease=300, **options):
+        self.lease = lease
+
+    def push(self, messages):
+        Task.objects.bulk_create([
+            Task(name=message['name'], args=message['args'], kwargs=message['kwargs'], run_after=message['run_after'])
+            for message in messages
+        ])
+
+    def claimable(self, now):
+        return Q(status=Task.QUEUED, run_after__lte=now) | Q(status=Task.RUNNING, locked_until__lt=now)
+
+    def claim(self, limit):
+        # Up to `limit` due tasks, oldest first; three queries whatever the batch size
+        now = timezone.now()
+        token = uuid.uuid4().hex
+        ids = list(
+            Task.objects.filter(self.claimable(now)).order_by('run_after', 'id').values_list('id', flat=True)[:limit]
+        )
+        if not ids:
+            return []
+        # Rows another worker claimed in between no longer match
+        Task.objects.filter(self.claimable(now), id__in=ids).update(
+            status=Task.RUNNING, claim=token, locked_until=now + timedelta(seconds=self.lease),
+            attempts=F('attempts') + 1,
+        )
+        return list(Task.objects.filter(id__in=ids, claim=token).order_by('run_after', 'id'))
+
+    def complete(self, tasks):
+        Task.objects.filter(id__in=[task.id for task in tasks]).delete()
+
+    def fail(self, task, error):
+        # Back in the queue after a backoff, or failed for good once out of retries
+        try:
+            registered = get_task(task.name)
+        except UnknownTask:
+            registered = None
+        fields = {'last_error': error, 'claim': '', 'locked_until': None}
+        if registered is None or task.attempts > registered.max_retries:
+            fields['status'] = Task.FAILED
+        else:
+            fields.update(status=Task.QUEUED, run_after=registered.retry_at(task.attempts))
+        Task.objects.filter(id=task.id).update(**fields)
+
+    def execute(self, task):
+        # The error text, or None on success
+        try:
+            run_message({'name': task.name, 'args': task.args, 'kwargs': task.kwargs})
+        except Exception:
+            return traceback.format_exc()
+        return None
+
+    def run_batch(self, limit=50, executor=None):
+        """
+        Claim up to `limit` tasks and run them, on `executor` when given (its
+        size bounds the concurrency) or one after another. Returns the numbers
+        of tasks that succeeded and failed.
+        """
+        tasks = self.claim(limit)
+        if executor is None:
+            errors = [self.execute(task) for task in tasks]
+        else:
+            errors = list(executor.map(lambda task: run_in_thread(self.execute, task), tasks))
+        done = [task for task, error in zip(tasks, errors) if error is None]
+        self.complete(done)
+        for task, error in zip(tasks, errors):
+            if error is not None:
+                self.fail(task, error)
+        return len(done), len(tasks) - len(done)
+
+
+class ThreadPoolBroker(Broker):
+    """
+    Runs tasks in this process on a pool of `workers` threads, or inline with
+    `background=False` (tests). Nothing is persisted: tasks queued when the
+    process exits are lost, so this suits tests and single-process development.
+    Failed tasks are retried at once, up to their max_retries.
+    """
+
+    def __init__(self, workers=4, background=True, **options):
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='tasks') if background else None
+        self._timers = set()
+        self._lock = threading.Lock()
+
+    def push(self, messages):
+        for message in messages:
+            delay = (message['run_after'] - timezone.now()).total_seconds()
+            if self._executor is None:
+                # Inline runs don't wait out delays
+                self.run(message)
+            elif delay > 0:
+                self._later(delay, message)
+            else:
+                self._executor.submit(run_in_thread, self.run, message)
+
+    def _later(self, delay, message):
+        def submit():
+            with self._lock:
+                self._timers.discard(timer)
+            self._executor.submit(run_in_thread, self.run, message)
+        timer = threading.Timer(delay, submit)
+        timer.daemon = True
+        with self._lock:
+            self._timers.add(timer)
+        timer.start()
+
+    def run(self, message):
+        try:
+            attempts = get_task(message['name']).max_retries + 1
+        except UnknownTask:
+            logger.error('Unknown task %s', message['name'])
+            return
+        for attempt in range(1, attempts + 1):
+            try:
+                run_message(message)
+                return
+            except Exception:
+                logger.exception('Task %s failed (attempt %d of %d)', message['name'], attempt, attempts)
+
+    def shutdown(self):
+        with self._lock:
+            timers, self._timers = self._timers, set()
+        for timer in timers:
+            timer.cancel()
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
@@ -0,0 +1,39 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+
+from tasks.brokers import DatabaseBroker
+from tasks.queue import get_broker
+
+
+class Command(BaseCommand):
+    help = 'Run queued tasks from the database broker until stopped, or until the queue is empty with --once'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=50, help='Tasks claimed per round trip')
+        parser.add_argument('--concurrency', type=int, default=4, help='Tasks run at the same time')
+        parser.add_argument('--poll-interval', type=float, default=1.0, help='Seconds to wait when nothing is due')
+        parser.add_argument('--once', action='store_true', help='Exit once no task is due')
+
+    def handle(self, *args, **options):
+        broker = get_broker()
+        if not isinstance(broker, DatabaseBroker):
+            raise CommandError(f'TASK_QUEUE uses {type(broker).__name__}, which runs tasks in-process')
+        # Claim at least enough to keep every thread busy
+        batch_size = max(options['batch_size'], options['concurrency'])
+        done = failed = 0
+        executor = ThreadPoolExecutor(max_workers=options['concurrency'], thread_name_prefix='run-tasks')
+        try:
+            while True:
+                succeeded, errors = broker.run_batch(batch_size, executor)
+                done, failed = done + succeeded, failed + errors
+                if succeeded + errors == 0:
+                    if options['once']:
+                        break
+                    time.sleep(options['poll_interval'])
+        except KeyboardInterrupt:
+            pass
+        finally:
+            executor.shutdown(wait=True)
+        self.stdout.write(f'Ran {done} tasks, {failed} failed')
@@ -0,0 +1,114 @@
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+DEFAULT_SETTINGS = {
+    'BACKEND': 'tasks.brokers.DatabaseBroker',
+    'OPTIONS': {},
+}
+
+# Task name -> TaskFunction
+_registry = {}
+
+
+class UnknownTask(Exception):
+    pass
+
+
+class TaskFunction:
+    """
+    A function registered with @task. Calling it runs it now; enqueue() runs it
+    later on a worker, once the current transaction commits. Arguments must be
+    JSON-serializable, so pass ids rather than model instances.
+    """
+
+    def __init__(self, function, name, max_retries, retry_delay):
+        self.function = function
+        self.name = name
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+
+    def __call__(self, *args, **kwargs):
+        return self.function(*args, **kwargs)
+
+    def message(self, args=(), kwargs=None, delay=0):
+        return {
+            'name': self.name,
+            'args': list(args),
+            'kwargs': kwargs or {},
+            'run_after': timezone.now() + timedelta(seconds=delay),
+        }
+
+    def enqueue(self, *args, **kwargs):
+        enqueue([self.message(args, kwargs)])
+
+    def enqueue_in(self, delay, *args, **kwargs):
+        # Not before `delay` seconds from now
+        enqueue([self.message(args, kwargs, delay)])
+
+    def enqueue_many(self, calls, delay=0):
+        # One (args, kwargs) pair per call, pushed to the broker together
+        enqueue([self.message(args, kwargs, delay) for args, kwargs in calls])
+
+    def retry_at(self, attempts):
+        # Exponential backoff: retry_delay, then twice that, and so on
+        return timezone.now() + timedelta(seconds=self.retry_delay * 2 ** max(attempts - 1, 0))
+
+
+def task(name=None, max_retries=3, retry_delay=30):
+    """
+    Register a function as a task, under `name` or its dotted path. A failing
+    task is retried up to `max_retries` times, `retry_delay` seconds apart at first.
+    """
+    def register(function):
+        task_name = name or f'{function.__module__}.{function.__name__}'
+        registered = TaskFunction(function, task_name, max_retries, retry_delay)
+        _registry[task_name] = registered
+        return registered
+    return register
+
+
+def get_task(name):
+    try:
+        return _registry[name]
+    except KeyError:
+        raise UnknownTask(name)
+
+
+def enqueue(messages):
+    # Hand `messages` to the broker after commit, so tasks see the rows that caused
+    # them and a rolled-back write enqueues nothing
+    if messages:
+        transaction.on_commit(lambda: get_broker().push(messages))
+
+
+def run_message(message):
+    return get_task(message['name'])(*message['args'], **message['kwargs'])
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                config = getattr(settings, 'TASK_QUEUE', DEFAULT_SETTINGS)
+                backend = import_string(config.get('BACKEND', DEFAULT_SETTINGS['BACKEND']))
+                _broker = backend(**config.get('OPTIONS', {}))
+    return _broker
+
+
+def reset_broker():
+    # Drop the process-wide broker, e.g. after settings change in tests
+    global _broker
+    with _broker_lock:
+        if _broker is not None:
+            _broker.shutdown()
+        _broker = None
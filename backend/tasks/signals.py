@@ -0,0 +1,10 @@
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+from .queue import reset_broker
+
+
+@receiver(setting_changed)
+def reset_broker_on_setting_change(setting, **kwargs):
+    if setting == 'TASK_QUEUE':
+        reset_broker()
@@ -0,0 +1,90 @@
+from datetime import timedelta
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from .brokers import DatabaseBroker, ThreadPoolBroker
+from .models import Task
+from .queue import task, reset_broker
+
+calls = []
+
+
+@task(name='tests.record')
+def record(value, scale=1):
+    calls.append(value * scale)
+
+
+@task(name='tests.flaky', max_retries=2, retry_delay=10)
+def flaky(value):
+    calls.append(value)
+    raise ValueError('boom')
+
+
+@override_settings(TASK_QUEUE={'BACKEND': 'tasks.brokers.DatabaseBroker'})
+class DatabaseBrokerTests(TestCase):
+    def setUp(self):
+        reset_broker()
+        calls.clear()
+        self.broker = DatabaseBroker()
+
+    def test_enqueued_after_commit_and_run_in_batches(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            record.enqueue_many([((1,), {}), ((2,), {'scale': 10})])
+            self.assertFalse(Task.objects.exists())
+        record.enqueue_in(60, 3)
+        self.assertEqual(Task.objects.count(), 2)
+
+        with self.assertNumQueries(4):
+            self.assertEqual(self.broker.run_batch(limit=10), (2, 0))
+        self.assertEqual(calls, [1, 20])
+        self.assertFalse(Task.objects.exists())
+
+    def test_retries_then_fails(self):
+        self.broker.push([flaky.message((7,))])
+        self.assertEqual(self.broker.run_batch(), (0, 1))
+        queued = Task.objects.get()
+        self.assertEqual((queued.status, queued.attempts), (Task.QUEUED, 1))
+        self.assertIn('ValueError: boom', queued.last_error)
+        # Not due again until the backoff passes
+        self.assertEqual(self.broker.run_batch(), (0, 0))
+
+        for _ in range(2):
+            Task.objects.update(run_after=timezone.now())
+            self.broker.run_batch()
+        failed = Task.objects.get()
+        self.assertEqual((failed.status, failed.attempts), (Task.FAILED, 3))
+        self.assertEqual(calls, [7, 7, 7])
+
+    def test_claims_are_exclusive_until_the_lease_lapses(self):
+        self.broker.push([record.message((1,)), record.message((2,))])
+        first = self.broker.claim(1)
+        second = self.broker.claim(5)
+        self.assertEqual([task.args for task in first + second], [[1], [2]])
+        self.assertEqual(self.broker.claim(5), [])
+
+        # The first worker died: its task is claimed again once its lease is over
+        Task.objects.filter(id=first[0].id).update(locked_until=timezone.now() - timedelta(seconds=1))
+        self.assertEqual([task.id for task in self.broker.claim(5)], [first[0].id])
+
+    def test_unknown_task_fails(self):
+        self.broker.push([{'name': 'tests.missing', 'args': [], 'kwargs': {}, 'run_after': timezone.now()}])
+        self.assertEqual(self.broker.run_batch(), (0, 1))
+        self.assertEqual(Task.objects.get().status, Task.FAILED)
+
+
+class ThreadPoolBrokerTests(TestCase):
+    def setUp(self):
+        calls.clear()
+
+    def test_inline_runs_with_retries(self):
+        broker = ThreadPoolBroker(background=False)
+        with self.assertLogs('tasks.brokers', 'ERROR'):
+            broker.push([record.message((4,)), flaky.message((5,))])
+        self.assertEqual(calls, [4, 5, 5, 5])
+
+    def test_background(self):
+        broker = ThreadPoolBroker(workers=2)
+        broker.push([record.message((value,)) for value in range(5)])
+        broker.shutdown()
+        self.assertEqual(sorted(calls), [0, 1, 2, 3, 4])
@@ -1,6 +1,7 @@
 from django.contrib import admin
-from .models import Profile, RecruiterProfile, JobSeekerProfile
+from .models import Profile, RecruiterProfile, JobSeekerProfile, Skill
 
 admin.site.register(Profile)
 admin.site.register(RecruiterProfile)
-admin.site.register(JobSeekerProfile)
\ No newline at end of file
+admin.site.register(JobSeekerProfile)
+admin.site.register(Skill)
@@ -0,0 +1,32 @@
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+
+from .identity import cached_token, request_identity
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    TokenAuthentication backed by the AUTH_CACHE cache instead of a query per request.
+
+    Cached tokens are dropped when the token is deleted (logout) or its user is
+    saved. That reaches every process only when AUTH_CACHE points at a shared
+    cache (Redis, Memcached); with a per-process cache such as LocMemCache, other
+    processes keep accepting a revoked token or inactive user until their entry
+    expires, at most AUTH_CACHE['TIMEOUT'] seconds later, so keep that short.
+    Also attaches `request.identity` (see users/identity.py) for the views.
+    """
+
+    def authenticate(self, request):
+        result = super().authenticate(request)
+        if result is not None:
+            request_identity(request)
+        return result
+
+    def authenticate_credentials(self, key):
+        token = cached_token(key)
+        if token is None:
+            raise exceptions.AuthenticationFailed(_('Invalid token.'))
+        if not token.user.is_active:
+            raise exceptions.AuthenticationFailed(_('User inactive or deleted.'))
+        return (token.user, token)
@@ -0,0 +1,125 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.utils.functional import cached_property
+from rest_framework.authtoken.models import Token
+
+from .models import Profile, RecruiterProfile, JobSeekerProfile
+
+DEFAULT_SETTINGS = {
+    'CACHE_ALIAS': 'default',
+    # Also how long a revoked token may keep working in other processes when the
+    # cache is not shared between them (see CachedTokenAuthentication)
+    'TIMEOUT': 60,
+    'KEY_PREFIX': 'auth',
+}
+
+
+def cache_settings():
+    return {**DEFAULT_SETTINGS, **getattr(settings, 'AUTH_CACHE', {})}
+
+
+def get_cache():
+    return caches[cache_settings()['CACHE_ALIAS']]
+
+
+def token_key(key):
+    return f"{cache_settings()['KEY_PREFIX']}:token:{key}"
+
+
+def profile_key(user_id):
+    return f"{cache_settings()['KEY_PREFIX']}:profile:{user_id}"
+
+
+def cached_token(key):
+    """
+    The Token for `key` with its user loaded, or None for an unknown key.
+
+    Unknown keys are not cached, so a token created after a miss works at once.
+    """
+    cache = get_cache()
+    token = cache.get(token_key(key))
+    if token is None:
+        token = Token.objects.select_related('user').filter(key=key).first()
+        if token is not None:
+            cache.set(token_key(key), token, cache_settings()['TIMEOUT'])
+    return token
+
+
+def load_profile(user_id):
+    # Profile, user and whichever role profile exists in one query; the missing
+    # reverse one-to-one is cached as absent, so accessing it raises without a query
+    return (Profile.objects
+            .select_related('user', 'recruiterprofile', 'jobseekerprofile')
+            .filter(user_id=user_id)
+            .first())
+
+
+def cached_profile(user_id):
+    """The user's Profile with `user` and its role profile preloaded, or None."""
+    cache = get_cache()
+    key = profile_key(user_id)
+    entry = cache.get(key)
+    if entry is None:
+        # Cache "no profile" too, as a tuple so it differs from a miss
+        entry = (load_profile(user_id),)
+        cache.set(key, entry, cache_settings()['TIMEOUT'])
+    return entry[0]
+
+
+def forget(token_keys=(), user_ids=()):
+    get_cache().delete_many([token_key(key) for key in token_keys] +
+                            [profile_key(user_id) for user_id in user_ids])
+
+
+def invalidate(token_keys=(), user_ids=()):
+    # Now, and again after commit so a concurrent reader can't re-cache pre-commit rows
+    token_keys, user_ids = list(token_keys), list(user_ids)
+    forget(token_keys, user_ids)
+    transaction.on_commit(lambda: forget(token_keys, user_ids))
+
+
+class RequestIdentity:
+    """
+    The authenticated user's profile and role profile, resolved once per request.
+
+    Reads `request.user` on first access, so it works whether the user came from
+    the session or from DRF authentication (which sets the user on the underlying
+    request). Anonymous users and users without a profile get None throughout.
+    """
+
+    def __init__(self, request):
+        self.request = request
+
+    @cached_property
+    def profile(self):
+        user = getattr(self.request, 'user', None)
+        if user is None or not user.is_authenticated:
+            return None
+        return cached_profile(user.id)
+
+    @property
+    def user_type(self):
+        return self.profile.user_type if self.profile is not None else None
+
+    @property
+    def recruiter_profile(self):
+        try:
+            return self.profile.recruiterprofile if self.user_type == 'recruiter' else None
+        except RecruiterProfile.DoesNotExist:
+            return None
+
+    @property
+    def job_seeker_profile(self):
+        try:
+            return self.profile.jobseekerprofile if self.user_type == 'job_seeker' else None
+        except JobSeekerProfile.DoesNotExist:
+            return None
+
+
+def request_identity(request):
+    # DRF's Request proxies attribute reads to the HttpRequest the middleware set it on
+    request = getattr(request, '_request', request)
+    if not hasattr(request, 'identity'):
+        request.identity = RequestIdentity(request)
+    return request.identity
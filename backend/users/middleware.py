@@ -0,0 +1,56 @@
+from urllib.parse import parse_qs
+
+from channels.db import database_sync_to_async
+from django.contrib.auth.models import AnonymousUser
+
+from .identity import cached_token, request_identity
+
+
+@database_sync_to_async
+def user_for_token(key):
+    token = cached_token(key)
+    return token.user if token is not None else AnonymousUser()
+
+
+def token_from_scope(scope):
+    # "Authorization: Token <key>" header, or ?token=<key> for clients that can't set headers
+    for name, value in scope.get('headers', []):
+        if name == b'authorization':
+            keyword, _, key = value.decode('latin1').partition(' ')
+            if keyword.lower() == 'token' and key:
+                return key.strip()
+    query = parse_qs(scope.get('query_string', b'').decode())
+    return query.get('token', [None])[0]
+
+
+class TokenAuthMiddleware:
+    """
+    ASGI middleware that authenticates WebSocket connections with the DRF token.
+
+    Sets scope['user'] to the token's user, or AnonymousUser if the token is
+    missing, unknown or belongs to an inactive user.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        key = token_from_scope(scope)
+        user = await user_for_token(key) if key else AnonymousUser()
+        if not user.is_active:
+            user = AnonymousUser()
+        return await self.app(dict(scope, user=user), receive, send)
+
+
+class RequestIdentityMiddleware:
+    """
+    Attaches `request.identity`, which resolves the user's profile and role profile
+    from the AUTH_CACHE cache on first access (see users/identity.py).
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request_identity(request)
+        return self.get_response(request)
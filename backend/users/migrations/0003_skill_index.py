@@ -0,0 +1,70 @@
+# Generated by Django 5.2.18 on 2026-10-17 07:04
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def parse_skills(text):
+    names = []
+    for part in (text or '').split(','):
+        name = ' '.join(part.split()).lower()[:100]
+        if name and name not in names:
+            names.append(name)
+    return names
+
+
+def backfill_seeker_skills(apps, schema_editor):
+    Skill = apps.get_model('users', 'Skill')
+    JobSeekerProfile = apps.get_model('users', 'JobSeekerProfile')
+    SeekerSkill = apps.get_model('users', 'SeekerSkill')
+
+    skill_ids = dict(Skill.objects.values_list('name', 'id'))
+    links = []
+    for owner_id, text in JobSeekerProfile.objects.values_list('id', 'skills').iterator():
+        for name in parse_skills(text):
+            if name not in skill_ids:
+                skill_ids[name] = Skill.objects.create(name=name).id
+            links.append(SeekerSkill(job_seeker_id=owner_id, skill_id=skill_ids[name]))
+        if len(links) >= 1000:
+            SeekerSkill.objects.bulk_create(links, ignore_conflicts=True)
+            links = []
+    SeekerSkill.objects.bulk_create(links, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_jobseekerprofile_desired_position_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Skill',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='SeekerSkill',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('job_seeker', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='skill_links', to='users.jobseekerprofile')),
+                ('skill', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='seeker_links', to='users.skill')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='jobseekerprofile',
+            name='normalized_skills',
+            field=models.ManyToManyField(blank=True, related_name='job_seekers', through='users.SeekerSkill', to='users.skill'),
+        ),
+        migrations.AddIndex(
+            model_name='seekerskill',
+            index=models.Index(fields=['skill', 'job_seeker'], name='seekerskill_skill_seeker_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='seekerskill',
+            unique_together={('job_seeker', 'skill')},
+        ),
+        migrations.RunPython(backfill_seeker_skills, migrations.RunPython.noop),
+    ]
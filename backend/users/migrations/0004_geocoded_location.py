@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-17 07:51
+
+from django.db import migrations, models
+
+# Existing rows are filled in by `manage.py geocode_locations`, not here, so this
+# migration does not depend on the current geocoding code.
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0003_skill_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profile',
+            name='geo_cell',
+            field=models.CharField(blank=True, db_index=True, max_length=12, null=True),
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='latitude',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='longitude',
+            field=models.FloatField(blank=True, null=True),
+        ),
+    ]
@@ -1,6 +1,13 @@
 from django.db import models
 from django.contrib.auth.models import User
 
+class Skill(models.Model):
+    # Normalized (lowercased, trimmed) skill name
+    name = models.CharField(max_length=100, unique=True)
+    
+    def __str__(self):
+        return self.name
+
 class Profile(models.Model):
     USER_TYPE_CHOICES = (
         ('recruiter', 'Recruiter'),
@@ -11,6 +18,10 @@ class Profile(models.Model):
     user_type = models.CharField(max_length=10, choices=USER_TYPE_CHOICES)
     bio = models.TextField(blank=True)
     location = models.CharField(max_length=100, blank=True)
+    # Geocoded from `location` on save (config/geo.py); null when it isn't a known place
+    latitude = models.FloatField(null=True, blank=True)
+    longitude = models.FloatField(null=True, blank=True)
+    geo_cell = models.CharField(max_length=12, null=True, blank=True, db_index=True)
     profile_picture = models.ImageField(upload_to='profile_pictures/', blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -37,6 +48,22 @@ class JobSeekerProfile(models.Model):
     resume = models.FileField(upload_to='resumes/', blank=True, null=True)
     desired_position = models.CharField(max_length=100, blank=True)
     desired_salary = models.IntegerField(null=True, blank=True)
+    # Indexed copy of `skills`, kept in sync on save
+    normalized_skills = models.ManyToManyField(Skill, through='SeekerSkill', related_name='job_seekers', blank=True)
+    
+    def __str__(self):
+        return f"{self.profile.user.username} - Job Seeker"
+
+class SeekerSkill(models.Model):
+    job_seeker = models.ForeignKey(JobSeekerProfile, on_delete=models.CASCADE, related_name='skill_links')
+    skill = models.ForeignKey(Skill, on_delete=models.CASCADE, related_name='seeker_links')
+    
+    class Meta:
+        unique_together = ('job_seeker', 'skill')
+        indexes = [
+            # Inverted index: skill -> job seekers
+            models.Index(fields=['skill', 'job_seeker'], name='seekerskill_skill_seeker_idx'),
+        ]
     
     def __str__(self):
-        return f"{self.profile.user.username} - Job Seeker"
\ No newline at end of file
+        return f"{self.job_seeker} - {self.skill}"
\ No newline at end of file
@@ -1,13 +1,15 @@
 from rest_framework import serializers
 from django.contrib.auth.models import User
+from config.fieldsets import SparseFieldsetMixin
 from .models import Profile, RecruiterProfile, JobSeekerProfile
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     password = serializers.CharField(write_only=True)
     
     class Meta:
         model = User
         fields = ['id', 'username', 'email', 'password', 'first_name', 'last_name']
+        list_fields = ['id', 'first_name', 'last_name']
         
     def create(self, validated_data):
         user = User.objects.create_user(
@@ -19,23 +21,28 @@ class UserSerializer(serializers.ModelSerializer):
         )
         return user
 
-class ProfileSerializer(serializers.ModelSerializer):
+class ProfileSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     user = UserSerializer(read_only=True)
     
     class Meta:
         model = Profile
-        fields = '__all__'
+        exclude = ['geo_cell']
+        # Geocoded from `location`
+        read_only_fields = ['latitude', 'longitude']
+        list_fields = ['id', 'user', 'user_type', 'location', 'profile_picture']
 
-class RecruiterProfileSerializer(serializers.ModelSerializer):
+class RecruiterProfileSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     profile = ProfileSerializer(read_only=True)
     
     class Meta:
         model = RecruiterProfile
         fields = '__all__'
+        list_fields = ['id', 'company_name', 'industry']
 
-class JobSeekerProfileSerializer(serializers.ModelSerializer):
+class JobSeekerProfileSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     profile = ProfileSerializer(read_only=True)
     
     class Meta:
         model = JobSeekerProfile
-        fields = '__all__'
\ No newline at end of file
+        exclude = ['normalized_skills']
+        list_fields = ['id', 'profile', 'desired_position', 'experience_years']
\ No newline at end of file
@@ -0,0 +1,63 @@
+from django.contrib.auth.models import User
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from config.geo import geo_fields
+from .identity import invalidate
+from .models import Profile, RecruiterProfile, JobSeekerProfile, SeekerSkill
+from .skills import sync_skill_links
+
+
+@receiver(pre_save, sender=Profile)
+def geocode_profile(sender, instance, update_fields=None, **kwargs):
+    # Saves limited to other fields keep the stored coordinates
+    if update_fields is not None and 'location' not in update_fields:
+        return
+    for name, value in geo_fields(instance.location).items():
+        setattr(instance, name, value)
+
+
+@receiver(post_save, sender=JobSeekerProfile)
+def sync_seeker_skills(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and 'skills' not in update_fields:
+        return
+    sync_skill_links(instance, instance.skills, SeekerSkill, 'job_seeker')
+
+
+@receiver(post_save, sender=Token)
+@receiver(post_delete, sender=Token)
+def invalidate_cached_token(sender, instance, **kwargs):
+    # Deleting the token is how a user logs out
+    invalidate(token_keys=[instance.key])
+
+
+@receiver(post_save, sender=User)
+def invalidate_cached_user(sender, instance, update_fields=None, **kwargs):
+    # Cached tokens and profiles carry the user; logins only touch last_login
+    if update_fields is not None and set(update_fields) <= {'last_login'}:
+        return
+    keys = Token.objects.filter(user=instance).values_list('key', flat=True)
+    invalidate(token_keys=keys, user_ids=[instance.id])
+
+
+@receiver(post_delete, sender=User)
+def invalidate_deleted_user(sender, instance, **kwargs):
+    # The user's token is deleted by cascade and invalidated on its own
+    invalidate(user_ids=[instance.id])
+
+
+@receiver(post_save, sender=Profile)
+@receiver(post_delete, sender=Profile)
+def invalidate_cached_profile(sender, instance, **kwargs):
+    invalidate(user_ids=[instance.user_id])
+
+
+@receiver(post_save, sender=RecruiterProfile)
+@receiver(post_delete, sender=RecruiterProfile)
+@receiver(post_save, sender=JobSeekerProfile)
+@receiver(post_delete, sender=JobSeekerProfile)
+def invalidate_cached_role_profile(sender, instance, **kwargs):
+    user_id = Profile.objects.filter(id=instance.profile_id).values_list('user_id', flat=True).first()
+    if user_id is not None:
+        invalidate(user_ids=[user_id])
@@ -0,0 +1,50 @@
+from django.db.models import Exists, OuterRef
+
+from .models import Skill
+
+
+def parse_skills(text):
+    # "Python, django ,SQL,python" -> ['python', 'django', 'sql']
+    names = []
+    for part in (text or '').split(','):
+        name = ' '.join(part.split()).lower()[:100]
+        if name and name not in names:
+            names.append(name)
+    return names
+
+
+def skill_ids(names):
+    # Resolve names to Skill ids, creating the missing ones in bulk
+    if not names:
+        return {}
+    found = dict(Skill.objects.filter(name__in=names).values_list('name', 'id'))
+    missing = [name for name in names if name not in found]
+    if missing:
+        Skill.objects.bulk_create([Skill(name=name) for name in missing], ignore_conflicts=True)
+        found.update(Skill.objects.filter(name__in=missing).values_list('name', 'id'))
+    return found
+
+
+def sync_skill_links(owner, text, link_model, owner_field):
+    # Bring the through-table rows for `owner` in line with its comma-separated text
+    wanted = set(skill_ids(parse_skills(text)).values())
+    links = link_model.objects.filter(**{owner_field: owner})
+    current = set(links.values_list('skill_id', flat=True))
+
+    if current - wanted:
+        links.filter(skill_id__in=current - wanted).delete()
+    if wanted - current:
+        link_model.objects.bulk_create(
+            [link_model(**{owner_field: owner, 'skill_id': skill_id}) for skill_id in wanted - current],
+            ignore_conflicts=True,
+        )
+
+
+def filter_by_any_skill(queryset, names, link_model, owner_field):
+    # Rows linked to at least one of `names`; a semi-join over the (skill, owner) index
+    names = parse_skills(','.join(names))
+    links = link_model.objects.filter(
+        skill__name__in=names,
+        **{owner_field: OuterRef('pk')}
+    )
+    return queryset.filter(Exists(links))
@@ -1,3 +1,107 @@
+from django.contrib.auth.models import User
 from django.test import TestCase
 
-# Create your tests here.
+from config.testing import QueryBudgetMixin
+from .models import Profile, JobSeekerProfile, Skill, SeekerSkill
+from .skills import parse_skills, skill_ids, sync_skill_links, filter_by_any_skill
+
+
+class ProfileQueryBudgetTests(QueryBudgetMixin, TestCase):
+    def test_profile_list(self):
+        user = User.objects.create_user('seeker')
+        Profile.objects.create(user=user, user_type='job_seeker')
+        client = self.api_client(user)
+
+        def grow():
+            # Other users' profiles must not be listed or loaded
+            for i in range(5):
+                Profile.objects.create(user=User.objects.create_user(f'other{i}'))
+
+        self.assertQueryBudget(client, '/api/users/profiles/', 1, grow=grow)
+
+
+class CachedIdentityTests(QueryBudgetMixin, TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('seeker')
+        self.profile = Profile.objects.create(user=self.user, user_type='job_seeker')
+        JobSeekerProfile.objects.create(profile=self.profile)
+        self.client = self.api_client(self.user)
+
+    def test_logout_revokes_cached_token(self):
+        self.assertEqual(self.client.get('/api/users/profiles/').status_code, 200)
+        self.assertEqual(self.client.post('/api/users/logout/').status_code, 204)
+        self.assertEqual(self.client.get('/api/users/profiles/').status_code, 401)
+
+    def test_deactivated_user_is_rejected(self):
+        self.assertEqual(self.client.get('/api/users/profiles/').status_code, 200)
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get('/api/users/profiles/').status_code, 401)
+
+    def test_profile_changes_invalidate(self):
+        self.assertEqual(self.client.get('/api/matching/deck/').status_code, 200)
+        # A job seeker turned recruiter no longer gets a job deck
+        self.profile.user_type = 'recruiter'
+        self.profile.save()
+        self.assertEqual(self.client.get('/api/matching/deck/').status_code, 404)
+
+
+class SkillIndexTests(TestCase):
+    def make_seeker(self, username, skills=''):
+        profile = Profile.objects.create(user=User.objects.create_user(username), user_type='job_seeker')
+        return JobSeekerProfile.objects.create(profile=profile, skills=skills)
+
+    def linked(self, seeker):
+        return set(seeker.skill_links.values_list('skill__name', flat=True))
+
+    def test_parse_skills(self):
+        self.assertEqual(parse_skills('Python, django ,SQL,python'), ['python', 'django', 'sql'])
+        self.assertEqual(parse_skills('  Machine   Learning ,, ,'), ['machine learning'])
+        self.assertEqual(parse_skills(''), [])
+        self.assertEqual(parse_skills(None), [])
+        self.assertEqual(parse_skills('x' * 150), ['x' * 100])
+
+    def test_skill_ids_reuse_existing_rows(self):
+        existing = Skill.objects.create(name='python')
+        ids = skill_ids(['python', 'go'])
+        self.assertEqual(ids['python'], existing.id)
+        self.assertEqual(skill_ids(['go']), {'go': ids['go']})
+        self.assertEqual(Skill.objects.count(), 2)
+        self.assertEqual(skill_ids([]), {})
+
+    def test_links_follow_the_skills_text(self):
+        seeker = self.make_seeker('seeker', 'Python, Django')
+        self.assertEqual(self.linked(seeker), {'python', 'django'})
+        kept = SeekerSkill.objects.get(job_seeker=seeker, skill__name='django').id
+
+        seeker.skills = 'django, SQL'
+        seeker.save()
+        self.assertEqual(self.linked(seeker), {'django', 'sql'})
+        # Unchanged links are left in place rather than rewritten
+        self.assertTrue(SeekerSkill.objects.filter(id=kept).exists())
+        # Skills are shared between owners, never duplicated
+        self.make_seeker('other', 'python')
+        self.assertEqual(Skill.objects.filter(name='python').count(), 1)
+
+        seeker.skills = ''
+        seeker.save()
+        self.assertEqual(self.linked(seeker), set())
+
+    def test_saves_of_other_fields_keep_the_links(self):
+        seeker = self.make_seeker('seeker', 'python')
+        JobSeekerProfile.objects.filter(id=seeker.id).update(skills='go')
+        seeker.refresh_from_db()
+        seeker.experience_years = 3
+        seeker.save(update_fields=['experience_years'])
+        self.assertEqual(self.linked(seeker), {'python'})
+        sync_skill_links(seeker, seeker.skills, SeekerSkill, 'job_seeker')
+        self.assertEqual(self.linked(seeker), {'go'})
+
+    def test_filter_by_any_skill(self):
+        python = self.make_seeker('python', 'Python, SQL')
+        go = self.make_seeker('go', 'Go')
+        self.make_seeker('none')
+        seekers = JobSeekerProfile.objects.all()
+        self.assertEqual(set(filter_by_any_skill(seekers, [' PYTHON'], SeekerSkill, 'job_seeker')), {python})
+        self.assertEqual(set(filter_by_any_skill(seekers, ['sql', 'go'], SeekerSkill, 'job_seeker')), {python, go})
+        self.assertEqual(list(filter_by_any_skill(seekers, ['rust'], SeekerSkill, 'job_seeker')), [])
@@ -65,6 +65,13 @@ def login_user(request):
     else:
         return Response({'error': 'Invalid credentials'}, status=status.HTTP_401_UNAUTHORIZED)
 
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def logout_user(request):
+    # Revokes the token; its cached copy is dropped by the post_delete signal
+    Token.objects.filter(user=request.user).delete()
+    return Response(status=status.HTTP_204_NO_CONTENT)
+
 class ProfileViewSet(viewsets.ModelViewSet):
     queryset = Profile.objects.all()
     serializer_class = ProfileSerializer
@@ -72,4 +79,4 @@ class ProfileViewSet(viewsets.ModelViewSet):
     
     def get_queryset(self):
         # Users can only see their own profile
-        return Profile.objects.filter(user=self.request.user)
\ No newline at end of file
+        return Profile.objects.filter(user=self.request.user).select_related('user')
\ No newline at end of file
@@ -69,6 +69,9 @@ const ChatScreen = ({ route, navigation }) => {
   const [sendingMessage, setSendingMessage] = useState(false);
   const [chatPartner, setChatPartner] = useState(null);
   const [isKeyboardVisible, setKeyboardVisible] = useState(false);
+  // Cursor of the next older page of messages, null once the start of the chat is loaded
+  const [olderCursor, setOlderCursor] = useState(null);
+  const [loadingOlder, setLoadingOlder] = useState(false);
   
   // Refs
   const flatListRef = useRef(null);
@@ -141,9 +144,11 @@ const ChatScreen = ({ route, navigation }) => {
         
         // In a real app, fetch messages from API
         try {
+          // Newest page, oldest -> newest; next_cursor leads to older messages
           const response = await matchingAPI.getMessages(match.id);
-          if (response?.data) {
-            setMessages(response.data);
+          if (response?.data?.results) {
+            setMessages(response.data.results);
+            setOlderCursor(response.data.next_cursor);
           } else {
             setMessages(SAMPLE_MESSAGES);
           }
@@ -167,6 +172,23 @@ const ChatScreen = ({ route, navigation }) => {
     fetchData();
   }, [match]);
   
+  // Prepend the next older page when the user scrolls up to the top
+  const loadOlderMessages = async () => {
+    if (!olderCursor || loadingOlder) return;
+    setLoadingOlder(true);
+    try {
+      const response = await matchingAPI.getMessages(match.id, olderCursor);
+      if (response?.data?.results) {
+        setMessages(prevMessages => [...response.data.results, ...prevMessages]);
+        setOlderCursor(response.data.next_cursor);
+      }
+    } catch (error) {
+      console.error('Error fetching older messages:', error);
+    } finally {
+      setLoadingOlder(false);
+    }
+  };
+  
   const scrollToBottom = (animated = true) => {
     if (flatListRef.current && messages.length > 0) {
       flatListRef.current.scrollToEnd({ animated });
@@ -533,9 +555,18 @@ const ChatScreen = ({ route, navigation }) => {
           showsVerticalScrollIndicator={false}
           onScroll={Animated.event(
             [{ nativeEvent: { contentOffset: { y: scrollY } } }],
-            { useNativeDriver: false }
+            {
+              useNativeDriver: false,
+              listener: (event) => {
+                if (event.nativeEvent.contentOffset.y < 50) {
+                  loadOlderMessages();
+                }
+              },
+            }
           )}
           scrollEventThrottle={16}
+          // Keep the visible messages in place when older ones are prepended
+          maintainVisibleContentPosition={{ minIndexForVisible: 0 }}
         />
         
         {/* Input Area */}
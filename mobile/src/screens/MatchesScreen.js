@@ -243,6 +243,9 @@ const MatchesScreen = ({ navigation }) => {
   const [refreshing, setRefreshing] = useState(false);
   const [userType, setUserType] = useState('');
   const [activeFilter, setActiveFilter] = useState('all');
+  // Cursor of the next page of matches, null once all are loaded
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   
   // Animation values
   const scrollY = useRef(new Animated.Value(0)).current;
@@ -292,20 +295,40 @@ const MatchesScreen = ({ navigation }) => {
       const response = await matchingAPI.getMatches();
       
       // If API fails, use sample data
-      if (response?.data) {
-        setMatches(response.data);
+      if (response?.data?.results) {
+        setMatches(response.data.results);
+        setNextCursor(response.data.next_cursor);
       } else {
         setMatches(SAMPLE_MATCHES);
+        setNextCursor(null);
       }
     } catch (error) {
       console.error('Error fetching matches:', error);
       setMatches(SAMPLE_MATCHES);
+      setNextCursor(null);
     } finally {
       setLoading(false);
       setRefreshing(false);
     }
   };
   
+  // Follow the cursor when the list nears its end
+  const loadMoreMatches = async () => {
+    if (!nextCursor || loadingMore) return;
+    setLoadingMore(true);
+    try {
+      const response = await matchingAPI.getMatches(nextCursor);
+      if (response?.data?.results) {
+        setMatches(prevMatches => [...prevMatches, ...response.data.results]);
+        setNextCursor(response.data.next_cursor);
+      }
+    } catch (error) {
+      console.error('Error fetching more matches:', error);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+  
   // Fetch matches when screen focuses
   useFocusEffect(
     useCallback(() => {
@@ -511,6 +534,9 @@ const MatchesScreen = ({ navigation }) => {
             activeFilter === 'all' ? renderEmptyState() : renderEmptyFilterState()
           }
           ListHeaderComponent={filteredMatches.length > 0 ? renderHeader : null}
+          ListFooterComponent={loadingMore ? <ActivityIndicator color={COLORS.primary} style={styles.loadingMore} /> : null}
+          onEndReached={loadMoreMatches}
+          onEndReachedThreshold={0.5}
           refreshControl={
             <RefreshControl
               refreshing={refreshing}
@@ -537,6 +563,9 @@ const styles = StyleSheet.create({
     flex: 1,
     backgroundColor: '#F9FAFB',
   },
+  loadingMore: {
+    paddingVertical: 16,
+  },
   header: {
     height: Platform.OS === 'ios' ? 90 : 70,
     backgroundColor: '#FFFFFF',
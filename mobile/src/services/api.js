@@ -116,120 +116,128 @@ const mockAuth = {
 
 // Mock matching implementations
 const mockMatching = {
-  getMatches: async () => {
+  getMatches: async (cursor = null) => {
     // Simulate network delay
     await new Promise(resolve => setTimeout(resolve, 800));
     
     // Return sample matches
     return {
-      data: [
-        {
-          id: 101,
-          job: {
-            id: 1,
-            title: "Frontend Developer",
-            recruiter: {
-              company_name: "Tech Innovations Inc.",
-            },
-          },
-          job_seeker: {
-            profile: {
-              user: {
-                first_name: "Alex",
-                last_name: "Johnson",
+      data: {
+        results: [
+          {
+            id: 101,
+            job: {
+              id: 1,
+              title: "Frontend Developer",
+              recruiter: {
+                company_name: "Tech Innovations Inc.",
               },
-              profile_picture: null
-            }
-          },
-          created_at: new Date(Date.now() - 2 * 24 * 60 * 60 * 1000).toISOString(),
-          last_message: "Hi Alex, I'd like to schedule an interview. Are you available next week?",
-          unread_count: 1
-        },
-        {
-          id: 102,
-          job: {
-            id: 3,
-            title: "Mobile Developer",
-            recruiter: {
-              company_name: "AppWorks Studios",
             },
+            job_seeker: {
+              profile: {
+                user: {
+                  first_name: "Alex",
+                  last_name: "Johnson",
+                },
+                profile_picture: null
+              }
+            },
+            created_at: new Date(Date.now() - 2 * 24 * 60 * 60 * 1000).toISOString(),
+            last_message: "Hi Alex, I'd like to schedule an interview. Are you available next week?",
+            unread_count: 1
           },
-          job_seeker: {
-            profile: {
-              user: {
-                first_name: "Sarah",
-                last_name: "Williams",
+          {
+            id: 102,
+            job: {
+              id: 3,
+              title: "Mobile Developer",
+              recruiter: {
+                company_name: "AppWorks Studios",
               },
-              profile_picture: null
-            }
-          },
-          created_at: new Date(Date.now() - 5 * 24 * 60 * 60 * 1000).toISOString(),
-          last_message: "Thanks for your application. Your skills are impressive!",
-          unread_count: 0
-        },
-        {
-          id: 103,
-          job: {
-            id: 4,
-            title: "UX/UI Designer",
-            recruiter: {
-              company_name: "Creative Solutions",
             },
+            job_seeker: {
+              profile: {
+                user: {
+                  first_name: "Sarah",
+                  last_name: "Williams",
+                },
+                profile_picture: null
+              }
+            },
+            created_at: new Date(Date.now() - 5 * 24 * 60 * 60 * 1000).toISOString(),
+            last_message: "Thanks for your application. Your skills are impressive!",
+            unread_count: 0
           },
-          job_seeker: {
-            profile: {
-              user: {
-                first_name: "Michael",
-                last_name: "Chen",
+          {
+            id: 103,
+            job: {
+              id: 4,
+              title: "UX/UI Designer",
+              recruiter: {
+                company_name: "Creative Solutions",
               },
-              profile_picture: null
-            }
-          },
-          created_at: new Date(Date.now() - 1 * 24 * 60 * 60 * 1000).toISOString(),
-          last_message: null,
-          unread_count: 0
-        }
-      ]
+            },
+            job_seeker: {
+              profile: {
+                user: {
+                  first_name: "Michael",
+                  last_name: "Chen",
+                },
+                profile_picture: null
+              }
+            },
+            created_at: new Date(Date.now() - 1 * 24 * 60 * 60 * 1000).toISOString(),
+            last_message: null,
+            unread_count: 0
+          }
+        ],
+        next: null,
+        next_cursor: null,
+      }
     };
   },
   
-  getMessages: async (matchId) => {
+  getMessages: async (matchId, cursor = null) => {
     // Simulate network delay
     await new Promise(resolve => setTimeout(resolve, 600));
     
     return {
-      data: [
-        {
-          id: 1,
-          sender_id: 999,
-          content: "Hello! I'm interested in the position you applied for.",
-          created_at: new Date(Date.now() - 60 * 60 * 1000).toISOString()
-        },
-        {
-          id: 2,
-          sender_id: 998,
-          content: "Hi! Thanks for reaching out. I'm very excited about the opportunity.",
-          created_at: new Date(Date.now() - 50 * 60 * 1000).toISOString()
-        },
-        {
-          id: 3,
-          sender_id: 999,
-          content: "Your experience looks great. When would you be available for an interview?",
-          created_at: new Date(Date.now() - 45 * 60 * 1000).toISOString()
-        },
-        {
-          id: 4,
-          sender_id: 998,
-          content: "I'm available next week on Tuesday and Thursday afternoon. Would either of those work for you?",
-          created_at: new Date(Date.now() - 30 * 60 * 1000).toISOString()
-        },
-        {
-          id: 5,
-          sender_id: 999,
-          content: "Tuesday at 2 PM works perfectly. I'll send a calendar invite with the details.",
-          created_at: new Date(Date.now() - 15 * 60 * 1000).toISOString()
-        }
-      ]
+      data: {
+        results: [
+          {
+            id: 1,
+            sender_id: 999,
+            content: "Hello! I'm interested in the position you applied for.",
+            created_at: new Date(Date.now() - 60 * 60 * 1000).toISOString()
+          },
+          {
+            id: 2,
+            sender_id: 998,
+            content: "Hi! Thanks for reaching out. I'm very excited about the opportunity.",
+            created_at: new Date(Date.now() - 50 * 60 * 1000).toISOString()
+          },
+          {
+            id: 3,
+            sender_id: 999,
+            content: "Your experience looks great. When would you be available for an interview?",
+            created_at: new Date(Date.now() - 45 * 60 * 1000).toISOString()
+          },
+          {
+            id: 4,
+            sender_id: 998,
+            content: "I'm available next week on Tuesday and Thursday afternoon. Would either of those work for you?",
+            created_at: new Date(Date.now() - 30 * 60 * 1000).toISOString()
+          },
+          {
+            id: 5,
+            sender_id: 999,
+            content: "Tuesday at 2 PM works perfectly. I'll send a calendar invite with the details.",
+            created_at: new Date(Date.now() - 15 * 60 * 1000).toISOString()
+          }
+        ],
+        next: null,
+        next_cursor: null,
+      }
     };
   },
   
@@ -264,94 +272,99 @@ const mockMatching = {
 
 // Mock jobs implementations
 const mockJobs = {
-  getJobs: async () => {
+  getJobs: async (cursor = null) => {
     // Simulate network delay
     await new Promise(resolve => setTimeout(resolve, 800));
     
+    // One keyset page, shaped like /jobs/jobs/
     return {
-      data: [
-        {
-          id: 1,
-          title: "Frontend Developer",
-          company: "Tech Innovations Inc.",
-          location: "San Francisco, CA",
-          description: "We're looking for a talented frontend developer to join our team. You'll work on building responsive user interfaces and implementing new features.",
-          requirements: "Strong knowledge of React and JavaScript. Experience with modern frontend frameworks. Understanding of UI/UX principles.",
-          salary_min: 80000,
-          salary_max: 120000,
-          job_type: "full_time",
-          experience_level: "mid",
-          recruiter: {
+      data: {
+        results: [
+          {
             id: 1,
-            company_name: "Tech Innovations Inc."
-          }
-        },
-        {
-          id: 2,
-          title: "Backend Engineer",
-          company: "DataFlow Systems",
-          location: "Remote",
-          description: "Join our team to build scalable backend systems that power our applications. You'll work with databases, APIs, and server infrastructure.",
-          requirements: "Experience with Python, Django, and RESTful APIs. Knowledge of database design and optimization.",
-          salary_min: 100000,
-          salary_max: 150000,
-          job_type: "full_time",
-          experience_level: "senior",
-          is_remote: true,
-          recruiter: {
+            title: "Frontend Developer",
+            company: "Tech Innovations Inc.",
+            location: "San Francisco, CA",
+            description: "We're looking for a talented frontend developer to join our team. You'll work on building responsive user interfaces and implementing new features.",
+            requirements: "Strong knowledge of React and JavaScript. Experience with modern frontend frameworks. Understanding of UI/UX principles.",
+            salary_min: 80000,
+            salary_max: 120000,
+            job_type: "full_time",
+            experience_level: "mid",
+            recruiter: {
+              id: 1,
+              company_name: "Tech Innovations Inc."
+            }
+          },
+          {
             id: 2,
-            company_name: "DataFlow Systems"
-          }
-        },
-        {
-          id: 3,
-          title: "Mobile Developer",
-          company: "AppWorks Studios",
-          location: "Seattle, WA",
-          description: "Work on our mobile applications for iOS and Android using React Native. You'll be responsible for building new features and maintaining existing code.",
-          requirements: "Experience with React Native and mobile app development. Understanding of mobile UX patterns.",
-          salary_min: 90000,
-          salary_max: 130000,
-          job_type: "full_time",
-          experience_level: "mid",
-          recruiter: {
+            title: "Backend Engineer",
+            company: "DataFlow Systems",
+            location: "Remote",
+            description: "Join our team to build scalable backend systems that power our applications. You'll work with databases, APIs, and server infrastructure.",
+            requirements: "Experience with Python, Django, and RESTful APIs. Knowledge of database design and optimization.",
+            salary_min: 100000,
+            salary_max: 150000,
+            job_type: "full_time",
+            experience_level: "senior",
+            is_remote: true,
+            recruiter: {
+              id: 2,
+              company_name: "DataFlow Systems"
+            }
+          },
+          {
             id: 3,
-            company_name: "AppWorks Studios"
-          }
-        },
-        {
-          id: 4,
-          title: "UX/UI Designer",
-          company: "Creative Solutions",
-          location: "New York, NY",
-          description: "Design beautiful and intuitive user experiences for our products. Work closely with developers to implement your designs.",
-          requirements: "Proficiency in design tools like Figma or Sketch. Portfolio showing UI/UX projects. Understanding of user-centered design principles.",
-          salary_min: 85000,
-          salary_max: 125000,
-          job_type: "full_time",
-          experience_level: "mid",
-          recruiter: {
+            title: "Mobile Developer",
+            company: "AppWorks Studios",
+            location: "Seattle, WA",
+            description: "Work on our mobile applications for iOS and Android using React Native. You'll be responsible for building new features and maintaining existing code.",
+            requirements: "Experience with React Native and mobile app development. Understanding of mobile UX patterns.",
+            salary_min: 90000,
+            salary_max: 130000,
+            job_type: "full_time",
+            experience_level: "mid",
+            recruiter: {
+              id: 3,
+              company_name: "AppWorks Studios"
+            }
+          },
+          {
             id: 4,
-            company_name: "Creative Solutions"
-          }
-        },
-        {
-          id: 5,
-          title: "DevOps Engineer",
-          company: "CloudTech Services",
-          location: "Austin, TX",
-          description: "Manage our cloud infrastructure and CI/CD pipelines. Ensure reliability, performance, and security of our systems.",
-          requirements: "Experience with AWS, Docker, and Kubernetes. Knowledge of CI/CD practices and tools.",
-          salary_min: 110000,
-          salary_max: 160000,
-          job_type: "full_time",
-          experience_level: "senior",
-          recruiter: {
+            title: "UX/UI Designer",
+            company: "Creative Solutions",
+            location: "New York, NY",
+            description: "Design beautiful and intuitive user experiences for our products. Work closely with developers to implement your designs.",
+            requirements: "Proficiency in design tools like Figma or Sketch. Portfolio showing UI/UX projects. Understanding of user-centered design principles.",
+            salary_min: 85000,
+            salary_max: 125000,
+            job_type: "full_time",
+            experience_level: "mid",
+            recruiter: {
+              id: 4,
+              company_name: "Creative Solutions"
+            }
+          },
+          {
             id: 5,
-            company_name: "CloudTech Services"
+            title: "DevOps Engineer",
+            company: "CloudTech Services",
+            location: "Austin, TX",
+            description: "Manage our cloud infrastructure and CI/CD pipelines. Ensure reliability, performance, and security of our systems.",
+            requirements: "Experience with AWS, Docker, and Kubernetes. Knowledge of CI/CD practices and tools.",
+            salary_min: 110000,
+            salary_max: 160000,
+            job_type: "full_time",
+            experience_level: "senior",
+            recruiter: {
+              id: 5,
+              company_name: "CloudTech Services"
+            }
           }
-        }
-      ]
+        ],
+        next: null,
+        next_cursor: null,
+      }
     };
   },
   
@@ -360,8 +373,8 @@ const mockJobs = {
     await new Promise(resolve => setTimeout(resolve, 300));
     
     // In a real app, this would fetch the specific job
-    const mockJobs = await mockJobs.getJobs();
-    const job = mockJobs.data.find(job => job.id === id);
+    const response = await mockJobs.getJobs();
+    const job = response.data.results.find(job => job.id === id);
     
     if (job) {
       return { data: job };
@@ -418,15 +431,17 @@ export const authAPI = {
     }
     return api.post('/users/register/', userData);
   },
+  logout: () => api.post('/users/logout/'),
   getProfile: () => api.get('/users/profiles/'),
 };
 
 export const jobsAPI = {
-  getJobs: () => {
+  // One page of jobs; pass the previous response's next_cursor for the next one
+  getJobs: (cursor = null) => {
     if (MOCK_AUTH_ENABLED) {
-      return mockJobs.getJobs();
+      return mockJobs.getJobs(cursor);
     }
-    return api.get('/jobs/jobs/');
+    return api.get('/jobs/jobs/', { params: cursor ? { cursor } : {} });
   },
   getJob: (id) => {
     if (MOCK_AUTH_ENABLED) {
@@ -446,6 +461,11 @@ export const jobsAPI = {
     }
     return api.put(`/jobs/jobs/${id}/`, jobData);
   },
+  // params: q, location, job_type, experience_level, is_remote, salary_min, salary_max, skills, cursor,
+  // radius_km with lat + lon or near (a place name), include_remote
+  searchJobs: (params) => api.get('/jobs/jobs/search/', { params }),
+  // Same params as searchJobs (cursor aside)
+  getJobFacets: (params) => api.get('/jobs/jobs/facets/', { params }),
 };
 
 export const matchingAPI = {
@@ -455,17 +475,46 @@ export const matchingAPI = {
     }
     return api.post('/matching/swipe/', swipeData);
   },
-  getMatches: () => {
+  swipeBatch: (swipes) => api.post('/matching/swipe/batch/', { swipes }),
+  // nearby: { radius_km, lat, lon, near, include_remote }; without lat/lon or near, around the profile's location
+  getDeck: (cursor = null, limit = 20, nearby = {}) => {
+    const params = cursor ? { limit, cursor, ...nearby } : { limit, ...nearby };
+    return api.get('/matching/deck/', { params });
+  },
+  getCandidateDeck: (jobId, cursor = null, limit = 20) => {
+    const params = cursor ? { limit, cursor } : { limit };
+    return api.get(`/matching/jobs/${jobId}/deck/`, { params });
+  },
+  // Recruiter dashboard: views, swipes, matches and applications per job
+  getJobFunnels: () => api.get('/matching/jobs/funnel/'),
+  // One page of matches; pass the previous response's next_cursor for the next one
+  getMatches: (cursor = null) => {
     if (MOCK_AUTH_ENABLED) {
-      return mockMatching.getMatches();
+      return mockMatching.getMatches(cursor);
     }
-    return api.get('/matching/matches/');
+    return api.get('/matching/matches/', { params: cursor ? { cursor } : {} });
   },
-  getMessages: (matchId) => {
+  // Counterpart, last message and unread count per match, one request per page
+  getInbox: (cursor = null) => api.get('/matching/matches/inbox/', { params: cursor ? { cursor } : {} }),
+  markMatchesRead: (matchIds) => api.post('/matching/matches/read/', { match_ids: matchIds }),
+  getMessages: (matchId, cursor = null) => {
     if (MOCK_AUTH_ENABLED) {
-      return mockMatching.getMessages(matchId);
+      return mockMatching.getMessages(matchId, cursor);
     }
-    return api.get(`/matching/messages/?match_id=${matchId}`);
+    // Newest page first; pass the previous response's next_cursor to load older messages
+    const params = cursor ? { match_id: matchId, cursor } : { match_id: matchId };
+    return api.get('/matching/messages/', { params });
+  },
+  // Changes since the last sync: pass back `cursor` as since and the ETag to get a 304 when idle
+  syncMessages: (matchId, since = null, etag = null, wait = 0) => {
+    const params = since ? { match_id: matchId, since, wait } : { match_id: matchId, wait };
+    const headers = etag ? { 'If-None-Match': etag } : {};
+    return api.get('/matching/messages/sync/', {
+      params,
+      headers,
+      timeout: (wait + 8) * 1000,
+      validateStatus: (status) => (status >= 200 && status < 300) || status === 304,
+    });
   },
   sendMessage: (messageData) => {
     if (MOCK_AUTH_ENABLED) {
@@ -473,6 +522,12 @@ export const matchingAPI = {
     }
     return api.post('/matching/messages/', messageData);
   },
+  // Live chat: send {type: 'message', content} or {type: 'read'}; receives 'message' and 'read' events
+  openChatSocket: async (matchId) => {
+    const token = await AsyncStorage.getItem('token');
+    const wsUrl = API_URL.replace(/^http/, 'ws').replace(/\/api$/, '');
+    return new WebSocket(`${wsUrl}/ws/matches/${matchId}/?token=${token}`);
+  },
 };
 
 export default api;
\ No newline at end of file